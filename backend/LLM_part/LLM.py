@@ -1,8 +1,16 @@
 # backend/LLM_part/LLM.py
 import os
 import json
+import logging
+import threading
 import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from typing import Dict, List, Any, Optional, Tuple
+from .cache import SearchParamCache
+from .resilience import CircuitBreaker, CircuitOpenError, LLMTimeoutError
+from .intent import IntentEngine
+
+logger = logging.getLogger('animalloo.llm')
 
 # --- 환경 설정 ---
 # API 키는 app.py에서 받아옵니다.
@@ -12,7 +20,7 @@ DB_CATEGORIES = [
     'veterinary hospital', 
     'pharmacy', 
     'beauty salon', 
-    'culture_center', 
+    'cultural center', 
     'museum building', 
     'art museum', 
     'travel', 
@@ -28,16 +36,48 @@ class LLMProcessor:
     Gemini LLM을 사용하여 Animalloo 검색 쿼리를 처리하는 클래스.
     """
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache: Optional[SearchParamCache] = None,
+                 deadline_seconds: Optional[float] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 model: Any = None,
+                 max_workers: int = 8,
+                 intent_engine: Optional[IntentEngine] = None,
+                 intent_threshold: Optional[float] = 0.75):
         """
         Gemini 모델을 초기화합니다.
         
         Args:
             api_key: Google AI Studio에서 발급받은 API 키 또는 시뮬레이션용 키
+            cache: 검색어별 분석 결과 캐시 (없으면 매번 분석)
+            deadline_seconds: LLM 응답 제한 시간. 넘기면 규칙 기반 분석 결과로 응답 (None이면 무제한)
+            breaker: 연속 실패 시 LLM 호출을 잠시 건너뛰는 차단기 (없으면 기본값으로 생성)
+            model: generate_content()를 가진 모델 객체 주입 (테스트용 FakeGenerativeModel 등)
+            max_workers: 제한 시간 적용을 위해 LLM을 호출하는 스레드 수
+            intent_engine: 규칙 기반 키워드 분석기 (없으면 기본 사전으로 생성)
+            intent_threshold: 키워드 분석 신뢰도가 이 값 이상이면 LLM을 건너뜀 (None이면 항상 LLM 사용)
         """
         self.simulated_mode = (api_key == "SIMULATED_KEY")
+        self.cache = cache
+        self.deadline_seconds = deadline_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self.intent = intent_engine or IntentEngine()
+        self.intent_threshold = intent_threshold
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._timeouts = 0
+        self._errors = 0
+        self._fallbacks = 0
+        self._late_fills = 0
+        self._local_hits = 0
         
-        if self.simulated_mode:
+        if model is not None:
+            print("[LLM] 주입된 모델로 초기화되었습니다.")
+            self.simulated_mode = False
+            self.model = model
+        elif self.simulated_mode:
             print("[LLM] 시뮬레이션 모드로 초기화되었습니다. (API 키 불필요)")
             self.model = None
         else:
@@ -56,6 +96,14 @@ class LLMProcessor:
                 self.model = None
 
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # 처음 쓸 때 만들고, fork된 작업자에서는 (부모의 스레드가 없으므로) 새로 만듭니다.
+        with self._executor_lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='llm')
+                self._executor_pid = os.getpid()
+            return self._executor
+
     def _build_prompt(self, query: str) -> str:
         """LLM에 전달할 프롬프트를 생성합니다."""
         
@@ -74,8 +122,8 @@ class LLMProcessor:
         # 처리 규칙:
         1.  **categories**: 
             - 검색어와 가장 관련성이 높은 카테고리를 위 목록에서 정확히 선택합니다.
-            - 예: "강아지 병원" -> ["hospital"]
-            - 예: "밥 먹을 곳" -> ["restaurant", "cafe"]
+            - 예: "강아지 병원" -> ["veterinary hospital"]
+            - 예: "밥 먹을 곳" -> ["Korean restaurant", "café au lait"]
             - 예: "24시 동물약국" -> ["pharmacy"]
             - 예: "전부" 또는 "모든 곳" -> {json.dumps(DB_CATEGORIES)} (모든 카테고리)
             - 관련 카테고리가 없으면 빈 리스트 []를 반환합니다.
@@ -101,51 +149,112 @@ class LLMProcessor:
         """
         return prompt
 
+    def _simulate_parameters(self, query: str) -> Dict[str, Any]:
+        """
+        규칙 기반(키워드 사전) 분석. 시뮬레이션 모드와 LLM 실패/지연 시의 대체 응답에 씁니다.
+        """
+        result = self.intent.analyze(query)
+        result.pop("confidence", None)
+        return result
+
+    def _extract_parameters(self, query: str) -> Dict[str, Any]:
+        """
+        검색어를 분석합니다. 실패하면 예외를 던집니다. (실패 결과는 캐시하지 않기 위함)
+        """
+        # --- 시뮬레이션 모드 ---
+        if self.simulated_mode:
+            logger.debug("[LLM 시뮬레이션] 쿼리: %s", query)
+            return self._simulate_parameters(query)
+
+        # --- 실제 API 호출 모드 ---
+        if not self.model:
+             raise Exception("모델이 초기화되지 않았습니다.")
+
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM 차단기가 열려 있어 호출을 건너뜁니다.")
+
+        future = self._get_executor().submit(self._call_model, query)
+        try:
+            result = future.result(timeout=self.deadline_seconds)
+        except FuturesTimeoutError:
+            # 늦게 도착한 응답은 버리지 않고 캐시에 채워 다음 요청에서 씁니다.
+            with self._stats_lock:
+                self._timeouts += 1
+            self.breaker.record_failure()
+            future.add_done_callback(lambda f: self._fill_late_result(query, f))
+            raise LLMTimeoutError(f"LLM 응답이 {self.deadline_seconds}초 안에 오지 않았습니다.")
+        except Exception:
+            with self._stats_lock:
+                self._errors += 1
+            self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success()
+        return result
+
+    def _fill_late_result(self, query: str, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        if self.cache is not None:
+            self.cache.set(query, future.result())
+            with self._stats_lock:
+                self._late_fills += 1
+            logger.info("[LLM] 제한 시간 이후 도착한 응답을 캐시에 저장: %s", query)
+
+    def _call_model(self, query: str) -> Dict[str, Any]:
+        """모델을 실제로 호출하고 응답을 검증합니다."""
+        prompt = self._build_prompt(query)
+        logger.debug("[LLM 실제 호출] Gemini에 프롬프트 전송 중...")
+        
+        response = self.model.generate_content(prompt)
+        result = json.loads(response.text)
+
+        logger.debug("[LLM 실제 호출] 분석 완료: %s", result)
+        
+        if "categories" not in result or "search_radius_km" not in result:
+            raise ValueError("LLM 응답에 필수 키가 누락되었습니다.")
+            
+        return result
+
     def get_search_parameters(self, query: str) -> Dict[str, Any]:
         """
         사용자의 자연어 쿼리를 분석하여 DB 검색 파라미터(JSON)를 반환합니다.
+        캐시가 있으면 같은 검색어는 다시 분석하지 않습니다.
         """
         
-        try:
-            # --- 시뮬레이션 모드 ---
-            if self.simulated_mode:
-                print(f"[LLM 시뮬레이션] 쿼리: {query}")
-                if "병원" in query or "hospital" in query:
-                    result = {
-                        "categories": ["hospital"], "search_radius_km": 3.0,
-                        "text_filter": "24시" if "24시" in query or "야간" in query else None
-                    }
-                elif "약국" in query or "pharmacy" in query:
-                    result = {"categories": ["pharmacy"], "search_radius_km": 3.0, "text_filter": None}
-                elif "밥" in query or "식당" in query or "카페" in query:
-                     result = {"categories": ["restaurant", "cafe"], "search_radius_km": 3.0, "text_filter": None}
-                else:
-                     result = {"categories": [], "search_radius_km": 3.0, "text_filter": query if query else None}
-                
-                return result
-
-            # --- 실제 API 호출 모드 ---
-            if not self.model:
-                 raise Exception("모델이 초기화되지 않았습니다.")
-                 
-            prompt = self._build_prompt(query)
-            print(f"[LLM 실제 호출] Gemini에 프롬프트 전송 중...")
-            
-            response = self.model.generate_content(prompt)
-            result = json.loads(response.text)
+        # 흔한 단순 검색어는 키워드 분석만으로 충분하므로 LLM을 호출하지 않습니다.
+        local = self.intent.analyze(query)
+        confidence = local.pop("confidence")
+        if self.intent_threshold is not None and confidence >= self.intent_threshold:
+            with self._stats_lock:
+                self._local_hits += 1
+            return local
 
-            print(f"[LLM 실제 호출] 분석 완료: {result}")
-            
-            if "categories" not in result or "search_radius_km" not in result:
-                raise ValueError("LLM 응답에 필수 키가 누락되었습니다.")
-                
-            return result
+        try:
+            if self.cache is not None:
+                return self.cache.get_or_compute(query, self._extract_parameters)
+            return self._extract_parameters(query)
 
         except Exception as e:
-            print(f"Gemini 쿼리 처리 중 오류 발생: {e}")
-            # LLM 실패 시, 검색어 원본을 text_filter로 사용하는 기본값 반환
-            return {
-                "categories": [],  # 카테고리 분석 실패
-                "search_radius_km": 3.0, # 기본 반경 5km
-                "text_filter": query # 검색어 원본을 필터로 사용
-            }
\ No newline at end of file
+            logger.warning("Gemini 쿼리 처리 중 오류 발생: %s", e)
+            # LLM 실패/지연/차단 시, 규칙 기반 분석 결과로 대신 응답
+            with self._stats_lock:
+                self._fallbacks += 1
+            return self._simulate_parameters(query)
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시, 차단기, 제한 시간 초과 등 LLM 단계의 통계를 반환합니다."""
+        with self._stats_lock:
+            result = {
+                "simulated_mode": self.simulated_mode,
+                "deadline_seconds": self.deadline_seconds,
+                "timeouts": self._timeouts,
+                "errors": self._errors,
+                "fallbacks": self._fallbacks,
+                "late_fills": self._late_fills,
+                "local_hits": self._local_hits,
+                "intent_threshold": self.intent_threshold,
+            }
+        result["circuit_breaker"] = self.breaker.stats()
+        result["cache"] = self.cache.stats() if self.cache is not None else None
+        return result
\ No newline at end of file
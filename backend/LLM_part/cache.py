@@ -0,0 +1,209 @@
+# backend/LLM_part/cache.py
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 24 * 60 * 60  # 하루
+
+
+def normalize_query(query: str) -> str:
+    """
+    캐시 키용 검색어 정규화: 유니코드 NFKC, 소문자, 앞뒤/중복 공백 제거.
+    "24시  동물병원 " 과 "24시 동물병원"은 같은 키가 됩니다.
+    """
+    return ' '.join(unicodedata.normalize('NFKC', query or '').lower().split())
+
+
+class SearchParamCache:
+    """
+    LLM 검색 파라미터 추출 결과를 검색어 단위로 캐시합니다.
+
+    - 1차: 프로세스 내 LRU (TTL 적용)
+    - 2차: (선택) SQLite 파일에 저장되어 서버 재시작 후에도 유지
+    - 같은 검색어가 동시에 들어오면 LLM 호출은 한 번만 하고 결과를 함께 씁니다. (single-flight)
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 persist_path: Optional[str] = None,
+                 clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        self._clock = clock
+
+        self._entries = OrderedDict()  # key -> (만료 시각, 값)
+        self._inflight = {}            # key -> Future
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._shared_inflight = 0
+
+        self._db = None
+        self._db_pid = None
+        self._db_lock = threading.Lock()
+        if persist_path:
+            self._db = self._open_db()
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_search_cache ("
+                " query_key TEXT PRIMARY KEY,"
+                " params TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM llm_search_cache WHERE expires_at <= ?", (self._clock(),))
+            self._db.commit()
+
+    def _open_db(self) -> sqlite3.Connection:
+        self._db_pid = os.getpid()
+        return sqlite3.connect(self.persist_path, check_same_thread=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        # fork된 작업자는 부모가 연 연결을 쓰지 않고 자기 연결을 새로 엽니다. (_db_lock 안에서 호출)
+        if self._db_pid != os.getpid():
+            self._db = self._open_db()
+        return self._db
+
+    # --- 1차 (메모리) ---
+    def _get_local(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._entries[key]
+            self._expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_local(self, key: str, value: Dict[str, Any], expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    # --- 2차 (SQLite) ---
+    def _get_persistent(self, key: str, now: float):
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._connection().execute(
+                "SELECT params, expires_at FROM llm_search_cache WHERE query_key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _put_persistent(self, key: str, value: Dict[str, Any], expires_at: float):
+        if self._db is None:
+            return
+        with self._db_lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_search_cache (query_key, params, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at)
+            )
+            conn.commit()
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """캐시된 값을 반환합니다. 없으면 None."""
+        key = normalize_query(query)
+        now = self._clock()
+        with self._lock:
+            value = self._get_local(key, now)
+            if value is not None:
+                self._hits += 1
+                return copy.deepcopy(value)
+
+        stored = self._get_persistent(key, now)
+        with self._lock:
+            if stored is None:
+                self._misses += 1
+                return None
+            value, expires_at = stored
+            self._persistent_hits += 1
+            self._put_local(key, value, expires_at)
+        return copy.deepcopy(value)
+
+    def set(self, query: str, value: Dict[str, Any]):
+        key = normalize_query(query)
+        expires_at = self._clock() + self.ttl_seconds
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._put_local(key, value, expires_at)
+        self._put_persistent(key, value, expires_at)
+
+    def get_or_compute(self, query: str, compute: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        캐시에 있으면 바로 반환하고, 없으면 compute(query)를 호출해 저장합니다.
+        같은 키를 계산 중인 요청이 있으면 새로 호출하지 않고 그 결과를 기다립니다.
+        compute가 예외를 던지면 캐시에 저장하지 않고 기다리던 요청에도 같은 예외를 전달합니다.
+        """
+        cached = self.get(query)
+        if cached is not None:
+            return cached
+
+        key = normalize_query(query)
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._shared_inflight += 1
+
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            value = compute(query)
+            self.set(query, value)
+            future.set_result(value)
+            return copy.deepcopy(value)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                conn = self._connection()
+                conn.execute("DELETE FROM llm_search_cache")
+                conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._persistent_hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "persistent": self._db is not None,
+                "hits": self._hits,
+                "persistent_hits": self._persistent_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "shared_inflight": self._shared_inflight,
+                "inflight": len(self._inflight),
+                "hit_ratio": round((self._hits + self._persistent_hits) / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,64 @@
+# backend/LLM_part/fake_model.py
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Union
+
+DEFAULT_RESPONSE = {"categories": [], "search_radius_km": 3.0, "text_filter": None}
+
+
+class FakeResponse:
+    """genai의 응답 객체처럼 .text 속성만 가진 응답입니다."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    Gemini 대신 쓰는 로컬 가짜 모델입니다. (네트워크/API 키 불필요)
+    지연 시간과 오류를 주입해 제한 시간, 대체 응답, 차단기 동작을 시험할 때 씁니다.
+
+    Args:
+        latency: 응답 지연(초). 숫자 또는 프롬프트를 받아 지연을 돌려주는 함수
+        error_rate: 0~1 사이 확률로 예외 발생
+        responder: 프롬프트를 받아 결과 dict를 돌려주는 함수 (없으면 DEFAULT_RESPONSE)
+        seed: error_rate 난수 시드
+    """
+
+    def __init__(self, latency: Union[float, Callable[[str], float]] = 0.0,
+                 error_rate: float = 0.0,
+                 responder: Optional[Callable[[str], Dict[str, Any]]] = None,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.responder = responder
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._fail_next = 0
+        self.calls = 0
+        self.errors = 0
+
+    def fail_next(self, count: int = 1):
+        """다음 count번의 호출을 무조건 실패시킵니다."""
+        with self._lock:
+            self._fail_next += count
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        with self._lock:
+            self.calls += 1
+            should_fail = self._fail_next > 0 or self._random.random() < self.error_rate
+            if self._fail_next > 0:
+                self._fail_next -= 1
+            if should_fail:
+                self.errors += 1
+
+        delay = self.latency(prompt) if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+        if should_fail:
+            raise RuntimeError("FakeGenerativeModel: 주입된 오류")
+
+        result = self.responder(prompt) if self.responder else DEFAULT_RESPONSE
+        return FakeResponse(json.dumps(result, ensure_ascii=False))
@@ -0,0 +1,247 @@
+# backend/LLM_part/intent.py
+import unicodedata
+from collections import deque
+from typing import Any, Dict, Iterable, List, Tuple
+
+DEFAULT_RADIUS_KM = 3.0
+NEAR_RADIUS_KM = 1.0
+FAR_RADIUS_KM = 10.0
+
+# 검색어 용어 -> 실제 DB 카테고리 (facilities.Category 값)
+CATEGORY_TERMS = {
+    'veterinary hospital': [
+        '병원', '동물병원', '애견병원', '동물의료센터', '의료센터', '수의사', '진료', '응급실',
+        'vet', 'vets', 'veterinary', 'hospital', 'animal hospital', 'clinic',
+    ],
+    'pharmacy': ['약국', '동물약국', '약', 'pharmacy', 'drugstore'],
+    'beauty salon': [
+        '미용', '미용실', '미용샵', '애견미용', '트리밍', '그루밍', '목욕',
+        'grooming', 'groomer', 'salon', 'beauty salon',
+    ],
+    'cultural center': ['문화센터', '문화', '교육', '훈련', 'cultural center', 'culture center', 'training'],
+    'museum building': ['박물관', 'museum'],
+    'art museum': ['미술관', '갤러리', '전시', 'art museum', 'gallery'],
+    'travel': ['여행', '여행지', '관광', '관광지', '나들이', 'travel', 'trip', 'tour'],
+    'hotel': ['호텔', '애견호텔', '펫호텔', '위탁', '돌봄', '맡길', 'hotel', 'boarding'],
+    '펜션': ['펜션', '숙소', '숙박', 'pension'],
+    'shop': ['용품', '애견용품', '펫샵', '사료', '간식', '장난감', 'shop', 'store', 'supplies'],
+    'Korean restaurant': ['식당', '음식점', '한식', '맛집', 'restaurant'],
+    'café au lait': ['카페', '애견카페', '커피', 'cafe', 'café', 'coffee'],
+}
+
+# 여러 카테고리에 걸치는 용어
+MULTI_CATEGORY_TERMS = {
+    '밥': ['Korean restaurant', 'café au lait'],
+    '먹을': ['Korean restaurant', 'café au lait'],
+    'food': ['Korean restaurant', 'café au lait'],
+    'eat': ['Korean restaurant', 'café au lait'],
+}
+
+# "전부", "모든 곳" -> 카테고리 제한 없음
+ALL_CATEGORY_TERMS = ['전부', '전체', '모든', 'all', 'everything', 'anything']
+
+# 반경 힌트
+RADIUS_TERMS = {
+    NEAR_RADIUS_KM: [
+        '근처', '가까운', '가까이', '주변', '근방', '도보', '걸어서', '자전거',
+        'near', 'nearby', 'close', 'walking', 'walk', 'bike',
+    ],
+    FAR_RADIUS_KM: ['멀리', '멀어도', '서울 전체', '서울 전역', 'far', 'anywhere'],
+}
+
+# name/description 필터로 넘길 키워드 -> text_filter 값
+TEXT_FILTER_TERMS = {
+    '24시': '24시', '24시간': '24시', '야간': '24시', '심야': '24시', '새벽': '24시', '24h': '24시', '24 hours': '24시',
+    '응급': '응급', 'emergency': '응급',
+    '주차': '주차', 'parking': '주차',
+    '전문': '전문',
+}
+
+# 의미는 없지만 검색어에 자주 섞이는 말 (신뢰도 계산 시 '이해한 글자'로 셈)
+FILLER_TERMS = [
+    '찾아줘', '찾아', '알려줘', '추천', '추천해줘', '어디', '어디야', '있어', '있나요', '곳', '좀', '데',
+    '강아지', '고양이', '반려동물', '반려견', '반려묘', '애견', '펫', '우리', '내', '제', '현재', '위치',
+    '에서', '으로', '로', '하는', '할', '수', '있는', '는', '은', '이', '가', '을', '를', '의', '랑',
+    'find', 'me', 'please', 'for', 'my', 'the', 'dog', 'cat', 'pet', 'pets', 'in', 'around', 'open', 'place', 'places',
+    '서울', '강남', '강남구', '강동구', '강북구', '강서구', '관악구', '광진구', '구로구', '금천구', '노원구', '도봉구',
+    '동대문구', '동작구', '마포구', '서대문구', '서초구', '성동구', '성북구', '송파구', '양천구', '영등포구',
+    '용산구', '은평구', '종로구', '중구', '중랑구',
+]
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+class AhoCorasick:
+    """
+    여러 용어를 검색어에서 한 번의 순회로 모두 찾는 Aho-Corasick 오토마톤입니다.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]  # 상태 -> 이 상태에서 끝나는 용어 목록
+
+        for term in terms:
+            self._add(term)
+        self._build()
+
+    def _add(self, term: str):
+        state = 0
+        for char in term:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = nxt
+        self._output[state].append(term)
+
+    def _build(self):
+        # 루트의 자식은 실패 링크가 루트(0)이므로 그 다음 깊이부터 BFS로 채웁니다.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0) if state else 0
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """(시작, 끝, 용어) 목록을 반환합니다. 겹치는 매치도 모두 포함합니다."""
+        matches = []
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for term in self._output[state]:
+                matches.append((i + 1 - len(term), i + 1, term))
+        return matches
+
+
+def _is_ascii_word_char(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+
+class IntentEngine:
+    """
+    한국어/영어 키워드 사전으로 검색어를 한 번에 분석해
+    LLM과 같은 형태의 검색 파라미터(categories, search_radius_km, text_filter)를 만듭니다.
+
+    confidence는 검색어 글자 중 사전 용어로 설명되는 비율(공백 제외)입니다.
+    카테고리를 찾았고 confidence가 충분히 높으면 LLM 호출 없이 이 결과를 씁니다.
+    """
+
+    def __init__(self, default_radius_km: float = DEFAULT_RADIUS_KM):
+        self.default_radius_km = default_radius_km
+        self._meanings = {}  # 정규화된 용어 -> [(종류, 값), ...]
+
+        for category, terms in CATEGORY_TERMS.items():
+            for term in terms:
+                self._add_meaning(term, ('category', category))
+        for term, categories in MULTI_CATEGORY_TERMS.items():
+            for category in categories:
+                self._add_meaning(term, ('category', category))
+        for term in ALL_CATEGORY_TERMS:
+            self._add_meaning(term, ('all', None))
+        for radius, terms in RADIUS_TERMS.items():
+            for term in terms:
+                self._add_meaning(term, ('radius', radius))
+        for term, text_filter in TEXT_FILTER_TERMS.items():
+            self._add_meaning(term, ('text', text_filter))
+        for term in FILLER_TERMS:
+            self._add_meaning(term, ('filler', None))
+
+        self._matcher = AhoCorasick(self._meanings.keys())
+
+    def _add_meaning(self, term: str, meaning: tuple):
+        meanings = self._meanings.setdefault(normalize(term), [])
+        if meaning not in meanings:
+            meanings.append(meaning)
+
+    def _select_matches(self, text: str) -> list:
+        """
+        겹치는 매치 중 왼쪽부터 가장 긴 것을 고릅니다. ("동물병원" 안의 "병원"은 버림)
+        영어 용어는 단어 경계에서만 인정합니다. ("vet"이 "velvet"에 걸리지 않도록)
+        한 글자 용어는 그 어절 전체가 용어로 설명될 때만 인정합니다. ("예약"의 "약"은 무시, "병원을"의 "을"은 인정)
+        """
+        candidates = []
+        for start, end, term in self._matcher.find_all(text):
+            if term.isascii():
+                if start > 0 and _is_ascii_word_char(text[start - 1]):
+                    continue
+                if end < len(text) and _is_ascii_word_char(text[end]):
+                    continue
+            candidates.append((start, end, term))
+
+        candidates.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        selected = []
+        covered_until = 0
+        for start, end, term in candidates:
+            if start >= covered_until:
+                selected.append((start, end, term))
+                covered_until = end
+
+        covered = set()
+        for start, end, _ in selected:
+            covered.update(range(start, end))
+
+        def token_covered(pos: int) -> bool:
+            start = pos
+            while start > 0 and not text[start - 1].isspace():
+                start -= 1
+            end = pos
+            while end < len(text) and not text[end].isspace():
+                end += 1
+            return all(i in covered for i in range(start, end))
+
+        return [m for m in selected if m[1] - m[0] > 1 or token_covered(m[0])]
+
+    def analyze(self, query: str) -> Dict[str, Any]:
+        """
+        검색어를 분석해 검색 파라미터와 confidence(0~1)를 반환합니다.
+        """
+        text = normalize(query)
+        matches = self._select_matches(text)
+
+        categories = []
+        radius_km = None
+        text_filters = []
+        match_all = False
+        covered = 0
+
+        for start, end, term in matches:
+            covered += sum(1 for char in text[start:end] if not char.isspace())
+            for kind, value in self._meanings[term]:
+                if kind == 'category' and value not in categories:
+                    categories.append(value)
+                elif kind == 'all':
+                    match_all = True
+                elif kind == 'radius':
+                    # 여러 힌트가 있으면 가장 좁은 반경
+                    radius_km = value if radius_km is None else min(radius_km, value)
+                elif kind == 'text' and value not in text_filters:
+                    text_filters.append(value)
+
+        total = sum(1 for char in text if not char.isspace())
+        confidence = covered / total if total else 0.0
+        understood = bool(categories) or match_all
+
+        if match_all:
+            categories = []
+
+        # 알아듣지 못한 검색어를 그대로 text_filter로 넘기면 FTS가 필수 조건으로 걸러 결과가 비므로,
+        # 사전의 text 용어를 찾았을 때만 넘기고 나머지는 반경 안 전체 시설(거리순)로 검색합니다.
+        return {
+            "categories": categories,
+            "search_radius_km": radius_km if radius_km is not None else self.default_radius_km,
+            "text_filter": ' '.join(text_filters) if text_filters else None,
+            "confidence": round(confidence, 4) if understood else 0.0,
+        }
@@ -1,17 +1,38 @@
 import os
 import json
-from flask import Flask, request, jsonify, send_from_directory
+import logging
+import math
+import time
+from flask import Flask, Response, g, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 from LLM_part.LLM import LLMProcessor
+from LLM_part.cache import SearchParamCache
+from LLM_part.resilience import CircuitBreaker
 import sqlite3
-import math
-from models import db, bcrypt, User
+from models import db, bcrypt, User, migrate_favorite_hospitals
 from flask_jwt_extended import JWTManager
 import secrets
 from auth import auth_bp
+from password_hasher import password_hasher
+from auth_context import user_cache
+from request_profiler import PROFILE_HEADER, request_profiler
+from profile_images import parse_stored_name, profile_images
+from spatial_index import DEFAULT_MAX_RADIUS_KM, FacilityGridIndex, get_haversine_distance, parse_radius_km
+from db_pool import ReadConnectionPool, enable_wal, ensure_indexes, sqlite_path_from_uri
+from fts import ensure_fts_index, score_by_text, text_matcher
+from pagination import MAX_PAGE_SIZE, InvalidCursorError, decode_cursor, parse_limit, top_k
+from response_cache import DataVersion, ResponseCache, cached_json_response
+from opening_hours import OpeningHoursIndex, now_kst, parse_open_at
+from binary_snapshot import SnapshotError, default_snapshot_path, export_snapshot, load_snapshot
+from facility_reload import FACILITY_TABLES, FacilityReloader, change_log_seq, ensure_change_log
+from cluster_pyramid import MAX_CLUSTER_ZOOM, MAX_ZOOM, PyramidCache, cell_range, parse_bbox
+from serializers import InvalidFieldsError, dumps, facility_fields, get_serializer, json_response, parse_fields, select_list
+from metrics import CONTENT_TYPE, REQUEST_LATENCY, RESULT_SIZE, SEARCH_STAGE_LATENCY, StageTimer, metrics
+from log_queue import logger, restart_in_child as restart_logging_in_child, setup_logging
 # --- 1. 환경 변수 로드 ---
 load_dotenv()
+setup_logging()  # LOG_LEVEL (기본 INFO), 출력은 별도 스레드에서
 
 # --- 2. Flask 앱 및 LLM 초기화 ---
 app = Flask(__name__)
@@ -21,10 +42,13 @@ CORS(app,
      resources={r"/*": {"origins": "*"}},
      supports_credentials=True,
      allow_headers=["Authorization", "Content-Type"],
-     expose_headers=["Authorization"])
+     expose_headers=["Authorization", "X-Next-Cursor", "X-Search-Radius-Km"])
 
 # ⬇️ 데이터베이스 설정
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), '..', 'animalloo_en_db.sqlite')}"
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'DATABASE_URL',
+    f"sqlite:///{os.path.join(os.path.dirname(__file__), '..', 'animalloo_en_db.sqlite')}"
+)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # ⬇️ JWT 설정 (중요!)
@@ -35,117 +59,225 @@ app.config['JWT_HEADER_TYPE'] = 'Bearer'  # Bearer 타입
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = 3600  # 1시간 (초 단위)
 app.config['JWT_COOKIE_CSRF_PROTECT'] = False  # CSRF 보호 비활성화 (개발 환경)
 
+# ⬇️ 비밀번호 해시 설정 (cost를 바꾸면 기존 해시는 다음 로그인 때 새 cost로 다시 해싱)
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+# 해시 풀은 spawn으로 띄우는데, spawn은 __main__ 모듈을 다시 불러오므로 python app.py(개발 서버)에서는 기본값을 0(요청 스레드에서 계산)으로 둡니다.
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS',
+                                                         0 if __name__ == '__main__' else min(4, os.cpu_count() or 1)))
+app.config['PASSWORD_HASH_MAX_QUEUE'] = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 32))
+app.config['PASSWORD_HASH_TIMEOUT'] = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+# ⬇️ JWT 라우트용 사용자 캐시 (다른 프로세스의 변경은 TTL 안에 반영)
+app.config['USER_CACHE_SIZE'] = int(os.environ.get('USER_CACHE_SIZE', 1024))
+app.config['USER_CACHE_TTL'] = float(os.environ.get('USER_CACHE_TTL', 30))
+
+# ⬇️ 프로필 사진 저장소 (내용 해시 파일명, 썸네일은 백그라운드에서 생성)
+app.config['PROFILE_IMAGE_DIR'] = os.environ.get(  # 상대 경로는 이 파일이 있는 폴더 기준
+    'PROFILE_IMAGE_DIR', os.path.join(os.path.dirname(__file__), 'uploads', 'profiles'))
+app.config['PROFILE_IMAGE_MAX_BYTES'] = int(os.environ.get('PROFILE_IMAGE_MAX_BYTES', 5 * 1024 * 1024))
+app.config['PROFILE_IMAGE_MAX_DIMENSION'] = int(os.environ.get('PROFILE_IMAGE_MAX_DIMENSION', 4096))
+app.config['PROFILE_THUMBNAIL_SIZES'] = (128, 256)
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# ⬇️ 요청 프로파일러 (PROFILE_TOKEN 또는 PROFILE_SAMPLE_RATE를 지정할 때만 켜짐)
+app.config['PROFILE_TOKEN'] = os.environ.get('PROFILE_TOKEN')
+app.config['PROFILE_SAMPLE_RATE'] = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+app.config['PROFILE_MODE'] = os.environ.get('PROFILE_MODE', 'cprofile')  # cprofile | sample
+app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR', 'request_profiles')
+app.config['PROFILE_MAX_FILES'] = int(os.environ.get('PROFILE_MAX_FILES', 50))
+
 # ⬇️ 확장 객체 초기화
 db.init_app(app)
 bcrypt.init_app(app)
+password_hasher.init_app(app)
+user_cache.init_app(app)
+profile_images.init_app(app)
+request_profiler.init_app(app)
 jwt = JWTManager(app)
 
+# ⬇️ LLM 검색 파라미터 캐시 (LLM_CACHE_PATH를 지정하면 재시작 후에도 유지)
+llm_cache = SearchParamCache(
+    max_entries=int(os.environ.get('LLM_CACHE_SIZE', 1024)),
+    ttl_seconds=float(os.environ.get('LLM_CACHE_TTL', 24 * 60 * 60)),
+    persist_path=os.environ.get('LLM_CACHE_PATH'),
+)
+
+# ⬇️ LLM 응답 제한 시간과 차단기 (넘기거나 연속 실패하면 규칙 기반 분석으로 응답)
+llm_deadline = float(os.environ.get('LLM_DEADLINE_SECONDS', 2.5))
+llm_breaker = CircuitBreaker(
+    failure_threshold=int(os.environ.get('LLM_BREAKER_FAILURES', 5)),
+    cooldown_seconds=float(os.environ.get('LLM_BREAKER_COOLDOWN', 30)),
+)
+
 # Gemini API 키를 환경 변수에서 가져옵니다.
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
 if not GEMINI_API_KEY or GEMINI_API_KEY == "YOUR_GEMINI_API_KEY":
-    llm_processor = LLMProcessor(api_key="SIMULATED_KEY")
+    GEMINI_API_KEY = "SIMULATED_KEY"
+llm_processor = LLMProcessor(
+    api_key=GEMINI_API_KEY,
+    cache=llm_cache,
+    deadline_seconds=llm_deadline if llm_deadline > 0 else None,
+    breaker=llm_breaker,
+    intent_threshold=float(os.environ.get('LLM_INTENT_THRESHOLD', 0.75)),
+)
+
+# ⬇️ 시설 조회용 읽기 연결 풀 (SQLAlchemy와 같은 DB 파일 사용)
+DB_PATH = sqlite_path_from_uri(app.config['SQLALCHEMY_DATABASE_URI'])
+enable_wal(DB_PATH)
+ensure_indexes(DB_PATH)  # OpeningHours/HolidayInfo Facility_ID 인덱스
+fts_enabled = ensure_fts_index(DB_PATH)  # text_filter용 FTS5 인덱스
+ensure_change_log(DB_PATH)  # 시설 변경 기록 트리거 (서버를 다시 시작하지 않고 인덱스에 반영)
+read_pool = ReadConnectionPool(DB_PATH)
+
+# ⬇️ /api/filter, /api/districts, 시설 상세 응답 캐시
+#    시설/구 데이터가 바뀌면 무효화 (users 쪽 쓰기는 무시, 인덱스를 바꿔 끼울 때도 무효화)
+response_cache = ResponseCache(
+    DataVersion(DB_PATH, check_interval=float(os.environ.get('RESPONSE_CACHE_CHECK_INTERVAL', 1.0)),
+                tables=FACILITY_TABLES + ('districts',), change_log_seq=change_log_seq,
+                tracked_tables=FACILITY_TABLES),
+    max_bytes=int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+)
+CACHE_MAX_AGE_FILTER = 60        # 초
+CACHE_MAX_AGE_DISTRICTS = 3600
+CACHE_MAX_AGE_FACILITY = 300
+CACHE_MAX_AGE_MAP = 60
+
+# ⬇️ 위치 검색용 공간 인덱스와 open_now / open_at 필터용 영업시간 인덱스
+#    바이너리 스냅샷이 DB와 같은 데이터면 mmap으로 바로 쓰고, 없거나 오래됐으면 SQLite에서 구축한 뒤 스냅샷을 새로 씀
+FACILITY_FETCH_CHUNK = 500  # IN 절 하나에 넣을 최대 ID 개수
+STREAM_CHUNK = 50           # 스트리밍 응답에서 한 번에 읽을 시설 수
+SNAPSHOT_PATH = os.environ.get('FACILITY_SNAPSHOT_PATH') or default_snapshot_path(DB_PATH)
+# DB가 바뀌면 바뀐 시설만 두 인덱스에 반영해 통째로 바꿔 끼움 (요청은 facility_data.current를 한 번 읽어 씀)
+facility_data = FacilityReloader(
+    DB_PATH,
+    interval=float(os.environ.get('FACILITY_RELOAD_INTERVAL', 2.0)),
+    max_incremental=int(os.environ.get('FACILITY_RELOAD_MAX_INCREMENTAL', 5000)),
+    on_swap=response_cache.version_source.bump,
+)
+facility_snapshot, _source_fingerprint = load_snapshot(
+    SNAPSHOT_PATH, DB_PATH, verify=os.environ.get('FACILITY_SNAPSHOT_VERIFY', '1') != '0')
+if facility_snapshot is not None:
+    facility_data.publish(facility_snapshot.facility_index(), facility_snapshot.opening_hours())
 else:
-    llm_processor = LLMProcessor(api_key=GEMINI_API_KEY)
+    facility_data.publish(FacilityGridIndex.from_db(DB_PATH), OpeningHoursIndex.from_db(DB_PATH))
+    if os.environ.get('FACILITY_SNAPSHOT_WRITE', '1') != '0':
+        try:
+            export_snapshot(DB_PATH, SNAPSHOT_PATH, facility_data.current.opening_hours,
+                            fingerprint=_source_fingerprint)
+        except (OSError, SnapshotError) as e:
+            print(f"[스냅샷] 저장 실패: {e}")
+facility_data.start()
+
+# ⬇️ /api/map 클러스터 피라미드 (시설 인덱스 버전마다 한 번 구축)
+map_clusters = PyramidCache()
+MAP_MAX_POINTS = int(os.environ.get('MAP_MAX_POINTS', 500))  # 개별 시설이 이보다 많으면 가장 세밀한 클러스터로 응답
+
+# ⬇️ fields 파라미터로 고를 수 있는 시설 필드 (검색 결과에는 distance_km 추가)
+with read_pool.connection() as _conn:
+    FACILITY_FIELDS = frozenset(facility_fields(_conn))
+SEARCH_FIELDS = FACILITY_FIELDS | {'distance_km'}
+DETAIL_EXTRA_FIELDS = frozenset({'opening_hours', 'holidays'})  # 상세 API에만 붙는 필드
+DETAIL_FIELDS = FACILITY_FIELDS | DETAIL_EXTRA_FIELDS
 
-def get_haversine_distance(lat1, lon1, lat2, lon2):
-    R = 6371  # 지구 반지름 (km)
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    delta_phi = math.radians(lat2 - lat1)
-    delta_lambda = math.radians(lon2 - lon1)
-    a = math.sin(delta_phi / 2)**2 + \
-        math.cos(phi1) * math.cos(phi2) * \
-        math.sin(delta_lambda / 2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
+# ⬇️ /metrics에 함께 내보낼 기존 통계 (읽을 때만 stats()를 호출)
+metrics.register_stats('animalloo_response_cache', response_cache.stats,
+                       counters={"hits": "응답 캐시 적중", "misses": "응답 캐시 미스",
+                                 "not_modified": "304 응답", "evictions": "용량 초과로 제거"},
+                       gauges={"entries": "캐시된 응답 수", "bytes": "캐시 사용 바이트"})
+metrics.register_stats('animalloo_llm_cache', llm_cache.stats,
+                       counters={"hits": "LLM 파라미터 캐시 적중", "persistent_hits": "디스크 캐시 적중",
+                                 "misses": "LLM 파라미터 캐시 미스"})
+metrics.register_stats('animalloo_llm', llm_processor.stats,
+                       counters={"timeouts": "LLM 제한 시간 초과", "errors": "LLM 오류",
+                                 "fallbacks": "규칙 기반 분석으로 대체", "local_hits": "LLM 없이 키워드 분석으로 처리"})
+metrics.register_stats('animalloo_db_pool', read_pool.stats,
+                       counters={"created": "새로 연 읽기 연결", "checkouts": "연결 대여", "reused": "재사용한 연결"},
+                       gauges={"open": "열린 연결 수", "in_use": "사용 중인 연결 수", "idle": "유휴 연결 수"})
+metrics.register_stats('animalloo_facility_reload', facility_data.stats,
+                       counters={"incremental_reloads": "변경분만 반영한 횟수", "full_reloads": "인덱스 전체 재구축 횟수",
+                                 "changed_facilities": "반영한 시설 변경 수", "errors": "반영 실패"},
+                       gauges={"version": "인덱스 버전", "facilities": "인덱스 행 수 (삭제 표시 포함)",
+                               "pending_compaction_rows": "정리 대기 중인 삭제 행 수"})
+metrics.register_stats('animalloo_map_clusters', map_clusters.stats,
+                       counters={"builds": "클러스터 피라미드 구축 횟수"},
+                       gauges={"facilities": "피라미드의 시설 수", "entries": "(칸, 카테고리) 집계 행 수",
+                               "bytes": "피라미드 배열 바이트"})
+metrics.register_stats('animalloo_user_cache', user_cache.stats,
+                       counters={"hits": "사용자 캐시 적중", "misses": "사용자 캐시 미스"},
+                       gauges={"entries": "캐시된 사용자 수"})
+metrics.register_stats('animalloo_password_hasher', password_hasher.stats,
+                       counters={"submitted": "해시 작업 수", "rejected": "대기열 초과로 거절(503)",
+                                 "timeouts": "해시 시간 초과"},
+                       gauges={"in_flight": "처리 중인 해시 작업 수"})
 
 
-def query_db_by_district(district: str, categories: list) -> list:
+def query_db_by_district(district: str, categories: list, fields: tuple = None, open_at=None) -> list:
     """
     (Req 3) '구' 이름과 카테고리 목록으로 DB를 검색합니다.
+    fields가 있으면 해당 필드만 조회해 반환하고, open_at이 있으면 그 시각에 영업 중인 시설만 남깁니다.
     """
-    print(f"[DB 필터] 입력: district={district}, categories={categories}")
-    DB_PATH = '../animalloo_en_db.sqlite'
-    conn = None
-    results = []
+    logger.debug("[DB 필터] 입력: district=%s, categories=%s", district, categories)
     
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        query = "SELECT * FROM facilities WHERE district = ?"
-        query_params = [district]
-        
-        if len(categories) > 0:
-            placeholders = ', '.join('?' for _ in categories)
-            query += f" AND category IN ({placeholders})"
-            query_params.extend(categories)
-        
-        cursor.execute(query, query_params)
-        rows = cursor.fetchall()
-        
-        # ⬇️ 필드명 매핑 추가!
-        field_mapping = {
-            'Facility_ID': 'id',
-            'Name': 'name',
-            'Category': 'category',
-            'District': 'district',
-            'PhoneNumber': 'phone',
-            'LotAddress': 'address',
-            'RoadAddress': 'road_address',
-            'Description': 'description',
-            'Website': 'website',
-            'ParkingAvailable': 'parking_available',
-            'PetFriendly': 'pet_friendly',
-            'AdmissionFeeInfo': 'admission_fee',
-            'PetRestrictions': 'pet_restrictions',
-        }
-        
-        for row in rows:
-            data = dict(row)
-            mapped_data = {}
+        with read_pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None  # 직렬화기가 컬럼 위치로 읽으므로 튜플이면 충분
+            query = f"SELECT {select_list(fields)} FROM facilities WHERE district = ?"
+            query_params = [district]
             
-            # 필드명 매핑
-            for key, value in data.items():
-                new_key = field_mapping.get(key, key)
-                mapped_data[new_key] = value
+            if len(categories) > 0:
+                placeholders = ', '.join('?' for _ in categories)
+                query += f" AND category IN ({placeholders})"
+                query_params.extend(categories)
             
-            # id를 문자열로 변환
-            if 'id' in mapped_data:
-                mapped_data['id'] = str(mapped_data['id'])
-            
-            results.append(mapped_data)
+            cursor.execute(query, query_params)
+            rows = cursor.fetchall()
+            serializer = get_serializer(cursor.description, fields)
+        
+        if open_at is not None:
+            open_ids = facility_data.current.opening_hours.open_ids(open_at)
+            rows = [row for row in rows if row[serializer.id_index] in open_ids]
+        
+        results = serializer.serialize_all(rows)
         
     except sqlite3.Error as e:
-        print(f"[DB 오류] SQLite 오류: {e}")
+        logger.error("[DB 오류] SQLite 오류: %s", e)
         raise e
-    finally:
-        if conn:
-            conn.close()
     
-    print(f"[DB 필터] 최종 {len(results)}개 시설 반환")
-    if results:
-        print(f"[DB 샘플] id={results[0].get('id')}, name={results[0].get('name')}, category={results[0].get('category')}")
+    RESULT_SIZE.observe(len(results), 'filter')
+    logger.debug("[DB 필터] 최종 %d개 시설 반환", len(results))
+    if results and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[DB 샘플] id=%s, name=%s, category=%s",
+                     results[0].get('id'), results[0].get('name'), results[0].get('category'))
     
     return results
 
+def resolve_open_at(open_now, open_at):
+    """
+    open_at(ISO 시각) 또는 open_now(참이면 현재 시각)를 서울 시간 datetime으로 바꿉니다.
+    둘 다 없으면 None(영업 여부로 거르지 않음). 캐시 키가 분 단위로 같도록 초는 버립니다.
+    """
+    if open_at:
+        when = parse_open_at(open_at)
+    elif open_now in (True, 1) or str(open_now).lower() in ('1', 'true', 'yes'):
+        when = now_kst()
+    else:
+        return None
+    return when.replace(second=0, microsecond=0)
+
 def query_all_districts() -> list:
     """
     DB에서 'districts' 테이블의 모든 '구' 목록을 가져옵니다.
     """
-    print(f"[DB 필터] 'districts' 테이블 전체 조회")
-    DB_PATH = '../animalloo_en_db.sqlite'
-    conn = None
+    logger.debug("[DB 필터] 'districts' 테이블 전체 조회")
     results = []
     
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        query = "SELECT * FROM districts ORDER BY name"
-        cursor.execute(query)
-        rows = cursor.fetchall()
+        with read_pool.connection() as conn:
+            cursor = conn.cursor()
+            query = "SELECT * FROM districts ORDER BY name"
+            cursor.execute(query)
+            rows = cursor.fetchall()
         
         for row in rows:
             district_dict = dict(row)
@@ -155,24 +287,72 @@ def query_all_districts() -> list:
                 if district_dict.get('Longitude') is not None:
                     district_dict['Longitude'] = float(district_dict['Longitude'])
             except (ValueError, TypeError):
-                print(f"[DB 경고] 'districts' 좌표 변환 실패: {district_dict.get('name')}")
+                logger.warning("[DB 경고] 'districts' 좌표 변환 실패: %s", district_dict.get('name'))
                 district_dict['Latitude'] = None
                 district_dict['Longitude'] = None
             results.append(district_dict)
     
     except sqlite3.Error as e:
-        print(f"[DB 오류] (districts) SQLite 오류: {e}")
+        logger.error("[DB 오류] (districts) SQLite 오류: %s", e)
         raise e
-    finally:
-        if conn:
-            conn.close()
     
-    print(f"[DB 필터] 최종 {len(results)}개 '구' 반환")
+    logger.debug("[DB 필터] 최종 %d개 '구' 반환", len(results))
     return results
 
+def query_map(cells, categories: list) -> dict:
+    """
+    칸 경계에 맞춘 화면 범위(cells)의 지도 데이터를 반환합니다.
+    MAX_CLUSTER_ZOOM까지는 클러스터 (개수, 무게중심, 카테고리별 개수)를, 더 확대하면 개별 시설의
+    가벼운 정보 (id, 이름, 카테고리, 좌표)를 보냅니다. 상세 정보는 /api/facilities로 따로 읽습니다.
+    """
+    current = facility_data.current  # 클러스터와 개별 시설이 같은 버전의 인덱스를 씀
+    min_lat, min_lon, max_lat, max_lon = bbox = cells.bbox()
+    
+    if cells.zoom > MAX_CLUSTER_ZOOM:
+        positions = current.index.query_bbox(min_lat, min_lon, max_lat, max_lon, categories)
+        if len(positions) <= MAP_MAX_POINTS:
+            snapshot = current.index.snapshot
+            ids = snapshot.ids[positions].tolist()
+            names = {}
+            with read_pool.connection() as conn:
+                for i in range(0, len(ids), FACILITY_FETCH_CHUNK):
+                    chunk = ids[i:i + FACILITY_FETCH_CHUNK]
+                    placeholders = ', '.join('?' for _ in chunk)
+                    names.update(conn.execute(
+                        f"SELECT Facility_ID, Name FROM facilities WHERE Facility_ID IN ({placeholders})", chunk
+                    ).fetchall())
+            points = [
+                {"id": facility_id, "name": names.get(facility_id), "category": snapshot.categories[code],
+                 "lat": lat, "lon": lon}
+                for facility_id, code, lat, lon in zip(
+                    ids, snapshot.category_codes[positions].tolist(),
+                    snapshot.lats[positions].tolist(), snapshot.lons[positions].tolist())
+            ]
+            return {"mode": "points", "zoom": cells.zoom, "bbox": [min_lon, min_lat, max_lon, max_lat],
+                    "total": len(points), "points": points}
+        # 확대했어도 시설이 너무 많으면 (밀집 지역) 가장 세밀한 클러스터로 보냄
+        cells = cell_range(bbox, MAX_CLUSTER_ZOOM)
+    
+    clusters = map_clusters.get(current).clusters(cells, categories)
+    return {"mode": "clusters", "zoom": cells.zoom, "bbox": [min_lon, min_lat, max_lon, max_lat],
+            "total": sum(cluster["count"] for cluster in clusters), "clusters": clusters}
+
 # ⬇️ Blueprint 등록 (auth_bp)
 app.register_blueprint(auth_bp)
 
+# ⬇️ 모든 API 응답 시간 기록 (엔드포인트 이름 기준이라 URL 값과 관계없이 종류가 고정됨)
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        REQUEST_LATENCY.observe(time.perf_counter() - started,
+                                request.endpoint or 'not_found', request.method, str(response.status_code))
+    return response
+
 # --- 4. API 엔드포인트 정의 ---
 @app.route('/api/search', methods=['POST'])
 def handle_search():
@@ -184,41 +364,122 @@ def handle_search():
     if not query or lat is None or lon is None:
         return jsonify({"error": "query, lat, lon은 필수입니다."}), 400
 
-    print(f"[API 요청 수신] 쿼리: '{query}', 위치: ({lat}, {lon})")
+    logger.debug("[API 요청 수신] 쿼리: '%s', 위치: (%s, %s)", query, lat, lon)
+    timer = g.stage_timer = StageTimer(SEARCH_STAGE_LATENCY)
 
     # LLM으로 검색 파라미터 추출
     try:
-        search_params = llm_processor.get_search_parameters(query)
-        print(f"[LLM 분석 완료] 파라미터: {search_params}")
+        with timer.stage('llm'):
+            search_params = llm_processor.get_search_parameters(query)
+        logger.debug("[LLM 분석 완료] 파라미터: %s", search_params)
     except Exception as e:
-        print(f"[LLM 오류] {e}")
+        logger.error("[LLM 오류] %s", e)
         return jsonify({"error": f"LLM 분석 실패: {e}"}), 500
 
+    # 페이지 크기 / 이어받기 cursor / NDJSON 스트리밍 여부
+    try:
+        limit = parse_limit(data.get('limit'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    cursor = data.get('cursor')
+    stream = bool(data.get('stream')) or 'application/x-ndjson' in request.headers.get('Accept', '')
+    try:
+        fields = parse_fields(data.get('fields'), SEARCH_FIELDS)
+        open_at = resolve_open_at(data.get('open_now'), data.get('open_at'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # nearest=N 이면 반경을 넓혀 가며 가장 가까운 N개를 찾습니다.
+    try:
+        nearest = parse_limit(data.get('nearest'))
+        max_radius_km = parse_radius_km(data.get('max_radius_km'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     # DB에서 시설 검색
+    headers = {}
+    try:
+        with timer.stage('rank'):  # 공간 인덱스 거리 계산 + 영업시간/text_filter 거르기
+            if nearest:
+                ranked, effective_radius_km = rank_nearest(lat, lon, search_params, nearest, max_radius_km,
+                                                           open_at=open_at)
+                headers["X-Search-Radius-Km"] = f"{effective_radius_km:.3f}"
+            else:
+                ranked, next_cursor = rank_facilities(lat, lon, search_params, limit=limit, cursor=cursor,
+                                                      open_at=open_at)
+                if next_cursor:
+                    headers["X-Next-Cursor"] = next_cursor
+    except InvalidCursorError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error("[DB 오류] %s", e)
+        return jsonify({"error": f"검색 실패: {e}"}), 500
+
+    if stream:
+        # 순위가 정해진 시설부터 한 줄씩 보내 지도가 먼저 그리기 시작할 수 있게 합니다.
+        def generate():
+            count = 0
+            for facility in iter_facilities(ranked, chunk_size=STREAM_CHUNK, fields=fields, timer=timer):
+                count += 1
+                yield dumps(facility) + b'\n'
+            RESULT_SIZE.observe(count, 'search')
+            timer.observe()
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson', headers=headers)
+
     try:
-        facilities = query_by_location_and_categories(lat, lon, search_params)  # ✅ 새 함수 사용!
-        return jsonify(facilities)
+        facilities = list(iter_facilities(ranked, fields=fields, timer=timer))
+        with timer.stage('serialize'):
+            response = json_response(facilities, headers=headers)
+        RESULT_SIZE.observe(len(facilities), 'search')
+        timer.observe()
+        logger.debug("[위치 검색] %d개 시설 반환", len(facilities))
+        return response
     except Exception as e:
-        print(f"[DB 오류] {e}")
+        logger.error("[DB 오류] %s", e)
         return jsonify({"error": f"검색 실패: {e}"}), 500
 
-@app.route('/api/filter', methods=['POST'])
+@app.route('/api/filter', methods=['GET', 'POST'])
 def handle_filter():
     """
     (Req 3) MapSection '필터링' API ('구' 기반)
+    GET(?district=...&categories=...)으로 부르면 브라우저 조건부 요청(ETag/304)도 사용할 수 있습니다.
     """
-    data = request.json
-    district = data.get('district')
-    categories = data.get('categories', [])
+    if request.method == 'GET':
+        district = request.args.get('district')
+        categories = request.args.getlist('categories')
+        fields = request.args.get('fields')
+        open_now = request.args.get('open_now')
+        open_at = request.args.get('open_at')
+    else:
+        data = request.json
+        district = data.get('district')
+        categories = data.get('categories', [])
+        fields = data.get('fields')
+        open_now = data.get('open_now')
+        open_at = data.get('open_at')
     
     if not district:
         return jsonify({"error": "필수 정보(district)가 누락되었습니다."}), 400
     
+    # 같은 조건은 같은 캐시 키가 되도록 정규화
+    district = district.strip()
+    categories = sorted(set(categories or []))
     try:
-        facilities = query_db_by_district(district, categories)
-        return jsonify(facilities)
+        fields = parse_fields(fields, FACILITY_FIELDS)
+        open_at = resolve_open_at(open_now, open_at)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        return cached_json_response(
+            response_cache, 'filter',
+            {"district": district, "categories": categories, "fields": fields,
+             "open_at": open_at.isoformat() if open_at else None},
+            lambda: query_db_by_district(district, categories, fields, open_at),
+            max_age=CACHE_MAX_AGE_FILTER,
+        )
     except Exception as e:
-        print(f"[DB 오류] {e}")
+        logger.error("[DB 오류] %s", e)
         return jsonify({"error": f"데이터 검색 중 오류 발생: {e}"}), 500
 
 @app.route('/api/districts', methods=['GET'])
@@ -227,137 +488,441 @@ def handle_districts():
     프론트엔드 필터에 사용할 '구' 목록 전체를 반환합니다.
     """
     try:
-        districts = query_all_districts()
-        return jsonify(districts)
+        return cached_json_response(
+            response_cache, 'districts', {}, query_all_districts,
+            max_age=CACHE_MAX_AGE_DISTRICTS,
+        )
     except Exception as e:
-        print(f"[DB 오류] {e}")
+        logger.error("[DB 오류] %s", e)
         return jsonify({"error": f"데이터 검색 중 오류 발생: {e}"}), 500
 
+@app.route('/api/map', methods=['GET'])
+def handle_map():
+    """
+    지도 화면 범위의 시설을 줌에 맞게 클러스터 또는 개별 시설로 반환합니다.
+    ?bbox=min_lon,min_lat,max_lon,max_lat&zoom=(웹 메르카토르 줌 0~21)&categories=... (category=...도 가능)
+    bbox는 줌의 클러스터 칸 경계에 맞춰 넓히므로, 조금씩 움직인 화면은 같은 응답(캐시/ETag)을 받습니다.
+    """
+    bbox = request.args.get('bbox')
+    zoom = request.args.get('zoom')
+    if not bbox or not zoom:
+        return jsonify({"error": "필수 정보(bbox, zoom)가 누락되었습니다."}), 400
+    try:
+        zoom = math.floor(float(zoom))  # 소수 줌(지도 애니메이션 중)은 내려서 씀
+    except (ValueError, OverflowError):
+        return jsonify({"error": "zoom은 숫자여야 합니다."}), 400
+    if not 0 <= zoom <= MAX_ZOOM:
+        return jsonify({"error": f"zoom은 0~{MAX_ZOOM} 사이여야 합니다."}), 400
+    try:
+        cells = cell_range(parse_bbox(bbox), zoom)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    # categories=와 category= 둘 다 받음 (여러 번 넣으면 그중 하나라도 맞는 시설)
+    categories = sorted(set(request.args.getlist('categories') + request.args.getlist('category')))
+
+    try:
+        return cached_json_response(
+            response_cache, 'map', {"cells": list(cells), "categories": categories},
+            lambda: query_map(cells, categories),
+            max_age=CACHE_MAX_AGE_MAP,
+        )
+    except Exception as e:
+        logger.error("[지도 오류] %s", e)
+        return jsonify({"error": f"지도 데이터 조회 중 오류 발생: {e}"}), 500
+
+@app.route('/api/db/stats', methods=['GET'])
+def handle_db_stats():
+    """
+    읽기 연결 풀 사용 현황과 시설 인덱스 갱신 현황을 반환합니다.
+    """
+    return jsonify({**read_pool.stats(), "facility_reload": facility_data.stats()})
+
+@app.route('/api/llm/stats', methods=['GET'])
+def handle_llm_stats():
+    """
+    LLM 단계 통계 (캐시 적중/미스/제거, 제한 시간 초과, 차단기 상태)를 반환합니다.
+    """
+    return jsonify(llm_processor.stats())
+
+@app.route('/api/cache/stats', methods=['GET'])
+def handle_cache_stats():
+    """
+    응답 캐시 적중/미스/304/제거 횟수와 사용 바이트를 반환합니다.
+    """
+    return jsonify(response_cache.stats())
+
+@app.route('/api/auth/stats', methods=['GET'])
+def handle_auth_stats():
+    """
+    비밀번호 해시 작업자 사용 현황 (처리 중, 거절(503), 시간 초과, 재해싱 횟수)과
+    사용자 캐시 적중/미스/무효화 횟수, 프로필 사진 저장/썸네일/정리 현황을 반환합니다.
+    """
+    return jsonify({
+        "password_hasher": password_hasher.stats(),
+        "user_cache": user_cache.stats(),
+        "profile_images": profile_images.stats(),
+    })
+
+@app.route('/api/debug/slow-requests', methods=['GET'])
+def handle_slow_requests():
+    """
+    프로파일러가 켜져 있을 때 최근 요청 중 가장 느린 요청과 검색 단계별 시간, 프로파일 파일 이름을 반환합니다.
+    PROFILE_TOKEN과 같은 값을 X-Profile 헤더로 보내야 하며, 토큰이 없거나 맞지 않으면 404입니다.
+    (요청 경로와 파라미터가 담기므로 PROFILE_TOKEN 없이 샘플링만 켠 경우에도 열지 않음)
+    """
+    if not request_profiler.enabled or not request_profiler.authorized(request.headers.get(PROFILE_HEADER)):
+        return jsonify({"error": "찾을 수 없습니다"}), 404
+    try:
+        limit = parse_limit(request.args.get('limit')) or 20
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"profiler": request_profiler.stats(), "slowest": request_profiler.slowest(limit)})
+
+@app.route('/metrics', methods=['GET'])
+def handle_metrics():
+    """
+    응답 시간/검색 단계별 시간 히스토그램과 캐시/연결 풀 통계를 Prometheus 텍스트 형식으로 반환합니다.
+    """
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
 @app.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    return send_from_directory('uploads', filename)
+    """
+    업로드 파일을 보냅니다. 내용 해시로 저장된 프로필 사진은 바뀌지 않으므로 1년 동안 캐시하게 하고,
+    ?size=128 처럼 요청하면 만들어 둔 썸네일을 보냅니다. (If-None-Match와 Range는 send_file이 처리)
+    """
+    name = filename[len('profiles/'):] if filename.startswith('profiles/') else None
+    parsed = parse_stored_name(name) if name else None
+    if parsed is None:
+        return send_from_directory('uploads', filename)  # 예전 방식으로 저장된 파일
+
+    immutable = True
+    size = request.args.get('size', type=int)
+    if size:
+        thumbnail = profile_images.thumbnail_name(name, size)
+        if thumbnail and os.path.exists(os.path.join(profile_images.root, thumbnail)):
+            name = thumbnail
+        else:
+            immutable = False  # 썸네일이 아직 없으면 원본을 잠깐만 캐시
+
+    digest, thumb_size, _ = parse_stored_name(name)
+    etag = f"{digest}-{thumb_size}" if thumb_size else digest
+    response = send_from_directory(profile_images.root, name, etag=etag,
+                                   max_age=IMMUTABLE_MAX_AGE if immutable else 60)
+    response.cache_control.public = True
+    response.cache_control.immutable = immutable
+    return response
+
+@app.route('/api/facilities', methods=['GET'])
+def get_facilities_batch():
+    """
+    여러 시설의 상세 정보를 한 번에 반환합니다. (?ids=1,2,3)
+    각 항목은 단일 상세 API와 같은 형식이고, 요청한 순서대로 반환합니다. (없는 ID는 제외)
+    """
+    try:
+        facility_ids = parse_facility_ids(request.args.get('ids'))
+        fields = parse_fields(request.args.get('fields'), DETAIL_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        return cached_json_response(
+            response_cache, 'facilities', {"ids": facility_ids, "fields": fields},
+            lambda: load_facility_details(facility_ids, fields),
+            max_age=CACHE_MAX_AGE_FACILITY,
+        )
+    except sqlite3.Error as e:
+        logger.error("[DB 오류] %s", e)
+        return jsonify({"error": f"데이터 검색 중 오류 발생: {e}"}), 500
 
 @app.route('/api/facilities/<int:facility_id>', methods=['GET'])
 def get_facility_detail(facility_id):
     """
-    특정 시설의 상세 정보 반환
+    특정 시설의 상세 정보 반환 (검색 결과와 같은 필드명 + 영업시간/휴무일, ?fields=로 필드 선택)
     """
-    DB_PATH = '../animalloo_en_db.sqlite'
-    conn = None
+    try:
+        fields = parse_fields(request.args.get('fields'), DETAIL_FIELDS)
+    except InvalidFieldsError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    def load():
+        facilities = load_facility_details([facility_id], fields)
+        return facilities[0] if facilities else None
     
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM facilities WHERE id = ?", (facility_id,))
-        row = cursor.fetchone()
-        
-        if row:
-            return jsonify(dict(row)), 200
+        response = cached_json_response(
+            response_cache, 'facility', {"id": facility_id, "fields": fields}, load,
+            max_age=CACHE_MAX_AGE_FACILITY,
+        )
+        if response is not None:
+            return response
         else:
             return jsonify({"error": "시설을 찾을 수 없습니다"}), 404
     
     except sqlite3.Error as e:
-        print(f"[DB 오류] {e}")
+        logger.error("[DB 오류] %s", e)
         return jsonify({"error": f"데이터 검색 중 오류 발생: {e}"}), 500
-    finally:
-        if conn:
-            conn.close()
 
-def query_by_location_and_categories(lat: float, lon: float, search_params: dict) -> list:
+def parse_facility_ids(value) -> list:
+    """?ids=1,2,3 을 중복 없는 정수 목록(요청 순서 유지)으로 바꿉니다."""
+    if not value:
+        raise ValueError("필수 정보(ids)가 누락되었습니다.")
+    try:
+        facility_ids = list(dict.fromkeys(int(v) for v in value.split(',') if v.strip()))
+    except ValueError:
+        raise ValueError(f"ids는 쉼표로 구분한 정수여야 합니다: {value}")
+    if not facility_ids:
+        raise ValueError("필수 정보(ids)가 누락되었습니다.")
+    if len(facility_ids) > MAX_PAGE_SIZE:
+        raise ValueError(f"ids는 한 번에 최대 {MAX_PAGE_SIZE}개까지 요청할 수 있습니다.")
+    return facility_ids
+
+def load_facility_details(facility_ids: list, fields: tuple = None) -> list:
     """
-    위치(위경도)와 카테고리로 시설을 검색합니다.
-    LLM 검색 API용 함수입니다.
+    시설 상세 정보를 요청 순서대로 반환합니다.
+    시설은 IN 쿼리 한 번, 영업시간(OpeningHours)과 휴무일(HolidayInfo)도 테이블마다 IN 쿼리 한 번으로 읽습니다.
     """
-    print(f"[위치 검색] lat={lat}, lon={lon}, params={search_params}")
+    with_hours = fields is None or 'opening_hours' in fields
+    with_holidays = fields is None or 'holidays' in fields
+    columns = None if fields is None else tuple(f for f in fields if f not in DETAIL_EXTRA_FIELDS)
+    
+    by_id = {}
+    hours = {}
+    holidays = {}
+    with read_pool.connection() as conn:
+        for i in range(0, len(facility_ids), FACILITY_FETCH_CHUNK):
+            chunk = facility_ids[i:i + FACILITY_FETCH_CHUNK]
+            placeholders = ', '.join('?' for _ in chunk)
+            
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f"SELECT {select_list(columns)} FROM facilities WHERE Facility_ID IN ({placeholders})", chunk)
+            rows = cursor.fetchall()
+            serializer = get_serializer(cursor.description, columns)
+            for row in rows:
+                by_id[row[serializer.id_index]] = serializer(row)
+            
+            if with_hours:
+                for facility_id, day_of_week, opens, closes in conn.execute(
+                    f"SELECT Facility_ID, DayOfWeek, Opens, Closes FROM OpeningHours "
+                    f"WHERE Facility_ID IN ({placeholders}) ORDER BY Hour_ID", chunk
+                ):
+                    hours.setdefault(facility_id, []).append(
+                        {"day_of_week": day_of_week, "opens": opens, "closes": closes}
+                    )
+            if with_holidays:
+                for facility_id, day_off in conn.execute(
+                    f"SELECT Facility_ID, Day_Off FROM HolidayInfo "
+                    f"WHERE Facility_ID IN ({placeholders}) ORDER BY Holiday_ID", chunk
+                ):
+                    holidays.setdefault(facility_id, []).append(day_off)
     
-    DB_PATH = '../animalloo_en_db.sqlite'
-    conn = None
     results = []
+    for facility_id in facility_ids:
+        facility = by_id.get(facility_id)
+        if facility is None:
+            continue
+        if with_hours:
+            facility['opening_hours'] = hours.get(facility_id, [])
+        if with_holidays:
+            facility['holidays'] = holidays.get(facility_id, [])
+        results.append(facility)
+    return results
+
+def rank_facilities(lat: float, lon: float, search_params: dict, limit: int = None, cursor: str = None,
+                    open_at=None) -> tuple:
+    """
+    위치/카테고리/text_filter 조건에 맞는 시설을 순위대로 골라
+    ([(facility_id, 거리km), ...], 다음 cursor)를 반환합니다.
+    limit이 있으면 전체 정렬 대신 힙으로 상위 limit개만 고릅니다.
+    open_at이 있으면 그 시각에 영업 중인 시설만 남깁니다.
+    """
+    categories = search_params.get('categories', [])
+    search_radius_km = float(search_params.get('search_radius_km', 5.0))
+    text_filter = search_params.get('text_filter')
+    after = decode_cursor(cursor) if cursor else None
     
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # 카테고리 필터링
-        categories = search_params.get('categories', [])
-        search_radius_km = search_params.get('search_radius_km', 5.0)
-        
-        # 1단계: 모든 시설 가져오기
-        if categories:
-            placeholders = ', '.join('?' for _ in categories)
-            query = f"SELECT * FROM facilities WHERE category IN ({placeholders})"
-            cursor.execute(query, categories)
-        else:
-            query = "SELECT * FROM facilities"
-            cursor.execute(query)
-        
-        facilities = cursor.fetchall()
-        
-        # 2단계: 거리 계산 및 필터링
-        for facility in facilities:
-            facility_data = dict(facility)
-            facility_lat = facility_data.get('Latitude')
-            facility_lon = facility_data.get('Longitude')
-            
-            if facility_lat is None or facility_lon is None:
-                continue
+    current = facility_data.current  # 데이터가 갱신되어도 이 요청은 같은 버전의 인덱스를 씀
+    
+    # 1단계: 공간 인덱스 후보 셀의 시설을 배열 연산으로 한 번에 거리 계산
+    matches = current.index.query_radius(float(lat), float(lon), search_radius_km, categories)
+    if open_at is not None:
+        open_ids = current.opening_hours.open_ids(open_at)
+        matches = [m for m in matches if m[0] in open_ids]
+    
+    # 2단계: text_filter가 있으면 FTS로 걸러내고 관련도 + 거리 점수로, 없으면 거리순으로 정렬
+    if text_filter and fts_enabled:
+        with read_pool.connection() as conn:
+            scored = score_by_text(conn, text_filter, matches, search_radius_km)
+        ranked, next_cursor = top_k(scored, key=lambda m: (-m[2], m[1], m[0]), limit=limit, after=after)
+    else:
+        # 같은 거리는 기존 전체 스캔과 같은 ID 순서
+        ranked, next_cursor = top_k(matches, key=lambda m: (round(m[1], 2), m[0]), limit=limit, after=after)
+    
+    return [(m[0], m[1]) for m in ranked], next_cursor
+
+def rank_nearest(lat: float, lon: float, search_params: dict, k: int,
+                 max_radius_km: float = DEFAULT_MAX_RADIUS_KM, open_at=None) -> tuple:
+    """
+    고정 반경 대신 가까운 순서로 k개를 찾습니다. (희귀 카테고리용)
+    격자를 한 고리씩 넓히며 k개를 채우거나 max_radius_km에 닿으면 멈추고,
+    ([(facility_id, 거리km), ...], 실제 사용한 반경km)를 반환합니다.
+    """
+    categories = search_params.get('categories', [])
+    text_filter = search_params.get('text_filter')
+    
+    current = facility_data.current
+    open_ids = current.opening_hours.open_ids(open_at) if open_at is not None else None
+    
+    if text_filter and fts_enabled:
+        # 고리마다 MATCH를 다시 돌지 않도록 요청당 한 번 만든 matcher를 씀
+        with read_pool.connection() as conn:
+            matches_text = text_matcher(conn, text_filter)
             
-            # 거리 계산
-            distance = get_haversine_distance(lat, lon, facility_lat, facility_lon)
+            def accept(ids):
+                if open_ids is not None:
+                    ids = [facility_id for facility_id in ids if facility_id in open_ids]
+                return matches_text(ids)
             
-            # 반경 내에 있는지 확인
-            if distance <= search_radius_km:
-                # 필드명 매핑
-                field_mapping = {
-                    'Facility_ID': 'id',
-                    'Name': 'name',
-                    'Category': 'category',
-                    'District': 'district',
-                    'PhoneNumber': 'phone',
-                    'LotAddress': 'address',
-                    'RoadAddress': 'road_address',
-                    'Description': 'description',
-                    'Website': 'website',
-                    'ParkingAvailable': 'parking_available',
-                    'PetFriendly': 'pet_friendly',
-                    'AdmissionFeeInfo': 'admission_fee',
-                    'PetRestrictions': 'pet_restrictions',
-                }
-                
-                mapped_data = {}
-                for key, value in facility_data.items():
-                    new_key = field_mapping.get(key, key)
-                    mapped_data[new_key] = value
-                
-                # id를 문자열로 변환
-                if 'id' in mapped_data:
-                    mapped_data['id'] = str(mapped_data['id'])
-                
-                # 거리 추가
-                mapped_data['distance_km'] = round(distance, 2)
-                
-                results.append(mapped_data)
+            return current.index.nearest(float(lat), float(lon), k, categories, max_radius_km, accept=accept)
+    
+    accept = None
+    if open_ids is not None:
+        def accept(ids):
+            return open_ids
+    
+    return current.index.nearest(float(lat), float(lon), k, categories, max_radius_km, accept=accept)
+
+def iter_facilities(ranked: list, chunk_size: int = FACILITY_FETCH_CHUNK, fields: tuple = None,
+                    timer: StageTimer = None):
+    """
+    순위가 매겨진 (facility_id, 거리km) 목록의 상세 정보를 chunk 단위로 DB에서 읽어
+    API 형식 dict를 순서대로 하나씩 내보냅니다. (스트리밍 응답에서 그대로 사용)
+    fields가 있으면 해당 필드만 조회해 내보냅니다.
+    timer가 있으면 DB 조회(db_fetch)와 dict 변환(serialize) 시간을 chunk 단위로 더합니다.
+    """
+    with_distance = fields is None or 'distance_km' in fields
+    columns = None if fields is None else tuple(f for f in fields if f != 'distance_km')
+    select = select_list(columns)
+    timer = timer or StageTimer(None)
+    
+    for i in range(0, len(ranked), chunk_size):
+        chunk = ranked[i:i + chunk_size]
+        ids = [facility_id for facility_id, _ in chunk]
+        placeholders = ', '.join('?' for _ in ids)
+        try:
+            with timer.stage('db_fetch'), read_pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = None
+                cursor.execute(f"SELECT {select} FROM facilities WHERE Facility_ID IN ({placeholders})", ids)
+                rows = cursor.fetchall()
+                serializer = get_serializer(cursor.description, columns)
+        except sqlite3.Error as e:
+            logger.error("[DB 오류] %s", e)
+            raise e
         
-        # 거리순 정렬
-        results.sort(key=lambda x: x.get('distance_km', 999))
+        with timer.stage('serialize'):
+            id_index = serializer.id_index
+            rows_by_id = {row[id_index]: row for row in rows}
+            facilities = []
+            for facility_id, distance in chunk:
+                row = rows_by_id.get(facility_id)
+                if row is None:
+                    continue
+                
+                facility = serializer(row)
+                if with_distance:
+                    facility['distance_km'] = round(distance, 2)
+                facilities.append(facility)
         
-    except sqlite3.Error as e:
-        print(f"[DB 오류] {e}")
-        raise e
-    finally:
-        if conn:
-            conn.close()
+        yield from facilities
+
+def query_by_location_and_categories(lat: float, lon: float, search_params: dict) -> list:
+    """
+    위치(위경도)와 카테고리로 시설을 검색합니다.
+    LLM 검색 API용 함수입니다.
+    """
+    logger.debug("[위치 검색] lat=%s, lon=%s, params=%s", lat, lon, search_params)
     
-    print(f"[위치 검색] {len(results)}개 시설 반환 (반경 {search_radius_km}km)")
+    ranked, _ = rank_facilities(lat, lon, search_params)
+    results = list(iter_facilities(ranked))
+    
+    logger.debug("[위치 검색] %d개 시설 반환 (반경 %skm)", len(results), search_params.get('search_radius_km', 5.0))
     return results
 
 
-# --- 5. 서버 실행 ---
-if __name__ == '__main__':
+# --- 5. 서버 시작 준비 (개발 서버와 wsgi.py가 함께 씀) ---
+# 키워드 분석만으로 끝나는 검색어라 워밍업 중에 LLM API를 부르지 않습니다.
+WARM_UP_QUERIES = ('근처 동물병원', '24시 동물병원', '애견카페')
+
+
+def init_database():
+    """사용자 테이블을 만들고 이전 즐겨찾기를 옮깁니다. (여러 번 실행해도 안전)"""
     with app.app_context():
         db.create_all()
+        migrate_favorite_hospitals()  # 이전 JSON 즐겨찾기 -> user_favorites
+
+
+def warm_up() -> dict:
+    """
+    대표 요청을 테스트 클라이언트로 한 번씩 보내 지연 import, 직렬화기, SQLite 페이지 캐시 등을 미리 데웁니다.
+    요청별 (상태 코드, 소요 ms)를 반환하며, 워밍업 요청은 /metrics 지표에 남기지 않습니다.
+    """
+    with read_pool.connection() as conn:
+        row = conn.execute(
+            "SELECT Facility_ID, District, Latitude, Longitude FROM Facilities "
+            "WHERE Latitude IS NOT NULL AND Longitude IS NOT NULL ORDER BY Facility_ID LIMIT 1"
+        ).fetchone()
+    if row is None:
+        return {}
+    facility_id, district, lat, lon = row
+
+    warm_requests = [
+        ('districts', 'GET', '/api/districts', {}),
+        ('filter', 'GET', '/api/filter', {"query_string": {"district": district}}),
+        ('facility', 'GET', f'/api/facilities/{facility_id}', {}),
+        ('facilities', 'GET', '/api/facilities', {"query_string": {"ids": str(facility_id)}}),
+        ('map', 'GET', '/api/map', {"query_string": {"bbox": f"{lon - 0.1},{lat - 0.1},{lon + 0.1},{lat + 0.1}",
+                                                      "zoom": 11}}),  # 클러스터 피라미드 구축
+    ]
+    for query in WARM_UP_QUERIES:
+        warm_requests.append((f'search {query}', 'POST', '/api/search',
+                              {"json": {"query": query, "lat": lat, "lon": lon, "limit": 20}}))
+    warm_requests.append(('search nearest', 'POST', '/api/search',
+                          {"json": {"query": WARM_UP_QUERIES[0], "lat": lat, "lon": lon, "nearest": 5}}))
+
+    timings = {}
+    client = app.test_client()
+    for name, method, path, kwargs in warm_requests:
+        started = time.perf_counter()
+        response = client.open(path, method=method, **kwargs)
+        response.get_data()  # 스트리밍 응답도 끝까지 읽음
+        timings[name] = (response.status_code, round((time.perf_counter() - started) * 1000, 1))
+    metrics.reset()
+    return timings
+
+
+def release_before_fork():
+    """
+    작업자를 fork하기 전에 마스터가 연 DB 연결을 닫습니다. 작업자는 처음 쓸 때 자기 연결을 엽니다.
+    공간/영업시간 인덱스 같은 읽기 전용 데이터는 그대로 두어 작업자들이 copy-on-write로 함께 씁니다.
+    """
+    read_pool.close_all()
+    with app.app_context():
+        db.engine.dispose()
+
+
+def restart_after_fork():
+    """
+    gunicorn 작업자가 fork된 직후(post_fork) 부모에만 있던 백그라운드 스레드(로그 출력, 시설 변경 감시)를 다시 띄웁니다.
+    os.register_at_fork를 쓰지 않으므로 비밀번호 해시 풀 같은 다른 자식 프로세스에서는 실행되지 않습니다.
+    """
+    restart_logging_in_child()
+    facility_data.restart_in_child()
+
+
+# --- 6. 서버 실행 (개발용, 운영은 gunicorn -c gunicorn.conf.py wsgi:app) ---
+if __name__ == '__main__':
+    init_database()
     print("Animalloo 백엔드 서버를 시작합니다...")
     app.run(host='0.0.0.0', port=5001, debug=True)
@@ -1,21 +1,33 @@
 from flask import Blueprint, request, jsonify
-from models import db, bcrypt, User
+from models import db, User, UserFavorite
 from flask_jwt_extended import (
     create_access_token, 
     jwt_required, 
-    get_jwt_identity,
-    verify_jwt_in_request
+    get_jwt
 )
-from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
-import os
-from werkzeug.utils import secure_filename
+from sqlalchemy import bindparam, text
+from serializers import get_serializer
+from password_hasher import HasherBusyError, password_hasher
+from auth_context import current_user, user_cache, user_claims, user_required
+from profile_images import ImageRejectedError, profile_images
+from log_queue import logger
 # 'auth'라는 이름의 Blueprint를 생성합니다.
 auth_bp = Blueprint('auth', __name__, url_prefix='/api')
-UPLOAD_FOLDER = 'uploads/profiles'
+PROFILE_URL_PREFIX = "http://localhost:5001/uploads/profiles/"
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+def collect_profile_image(previous_url, current_url, user_id):
+    # 이전 프로필 사진을 더 이상 아무도 쓰지 않으면 썸네일과 함께 지웁니다.
+    # (사용 여부는 저장소 잠금 안에서 확인하므로, 같은 사진을 막 올린 다른 사용자의 파일을 지우지 않음)
+    if not previous_url or previous_url == current_url or not previous_url.startswith(PROFILE_URL_PREFIX):
+        return
+    name = previous_url[len(PROFILE_URL_PREFIX):]
+    profile_images.remove(name, in_use=lambda: User.query.filter_by(profile_url=previous_url).count() > 0)
+    profile_images.remove_legacy(name, user_id)
+def busy_response(e):
+    # 비밀번호 해시 작업자가 모두 바쁠 때 (잠시 후 재시도 안내)
+    return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
 # --- 회원가입 API ---
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -31,8 +43,11 @@ def register():
     if existing_user:
         return jsonify({"error": "이미 존재하는 아이디입니다."}), 409
 
-    # 비밀번호 해싱
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    # 비밀번호 해싱 (작업자 프로세스에서 실행)
+    try:
+        hashed_password = password_hasher.hash(password)
+    except HasherBusyError as e:
+        return busy_response(e)
     
     new_user = User(username=username, password_hash=hashed_password)
     
@@ -42,7 +57,7 @@ def register():
         return jsonify({"message": "회원가입 성공"}), 201
     except Exception as e:
         db.session.rollback()
-        print(f"[DB 오류] 회원가입 실패: {e}")
+        logger.exception("[DB 오류] 회원가입 실패: %s", e)
         return jsonify({"error": "서버 오류로 회원가입에 실패했습니다."}), 500
 
 
@@ -58,82 +73,76 @@ def login():
 
     user = User.query.filter_by(username=username).first()
 
-    if user and bcrypt.check_password_hash(user.password_hash, password):
+    try:
+        verified = user is not None and password_hasher.verify(user.password_hash, password)
+    except HasherBusyError as e:
+        return busy_response(e)
+
+    if verified:
+        # 이전 cost로 만든 해시는 로그인에 성공한 김에 현재 설정으로 다시 해싱
+        if password_hasher.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = password_hasher.hash(password)
+                db.session.commit()
+                password_hasher.record_rehash()
+            except HasherBusyError:
+                pass  # 다음 로그인 때 다시 시도
+            except Exception as e:
+                db.session.rollback()
+                logger.exception("[DB 오류] 비밀번호 재해싱 실패: %s", e)
+        
         # JWT 토큰 생성 (user.id를 문자열로 변환!)
-        access_token = create_access_token(identity=str(user.id))  # ⬅️ str() 추가!
+        access_token = create_access_token(identity=str(user.id), additional_claims=user_claims(user))  # ⬅️ str() 추가!
         return jsonify(access_token=access_token), 200
     else:
         return jsonify({"error": "아이디 또는 비밀번호가 잘못되었습니다."}), 401
 
 
 # --- 보호된 API (마이페이지용) ---
+# 토큰 검증과 만료/잘못된 토큰 응답은 다른 로그인 API와 같이 flask_jwt_extended에 맡김
 @auth_bp.route('/protected', methods=['GET'])
+@jwt_required()
 def protected():
-    print("=" * 50)
-    print("🔑 받은 Authorization 헤더:", request.headers.get("Authorization"))
-    
-    try:
-        verify_jwt_in_request()
-        
-        current_user_id = get_jwt_identity()
-        print("✅ JWT 검증 성공! 사용자 ID:", current_user_id)
-        
-        user = User.query.get(int(current_user_id))
-        if not user:
-            print("❌ 사용자를 DB에서 찾을 수 없음")
-            return jsonify({"error": "사용자를 찾을 수 없습니다"}), 404
-            
-        print("✅ 사용자 찾음:", user.username)
-        
-        # ⬇️ nickname도 함께 반환
+    # 토큰에 사용자 정보가 들어 있으면 DB 조회 없이 바로 응답
+    claims = get_jwt()
+    if 'username' in claims:
         return jsonify(
-            logged_in_as=user.username,  # 로그인 ID
-            nickname=user.nickname or user.username  # 닉네임 (없으면 username)
+            logged_in_as=claims['username'],
+            nickname=claims.get('nickname') or claims['username']
         ), 200
-        
-    except ExpiredSignatureError:
-        print("❌ 토큰 만료")
-        return jsonify({"error": "토큰이 만료되었습니다"}), 401
-    except InvalidTokenError as e:
-        print(f"❌ 유효하지 않은 토큰: {e}")
-        return jsonify({"error": "유효하지 않은 토큰입니다"}), 422
-    except Exception as e:
-        print(f"❌ 예상치 못한 오류: {e}")
-        return jsonify({"error": str(e)}), 500
+    
+    # 사용자 정보가 없는 예전 토큰은 캐시를 거쳐 조회
+    user = current_user()
+    if not user:
+        return jsonify({"error": "사용자를 찾을 수 없습니다"}), 404
+    
+    # ⬇️ nickname도 함께 반환
+    return jsonify(
+        logged_in_as=user.username,  # 로그인 ID
+        nickname=user.nickname or user.username  # 닉네임 (없으면 username)
+    ), 200
 
 @auth_bp.route('/profile', methods=['GET'])
-def get_profile():
+@user_required
+def get_profile(user):
     try:
-        verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user:
-            return jsonify({"error": "사용자를 찾을 수 없습니다"}), 404
-        
         return jsonify({
             "username": user.username,  # 로그인 ID
             "nickname": user.nickname or user.username,  # 닉네임
             "profile_url": user.profile_url,
-            "favorite_hospitals": user.favorite_hospitals or []
+            "favorite_hospitals": list(user.favorite_ids)
         }), 200
         
     except Exception as e:
-        print(f"❌ 프로필 조회 오류: {e}")
+        logger.exception("[인증 오류] 프로필 조회 오류: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
 # --- 프로필 사진 업로드 ---
 @auth_bp.route('/profile/upload', methods=['POST'])
-def upload_profile_pic():
+@user_required
+def upload_profile_pic(user):
     try:
-        verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user:
-            return jsonify({"error": "사용자를 찾을 수 없습니다"}), 404
-        
         # 파일 확인
         if 'file' not in request.files:
             return jsonify({"error": "파일이 없습니다"}), 400
@@ -142,39 +151,48 @@ def upload_profile_pic():
         if file.filename == '':
             return jsonify({"error": "파일이 선택되지 않았습니다"}), 400
         
+        if request.content_length and request.content_length > profile_images.max_bytes + 64 * 1024:
+            return jsonify({"error": "파일이 너무 큽니다"}), 413
+
         if file and allowed_file(file.filename):
-            # 파일명 생성 (user_id + timestamp)
-            filename = secure_filename(f"user_{current_user_id}_{int(os.path.getmtime(__file__))}.{file.filename.rsplit('.', 1)[1].lower()}")
-            filepath = os.path.join(UPLOAD_FOLDER, filename)
-            file.save(filepath)
-            
+            # 내용의 해시를 파일명으로 저장 (같은 사용자가 다시 올려도 URL이 바뀌어 캐시가 꼬이지 않음)
+            try:
+                staged = profile_images.stage(file.stream)
+            except ImageRejectedError as e:
+                return jsonify({"error": str(e)}), e.status
+
             # URL 생성 (백엔드 서버 기준)
-            profile_url = f"http://localhost:5001/uploads/profiles/{filename}"
-            
-            # DB 업데이트
-            user.profile_url = profile_url
-            db.session.commit()
-            
-            return jsonify({"profile_url": profile_url}), 200
+            profile_url = f"{PROFILE_URL_PREFIX}{staged.name}"
+            previous_url = user.profile_url
+
+            # DB 업데이트 후 파일을 옮김 (공유 파일을 다른 사용자가 지우는 중이어도 커밋 뒤에 다시 놓임)
+            try:
+                User.query.filter_by(id=user.id).update({"profile_url": profile_url})
+                db.session.commit()
+                profile_images.publish(staged)
+            finally:
+                profile_images.discard(staged)
+            user_cache.invalidate(user.id)
+            collect_profile_image(previous_url, profile_url, user.id)
+
+            # 토큰의 프로필 정보도 새 값으로 다시 발급
+            access_token = create_access_token(
+                identity=str(user.id), additional_claims={**user_claims(user), "profile_url": profile_url}
+            )
+            return jsonify({"profile_url": profile_url, "access_token": access_token}), 200
         
         return jsonify({"error": "허용되지 않는 파일 형식입니다"}), 400
         
     except Exception as e:
-        print(f"❌ 프로필 사진 업로드 오류: {e}")
+        logger.exception("[인증 오류] 프로필 사진 업로드 오류: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
 # --- 닉네임 변경 ---
 @auth_bp.route('/profile/nickname', methods=['PUT'])  # ⬅️ URL 변경
-def update_nickname():
+@user_required
+def update_nickname(user):
     try:
-        verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user:
-            return jsonify({"error": "사용자를 찾을 수 없습니다"}), 404
-        
         data = request.json
         new_nickname = data.get('nickname')  # ⬅️ 'nickname'으로 변경
         
@@ -182,95 +200,183 @@ def update_nickname():
             return jsonify({"error": "닉네임을 입력해주세요"}), 400
         
         # ⬇️ nickname 필드 업데이트 (username은 변경 안 함!)
-        user.nickname = new_nickname
+        User.query.filter_by(id=user.id).update({"nickname": new_nickname})
         db.session.commit()
+        user_cache.invalidate(user.id)
         
-        return jsonify({"message": "닉네임이 변경되었습니다"}), 200
+        # 토큰의 닉네임도 새 값으로 다시 발급
+        access_token = create_access_token(
+            identity=str(user.id), additional_claims={**user_claims(user), "nickname": new_nickname}
+        )
+        return jsonify({"message": "닉네임이 변경되었습니다", "access_token": access_token}), 200
         
     except Exception as e:
-        print(f"❌ 닉네임 변경 오류: {e}")
+        logger.exception("[인증 오류] 닉네임 변경 오류: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
 # --- 비밀번호 변경 ---
 @auth_bp.route('/profile/password', methods=['PUT'])
-def update_password():
+@user_required
+def update_password(user):
     try:
-        verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user:
-            return jsonify({"error": "사용자를 찾을 수 없습니다"}), 404
-        
         data = request.json
         new_password = data.get('password')
         
         if not new_password or len(new_password) < 6:
             return jsonify({"error": "비밀번호는 최소 6자 이상이어야 합니다"}), 400
         
-        # 비밀번호 해싱
-        hashed_password = bcrypt.generate_password_hash(new_password).decode('utf-8')
-        user.password_hash = hashed_password
+        # 비밀번호 해싱 (작업자 프로세스에서 실행)
+        try:
+            hashed_password = password_hasher.hash(new_password)
+        except HasherBusyError as e:
+            return busy_response(e)
+        User.query.filter_by(id=user.id).update({"password_hash": hashed_password})
         db.session.commit()
+        user_cache.invalidate(user.id)
         
         return jsonify({"message": "비밀번호가 변경되었습니다"}), 200
         
     except Exception as e:
-        print(f"❌ 비밀번호 변경 오류: {e}")
+        logger.exception("[인증 오류] 비밀번호 변경 오류: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+# --- 즐겨찾기 (user_favorites 테이블) ---
+MAX_BULK_FAVORITES = 500
+
+_ADD_FAVORITES_SQL = text(
+    "INSERT OR IGNORE INTO user_favorites (user_id, facility_id, created_at) "
+    "SELECT :user_id, Facility_ID, CURRENT_TIMESTAMP FROM facilities WHERE Facility_ID IN :ids"
+).bindparams(bindparam('ids', expanding=True))
+
+_FAVORITE_DETAILS_SQL = text(
+    "SELECT f.*, uf.created_at AS favorited_at FROM user_favorites uf "
+    "JOIN facilities f ON f.Facility_ID = uf.facility_id "
+    "WHERE uf.user_id = :user_id ORDER BY uf.created_at DESC, uf.facility_id"
+)
+
+def parse_facility_ids(values) -> list:
+    """요청의 시설 ID(숫자 또는 숫자 문자열) 목록을 중복 없는 정수 목록으로 바꿉니다."""
+    if values is None:
+        return []
+    if not isinstance(values, list):
+        values = [values]
+    try:
+        facility_ids = list(dict.fromkeys(int(v) for v in values))
+    except (TypeError, ValueError):
+        raise ValueError("병원 ID는 정수여야 합니다")
+    if len(facility_ids) > MAX_BULK_FAVORITES:
+        raise ValueError(f"한 번에 최대 {MAX_BULK_FAVORITES}개까지 처리할 수 있습니다")
+    return facility_ids
+
+def add_favorites(user_id: int, facility_ids: list) -> int:
+    """
+    facilities에 있는 시설만 한 문장으로 추가합니다. 이미 있는 항목은 기본키 충돌로 무시됩니다.
+    새로 추가된 개수를 반환합니다.
+    """
+    if not facility_ids:
+        return 0
+    result = db.session.execute(_ADD_FAVORITES_SQL, {"user_id": user_id, "ids": facility_ids})
+    db.session.commit()
+    if result.rowcount:
+        user_cache.invalidate(user_id)
+    return result.rowcount
+
+def remove_favorites(user_id: int, facility_ids: list) -> int:
+    """삭제된 개수를 반환합니다."""
+    if not facility_ids:
+        return 0
+    removed = UserFavorite.query.filter(
+        UserFavorite.user_id == user_id, UserFavorite.facility_id.in_(facility_ids)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    if removed:
+        user_cache.invalidate(user_id)
+    return removed
+
+
+# --- 즐겨찾는 병원 목록 (시설 상세 포함) ---
+@auth_bp.route('/favorites', methods=['GET'])
+@user_required
+def list_favorites(user):
+    try:
+        # 즐겨찾기와 시설 정보를 JOIN 한 번으로 조회 (최근 추가 순)
+        result = db.session.execute(_FAVORITE_DETAILS_SQL, {"user_id": user.id})
+        serializer = get_serializer([(key,) for key in result.keys()])
+        return jsonify(serializer.serialize_all(result.fetchall())), 200
+        
+    except Exception as e:
+        logger.exception("[즐겨찾기 오류] 조회 실패: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
 # --- 즐겨찾는 병원 추가 ---
 @auth_bp.route('/favorites', methods=['POST'])
-def add_favorite():
+@user_required
+def add_favorite(user):
     try:
-        verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user:
-            return jsonify({"error": "사용자를 찾을 수 없습니다"}), 404
-        
         data = request.json
         hospital_id = data.get('hospital_id')
         
         if not hospital_id:
             return jsonify({"error": "병원 ID가 필요합니다"}), 400
         
-        # 즐겨찾기 목록 업데이트
-        favorites = user.favorite_hospitals or []
-        if hospital_id not in favorites:
-            favorites.append(hospital_id)
-            user.favorite_hospitals = favorites
-            db.session.commit()
+        try:
+            facility_ids = parse_facility_ids(hospital_id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        added = add_favorites(user.id, facility_ids)
         
-        return jsonify({"message": "즐겨찾기에 추가되었습니다"}), 200
+        return jsonify({"message": "즐겨찾기에 추가되었습니다", "added": added}), 200
         
     except Exception as e:
-        print(f"❌ 즐겨찾기 추가 오류: {e}")
+        db.session.rollback()
+        logger.exception("[즐겨찾기 오류] 추가 실패: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
 # --- 즐겨찾는 병원 제거 ---
 @auth_bp.route('/favorites/<int:hospital_id>', methods=['DELETE'])
-def remove_favorite(hospital_id):
+@user_required
+def remove_favorite(user, hospital_id):
     try:
-        verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
+        removed = remove_favorites(user.id, [hospital_id])
         
-        if not user:
-            return jsonify({"error": "사용자를 찾을 수 없습니다"}), 404
+        return jsonify({"message": "즐겨찾기에서 제거되었습니다", "removed": removed}), 200
         
-        favorites = user.favorite_hospitals or []
-        if hospital_id in favorites:
-            favorites.remove(hospital_id)
-            user.favorite_hospitals = favorites
-            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("[즐겨찾기 오류] 제거 실패: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+# --- 즐겨찾는 병원 여러 개 추가/제거 ---
+@auth_bp.route('/favorites/bulk', methods=['POST', 'DELETE'])
+@user_required
+def bulk_favorites(user):
+    """
+    {"hospital_ids": [1, 2, 3]} 를 한 번에 추가(POST)하거나 제거(DELETE)합니다.
+    """
+    try:
+        data = request.json or {}
+        try:
+            facility_ids = parse_facility_ids(data.get('hospital_ids'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        if not facility_ids:
+            return jsonify({"error": "병원 ID 목록이 필요합니다"}), 400
         
-        return jsonify({"message": "즐겨찾기에서 제거되었습니다"}), 200
+        if request.method == 'POST':
+            added = add_favorites(user.id, facility_ids)
+            return jsonify({"message": "즐겨찾기에 추가되었습니다", "added": added}), 200
+        
+        removed = remove_favorites(user.id, facility_ids)
+        return jsonify({"message": "즐겨찾기에서 제거되었습니다", "removed": removed}), 200
         
     except Exception as e:
-        print(f"❌ 즐겨찾기 제거 오류: {e}")
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        db.session.rollback()
+        logger.exception("[즐겨찾기 오류] 일괄 처리 실패: %s", e)
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,150 @@
+# backend/auth_context.py
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import g, jsonify
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from models import User, UserFavorite
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 30.0  # 다른 프로세스에서 바꾼 내용이 늦게 보일 수 있는 최대 시간
+
+
+class CachedUser:
+    """
+    캐시에 보관하는 사용자 정보 (세션과 분리된 읽기 전용 값)
+    수정할 때는 User.query.filter_by(id=...).update(...)로 바로 UPDATE 합니다.
+    """
+    __slots__ = ('id', 'username', 'nickname', 'profile_url', 'favorite_ids')
+
+    def __init__(self, id: int, username: str, nickname: str, profile_url: str, favorite_ids: tuple):
+        self.id = id
+        self.username = username
+        self.nickname = nickname
+        self.profile_url = profile_url
+        self.favorite_ids = favorite_ids
+
+    @property
+    def display_name(self) -> str:
+        return self.nickname or self.username
+
+
+def load_user(user_id: int):
+    """DB에서 사용자와 즐겨찾기 ID 목록을 읽어 CachedUser로 만듭니다. 없으면 None."""
+    user = User.query.get(user_id)
+    if user is None:
+        return None
+    rows = UserFavorite.query.with_entities(UserFavorite.facility_id).filter_by(user_id=user_id) \
+        .order_by(UserFavorite.created_at.desc(), UserFavorite.facility_id).all()
+    return CachedUser(user.id, user.username, user.nickname, user.profile_url,
+                      tuple(facility_id for facility_id, in rows))
+
+
+class UserCache:
+    """
+    사용자 ID -> CachedUser LRU 캐시입니다.
+
+    사용자마다 버전 번호를 두고, 프로필/비밀번호/즐겨찾기가 바뀌면 invalidate()로 버전을 올립니다.
+    DB에서 읽는 도중에 버전이 바뀌었다면 읽은 값은 이미 낡았을 수 있으므로 캐시에 넣지 않습니다.
+    다른 프로세스의 변경은 ttl_seconds가 지나면 반영됩니다.
+    """
+
+    def __init__(self, loader=load_user, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS, clock=time.monotonic):
+        self.loader = loader
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries = OrderedDict()  # user_id -> (만료 시각, CachedUser)
+        self._versions = {}            # user_id -> 버전 (변경될 때마다 +1)
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def init_app(self, app):
+        self.max_entries = app.config.get('USER_CACHE_SIZE', DEFAULT_MAX_ENTRIES)
+        self.ttl_seconds = app.config.get('USER_CACHE_TTL', DEFAULT_TTL_SECONDS)
+
+    def get(self, user_id: int):
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+            version = self._versions.get(user_id, 0)
+
+        user = self.loader(user_id)
+        if user is not None:
+            self.put(user, version)
+        return user
+
+    def put(self, user: CachedUser, version: int = None):
+        """version이 주어졌는데 그 사이 invalidate 되었다면 넣지 않습니다."""
+        with self._lock:
+            if version is not None and self._versions.get(user.id, 0) != version:
+                return
+            self._entries[user.id] = (self.clock() + self.ttl_seconds, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._entries.pop(user_id, None)
+            self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+            }
+
+
+user_cache = UserCache()
+
+
+def user_claims(user) -> dict:
+    """토큰에 함께 넣어 두는 자주 읽는 정보 (/api/protected는 DB 없이 이 값으로 응답)"""
+    return {"username": user.username, "nickname": user.nickname, "profile_url": user.profile_url}
+
+
+def current_user():
+    """
+    JWT를 검증하고 요청한 사용자를 반환합니다. 같은 요청 안에서는 한 번만 조회합니다.
+    토큰이 없거나 잘못되면 flask_jwt_extended 예외가 그대로 올라갑니다.
+    """
+    if 'current_user' not in g:
+        verify_jwt_in_request()
+        g.current_user = user_cache.get(int(get_jwt_identity()))
+    return g.current_user
+
+
+def user_required(fn):
+    """
+    로그인한 사용자가 필요한 API용 데코레이터입니다. 찾은 사용자를 첫 번째 인자로 넘깁니다.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        user = current_user()
+        if user is None:
+            return jsonify({"error": "사용자를 찾을 수 없습니다"}), 404
+        return fn(user, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,2 @@
+# backend/benchmarks
+# 백엔드 성능 측정 스크립트 모음입니다. backend 디렉터리에서 `python -m benchmarks.<이름>`으로 실행합니다.
@@ -0,0 +1,91 @@
+# backend/benchmarks/bench_distance.py
+"""
+행 단위 거리 계산(sqlite3.Row -> dict -> math 하버사인)과
+열 단위 스냅샷 + NumPy 벡터 연산을 비교하는 마이크로 벤치마크입니다.
+
+    cd backend
+    python -m benchmarks.bench_distance --db ../animalloo_en_db.sqlite
+"""
+import argparse
+import random
+import sqlite3
+import time
+
+import numpy as np
+
+from facility_snapshot import FacilitySnapshot
+from spatial_index import FacilityGridIndex, get_haversine_distance
+
+# 서울 영역 (무작위 출발점 생성용)
+SEOUL_BBOX = (37.42, 37.70, 126.76, 127.19)
+
+
+def per_row_scan(rows: list, lat: float, lon: float, radius_km: float) -> list:
+    """기존 방식: 행마다 dict로 바꾸고 math 모듈로 거리를 계산합니다."""
+    results = []
+    for row in rows:
+        data = dict(row)
+        distance = get_haversine_distance(lat, lon, data['Latitude'], data['Longitude'])
+        if distance <= radius_km:
+            results.append((data['Facility_ID'], distance))
+    return results
+
+
+def timed(label: str, fn, repeat: int, per: int = 1):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<40} {best * 1000 / per:10.3f} ms/출발점")
+    return best / per
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default='../animalloo_en_db.sqlite')
+    parser.add_argument('--radius', type=float, default=3.0)
+    parser.add_argument('--origins', type=int, default=200, help='배치 계산에 쓸 출발점 개수')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute(
+        "SELECT * FROM facilities WHERE Latitude IS NOT NULL AND Longitude IS NOT NULL"
+    ).fetchall()
+    conn.close()
+
+    snapshot = FacilitySnapshot.from_db(args.db)
+    index = FacilityGridIndex(snapshot)
+
+    rng = random.Random(42)
+    lat_lo, lat_hi, lon_lo, lon_hi = SEOUL_BBOX
+    origins = [(rng.uniform(lat_lo, lat_hi), rng.uniform(lon_lo, lon_hi)) for _ in range(args.origins)]
+    lat, lon = origins[0]
+    origin_lats = np.array([o[0] for o in origins])
+    origin_lons = np.array([o[1] for o in origins])
+
+    print(f"시설 {len(snapshot)}개, 반경 {args.radius}km, 배치 출발점 {args.origins}개\n")
+
+    base = timed("행 단위 (dict + math)", lambda: per_row_scan(rows, lat, lon, args.radius), args.repeat)
+    full = timed("스냅샷 전체 벡터 연산", lambda: snapshot.score(lat, lon, args.radius), args.repeat)
+    grid = timed("격자 후보 + 벡터 연산", lambda: index.query_radius(lat, lon, args.radius), args.repeat)
+    batch = timed(
+        f"스냅샷 배치 ({args.origins}개 출발점)",
+        lambda: snapshot.score_batch(origin_lats, origin_lons, args.radius),
+        args.repeat, per=args.origins,
+    )
+
+    print()
+    for label, value in (("스냅샷 전체", full), ("격자 후보", grid), ("배치", batch)):
+        print(f"{label:<12} 행 단위 대비 {base / value:8.1f}배")
+
+    # 결과가 같은지 확인
+    expected = sorted(facility_id for facility_id, _ in per_row_scan(rows, lat, lon, args.radius))
+    assert sorted(facility_id for facility_id, _ in index.query_radius(lat, lon, args.radius)) == expected
+    assert sorted(snapshot.score_batch(origin_lats[:1], origin_lons[:1], args.radius)[0][0].tolist()) == expected
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+# backend/benchmarks/bench_login.py
+"""
+로그인(bcrypt)과 위치 검색을 동시에 보낼 때의 처리량/지연 시간을 비교합니다.
+
+- 요청 스레드: PASSWORD_HASH_WORKERS=0 과 같음 (기존처럼 요청 스레드에서 해싱)
+- 프로세스 풀: 해싱을 작업자 프로세스로 넘기고 대기열이 넘치면 503
+
+DB 파일은 임시 복사본을 사용하므로 원본은 바뀌지 않습니다.
+
+    cd backend
+    python -m benchmarks.bench_login --db ../animalloo_en_db.sqlite
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+SEOUL_BBOX = (37.42, 37.70, 126.76, 127.19)
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def run_mix(app, duration: float, login_threads: int, search_threads: int, username: str, password: str) -> dict:
+    results = {"login": [], "search": []}
+    statuses = {"login": {}, "search": {}}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(kind: str, seed: int):
+        client = app.test_client()
+        rng = random.Random(seed)
+        lat_lo, lat_hi, lon_lo, lon_hi = SEOUL_BBOX
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            if kind == 'login':
+                response = client.post('/api/login', json={"username": username, "password": password})
+            else:
+                response = client.post('/api/search', json={
+                    "query": "근처 동물병원", "limit": 20,
+                    "lat": rng.uniform(lat_lo, lat_hi), "lon": rng.uniform(lon_lo, lon_hi),
+                })
+            elapsed = time.perf_counter() - start
+            with lock:
+                results[kind].append(elapsed)
+                statuses[kind][response.status_code] = statuses[kind].get(response.status_code, 0) + 1
+
+    threads = [threading.Thread(target=worker, args=('login', i)) for i in range(login_threads)]
+    threads += [threading.Thread(target=worker, args=('search', 1000 + i)) for i in range(search_threads)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    return {"latencies": results, "statuses": statuses}
+
+
+def report(label: str, outcome: dict, duration: float):
+    print(f"[{label}]")
+    for kind in ("login", "search"):
+        latencies = outcome["latencies"][kind]
+        print(f"  {kind:<7} {len(latencies) / duration:8.1f} 요청/초  "
+              f"p50 {percentile(latencies, 50) * 1000:8.1f}ms  p95 {percentile(latencies, 95) * 1000:8.1f}ms  "
+              f"상태 {dict(sorted(outcome['statuses'][kind].items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default='../animalloo_en_db.sqlite')
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--login-threads', type=int, default=8)
+    parser.add_argument('--search-threads', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=12, help='BCRYPT_LOG_ROUNDS')
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1), help='해시 작업자 프로세스 수')
+    parser.add_argument('--max-queue', type=int, default=4, help='작업자가 바쁠 때 기다릴 수 있는 요청 수')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_login_')
+    db_copy = os.path.join(workdir, 'bench.sqlite')
+    shutil.copy(args.db, db_copy)
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_copy}"
+    os.environ['GEMINI_API_KEY'] = ''  # LLM은 규칙 기반 분석으로
+    os.environ['BCRYPT_LOG_ROUNDS'] = str(args.rounds)
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import app as server
+            from password_hasher import password_hasher
+            with server.app.app_context():
+                server.db.create_all()
+            password_hasher.configure(rounds=args.rounds, max_workers=0, max_queue=1000)
+            server.app.test_client().post('/api/register', json={"username": "bench", "password": "bench-password"})
+
+        print(f"bcrypt cost {args.rounds}, 로그인 스레드 {args.login_threads}개, "
+              f"검색 스레드 {args.search_threads}개, {args.duration}초씩\n")
+
+        modes = [
+            ("요청 스레드에서 해싱", dict(max_workers=0, max_queue=1000)),
+            (f"프로세스 풀 {args.workers}개 + 대기열 {args.max_queue}", dict(max_workers=args.workers, max_queue=args.max_queue)),
+        ]
+        for label, options in modes:
+            password_hasher.configure(rounds=args.rounds, **options)
+            outcome = run_mix(server.app, args.duration, args.login_threads, args.search_threads,
+                              "bench", "bench-password")
+            report(label, outcome, args.duration)
+        print(f"\n해시 작업자 통계: {password_hasher.stats()}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# backend/benchmarks/bench_serializer.py
+"""
+기존 행 변환(dict(row) -> 필드명 매핑 dict -> jsonify와 같은 json.dumps)과
+컴파일된 RowSerializer + 빠른 JSON 경로의 처리량과 메모리 할당량을 비교합니다.
+
+    cd backend
+    python -m benchmarks.bench_serializer --db ../animalloo_en_db.sqlite
+"""
+import argparse
+import json
+import sqlite3
+import time
+import tracemalloc
+
+from serializers import FIELD_MAPPING, dumps, get_serializer, select_list
+
+
+def legacy_serialize(rows: list) -> list:
+    """기존 방식: 행마다 dict로 복사하고 필드명을 하나씩 매핑합니다."""
+    field_mapping = dict(FIELD_MAPPING)
+    results = []
+    for row in rows:
+        mapped_data = {}
+        for key, value in dict(row).items():
+            mapped_data[field_mapping.get(key, key)] = value
+        if 'id' in mapped_data:
+            mapped_data['id'] = str(mapped_data['id'])
+        results.append(mapped_data)
+    return results
+
+
+def legacy_dumps(payload) -> bytes:
+    # Flask jsonify 기본 설정과 같은 인코딩 (키 정렬, ASCII 이스케이프)
+    return json.dumps(payload, sort_keys=True, ensure_ascii=True).encode('utf-8')
+
+
+def fetch(conn, fields: tuple = None, row_factory=None):
+    cursor = conn.cursor()
+    cursor.row_factory = row_factory
+    cursor.execute(f"SELECT {select_list(fields)} FROM facilities")
+    return cursor.fetchall(), cursor.description
+
+
+def measure(label: str, fn, repeat: int, rows: int):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<36} {rows / best:12,.0f} 행/초 {peak / 1024 / 1024:8.2f} MB(최대 할당)")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default='../animalloo_en_db.sqlite')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--fields', default='id,name,category,Latitude,Longitude',
+                        help='필드 선택 비교에 쓸 fields 값')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    dict_rows, _ = fetch(conn, row_factory=sqlite3.Row)
+    tuple_rows, description = fetch(conn)
+    fields = tuple(args.fields.split(','))
+    projected_rows, projected_description = fetch(conn, fields)
+    conn.close()
+
+    serializer = get_serializer(description)
+    projected = get_serializer(projected_description, fields)
+    n = len(tuple_rows)
+    print(f"시설 {n}개, 반복 {args.repeat}회, fields={args.fields}\n")
+
+    print("[행 -> dict]")
+    base = measure("기존 (dict(row) + 매핑)", lambda: legacy_serialize(dict_rows), args.repeat, n)
+    fast = measure("RowSerializer (튜플 행)", lambda: serializer.serialize_all(tuple_rows), args.repeat, n)
+    row = measure("RowSerializer (sqlite3.Row)", lambda: serializer.serialize_all(dict_rows), args.repeat, n)
+    proj = measure("RowSerializer (fields 선택)", lambda: projected.serialize_all(projected_rows), args.repeat, n)
+
+    print("\n[행 -> JSON bytes]")
+    base_json = measure("기존 (매핑 + jsonify 인코딩)", lambda: legacy_dumps(legacy_serialize(dict_rows)), args.repeat, n)
+    fast_json = measure("RowSerializer + dumps", lambda: dumps(serializer.serialize_all(tuple_rows)), args.repeat, n)
+    proj_json = measure("fields 선택 + dumps", lambda: dumps(projected.serialize_all(projected_rows)), args.repeat, n)
+
+    full_size = len(dumps(serializer.serialize_all(tuple_rows)))
+    proj_size = len(dumps(projected.serialize_all(projected_rows)))
+    print(f"\n응답 크기: 전체 {full_size / 1024:.0f}KB, fields 선택 {proj_size / 1024:.0f}KB")
+
+    print()
+    for label, value in (("튜플 행", fast), ("sqlite3.Row", row), ("fields 선택", proj)):
+        print(f"{label:<14} dict 변환 기존 대비 {base / value:6.1f}배")
+    for label, value in (("전체 필드", fast_json), ("fields 선택", proj_json)):
+        print(f"{label:<14} JSON 포함 기존 대비 {base_json / value:6.1f}배")
+
+    # 결과가 같은지 확인
+    assert serializer.serialize_all(tuple_rows) == legacy_serialize(dict_rows)
+    assert serializer.serialize_all(dict_rows) == legacy_serialize(dict_rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# backend/benchmarks/fake_llm.py
+"""
+벤치마크용 LLMProcessor를 만듭니다. Gemini 대신 FakeGenerativeModel을 쓰고,
+같은 검색어에는 항상 같은 결과와 같은 지연 시간을 돌려줍니다. (네트워크/API 키 불필요)
+"""
+import re
+import zlib
+
+from LLM_part.LLM import DB_CATEGORIES, LLMProcessor
+from LLM_part.fake_model import FakeGenerativeModel
+
+RADII_KM = (1.0, 3.0, 5.0)
+TEXT_FILTERS = (None, None, None, '24시', '야간')
+QUERY_IN_PROMPT = re.compile(r'JSON을 생성해주세요: "(.*)"')
+
+
+def query_of(prompt: str) -> str:
+    match = QUERY_IN_PROMPT.search(prompt)
+    return match.group(1) if match else prompt
+
+
+def deterministic_response(prompt: str) -> dict:
+    """검색어의 CRC32 값으로 카테고리 1~2개, 반경, text_filter를 고릅니다."""
+    h = zlib.crc32(query_of(prompt).encode('utf-8'))
+    first = DB_CATEGORIES[h % len(DB_CATEGORIES)]
+    second = DB_CATEGORIES[(h >> 8) % len(DB_CATEGORIES)]
+    categories = [first] if (h >> 16) % 2 else sorted({first, second})
+    return {
+        "categories": categories,
+        "search_radius_km": RADII_KM[(h >> 4) % len(RADII_KM)],
+        "text_filter": TEXT_FILTERS[(h >> 12) % len(TEXT_FILTERS)],
+    }
+
+
+def make_fake_processor(latency_ms: float = 50.0, jitter: float = 0.5, intent_threshold: float = None,
+                        cache=None, deadline_seconds: float = None) -> LLMProcessor:
+    """
+    latency_ms: 기준 지연 시간. 검색어마다 latency_ms * (1 ± jitter) 안에서 고정된 값을 씁니다.
+    intent_threshold: None이면 키워드 분석을 건너뛰지 않고 항상 (가짜) LLM을 부릅니다.
+    """
+    def latency(prompt: str) -> float:
+        h = zlib.crc32(query_of(prompt).encode('utf-8')) % 1000 / 1000  # 0~1
+        return max(0.0, latency_ms * (1 + jitter * (2 * h - 1))) / 1000
+
+    model = FakeGenerativeModel(latency=latency, responder=deterministic_response)
+    return LLMProcessor(
+        api_key='BENCHMARK', model=model, cache=cache,
+        deadline_seconds=deadline_seconds, intent_threshold=intent_threshold,
+    )
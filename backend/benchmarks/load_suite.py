@@ -0,0 +1,318 @@
+# backend/benchmarks/load_suite.py
+"""
+합성 데이터(small 4천 / medium 10만 / large 100만 시설)로 주요 API의 처리량과 지연 시간을 측정합니다.
+
+- 시나리오: search, filter, districts, facility(상세), login
+- 실행 방식: Flask test client (앱 코드만), HTTP (로컬 werkzeug 서버 + 동시 접속)
+- 결과: 초당 요청 수, p50/p95/p99 (ms), 상태 코드별 개수, 최대 RSS(MB)
+- --output으로 JSON을 저장하고, --baseline으로 이전 결과와 비교합니다. (허용 범위를 넘으면 종료 코드 1)
+
+LLM은 fake_llm의 결정적인 가짜 모델을 쓰므로 같은 시드면 같은 요청이 만들어집니다.
+
+    cd backend
+    python -m benchmarks.load_suite --size small --duration 5 --output bench_small.json
+    python -m benchmarks.load_suite --size small --baseline bench_small.json
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+from benchmarks.synthetic_data import DISTRICTS, SEOUL_BBOX, ensure_dataset, parse_size
+
+SCENARIOS = ('search', 'filter', 'districts', 'facility', 'login')
+DRIVERS = ('client', 'http')
+SEARCH_QUERIES = [
+    '근처 동물병원', '24시 동물약국', '강아지 미용실', '반려견 동반 카페', '애견 호텔',
+    '펫 용품 가게', '고양이 병원 야간', '주말에 갈만한 박물관', '반려동물 여행지', '동물병원 전부',
+]
+FILTER_CATEGORIES = ['veterinary hospital', 'pharmacy', 'beauty salon', 'shop', 'café au lait']
+BENCH_USER = ("bench", "bench-password")
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def peak_rss_mb() -> float:
+    # Linux는 KB, macOS는 바이트 단위
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+# ---------- 요청 만들기 ----------
+def make_request(scenario: str, rng: random.Random, facility_count: int) -> tuple:
+    """(method, path, JSON 본문 또는 None)"""
+    if scenario == 'search':
+        lat_lo, lat_hi, lon_lo, lon_hi = SEOUL_BBOX
+        return 'POST', '/api/search', {
+            "query": rng.choice(SEARCH_QUERIES), "limit": 20,
+            "lat": round(rng.uniform(lat_lo, lat_hi), 5), "lon": round(rng.uniform(lon_lo, lon_hi), 5),
+        }
+    if scenario == 'filter':
+        params = [("district", rng.choice(DISTRICTS)[1])]
+        params += [("categories", c) for c in rng.sample(FILTER_CATEGORIES, rng.randint(0, 2))]
+        return 'GET', f"/api/filter?{urlencode(params)}", None
+    if scenario == 'districts':
+        return 'GET', '/api/districts', None
+    if scenario == 'facility':
+        return 'GET', f"/api/facilities/{rng.randint(1, facility_count)}", None
+    if scenario == 'login':
+        return 'POST', '/api/login', {"username": BENCH_USER[0], "password": BENCH_USER[1]}
+    raise ValueError(f"알 수 없는 시나리오: {scenario}")
+
+
+# ---------- 실행 방식 ----------
+class ClientDriver:
+    """Flask test client로 앱을 직접 호출합니다. (네트워크/서버 비용 제외)"""
+    name = 'client'
+
+    def __init__(self, app):
+        self.app = app
+
+    def session(self):
+        client = self.app.test_client()
+
+        def send(method, path, body):
+            response = client.open(path, method=method, json=body)
+            response.get_data()
+            return response.status_code
+        return send
+
+    def close(self):
+        pass
+
+
+class HttpDriver:
+    """로컬 werkzeug 스레드 서버를 띄우고 스레드마다 HTTP 연결을 열어 요청합니다."""
+    name = 'http'
+
+    def __init__(self, app):
+        from werkzeug.serving import make_server
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)  # 요청마다 찍는 접근 로그 끄기
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def session(self):
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+
+        def send(method, path, body):
+            headers = {}
+            payload = None
+            if body is not None:
+                payload = json.dumps(body).encode('utf-8')
+                headers['Content-Type'] = 'application/json'
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.will_close:
+                conn.close()
+            return response.status
+        return send
+
+    def close(self):
+        self.server.shutdown()
+
+
+def run_scenario(driver, scenario: str, facility_count: int, concurrency: int, duration: float,
+                 warmup: int, seed: int) -> dict:
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    # 준비(warm-up)가 끝난 뒤부터 duration초를 잽니다.
+    window = {"deadline": float('inf')}
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(index: int):
+        rng = random.Random(f"{seed}-{scenario}-{index}")
+        send = driver.session()
+        local_latencies = []
+        local_statuses = {}
+
+        def send_safely(request_args):
+            try:
+                return send(*request_args)
+            except Exception:
+                return 'error'
+
+        for _ in range(warmup):
+            send_safely(make_request(scenario, rng, facility_count))
+        barrier.wait()
+        while time.perf_counter() < window["deadline"]:
+            request_args = make_request(scenario, rng, facility_count)
+            start = time.perf_counter()
+            status = send_safely(request_args)
+            local_latencies.append(time.perf_counter() - start)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for t in threads:
+            t.start()
+        barrier.wait()
+        started = time.perf_counter()
+        window["deadline"] = started + duration
+        for t in threads:
+            t.join()
+    elapsed = time.perf_counter() - started
+    errors = sum(count for status, count in statuses.items() if status == 'error' or int(status) >= 500)
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# ---------- 비교 ----------
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """허용 범위(비율)를 넘게 나빠진 항목 목록. (지연 시간은 늘어날 때, 처리량은 줄어들 때)"""
+    regressions = []
+    for driver, scenarios in current["results"].items():
+        for scenario, result in scenarios.items():
+            before = baseline.get("results", {}).get(driver, {}).get(scenario)
+            if not before:
+                continue
+            for key, worse_if_higher in (("p50_ms", True), ("p95_ms", True), ("p99_ms", True),
+                                         ("throughput_rps", False)):
+                old, new = before.get(key), result.get(key)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                marker = ''
+                if (change > tolerance) if worse_if_higher else (change < -tolerance):
+                    marker = '  <-- 악화'
+                    regressions.append(f"{driver}/{scenario} {key}: {old} -> {new} ({change:+.1%})")
+                print(f"  {driver:<6} {scenario:<9} {key:<14} {old:>10} -> {new:>10} ({change:+7.1%}){marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='small', help='small(4천) / medium(10만) / large(100만) 또는 시설 개수')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'animalloo_bench'),
+                        help='합성 DB를 만들어 두는 곳 (같은 크기/시드면 재사용)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--drivers', default=','.join(DRIVERS))
+    parser.add_argument('--duration', type=float, default=5.0, help='시나리오마다 측정할 시간(초)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=5, help='측정 전에 스레드마다 보낼 요청 수')
+    parser.add_argument('--llm-latency-ms', type=float, default=50.0)
+    parser.add_argument('--llm-jitter', type=float, default=0.5)
+    parser.add_argument('--intent-threshold', type=float, default=None,
+                        help='지정하면 키워드 분석 신뢰도가 이 값 이상일 때 LLM을 건너뜀 (기본: 항상 LLM 호출)')
+    parser.add_argument('--bcrypt-rounds', type=int, default=10)
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='악화로 볼 변화 비율')
+    args = parser.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(',') if s]
+    drivers = [d for d in args.drivers.split(',') if d]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"알 수 없는 시나리오: {name}")
+    for name in drivers:
+        if name not in DRIVERS:
+            parser.error(f"알 수 없는 실행 방식: {name}")
+
+    facility_count = parse_size(args.size)
+    db_path = ensure_dataset(args.data_dir, facility_count, args.seed)
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ['GEMINI_API_KEY'] = ''
+    os.environ['BCRYPT_LOG_ROUNDS'] = str(args.bcrypt_rounds)
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    rss_before_app = peak_rss_mb()
+    startup = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as server
+        from benchmarks.fake_llm import make_fake_processor
+        with server.app.app_context():
+            server.db.create_all()
+        server.llm_processor = make_fake_processor(args.llm_latency_ms, args.llm_jitter, args.intent_threshold)
+        server.app.test_client().post('/api/register', json={"username": BENCH_USER[0], "password": BENCH_USER[1]})
+    startup = time.perf_counter() - startup
+
+    print(f"시설 {facility_count:,}개 ({db_path}), 앱 시작 {startup:.1f}초, "
+          f"동시 {args.concurrency}, 시나리오당 {args.duration}초, LLM 지연 {args.llm_latency_ms}ms\n")
+    print(f"  {'방식':<6} {'시나리오':<9} {'요청/초':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'오류':>5} {'RSS(MB)':>8}")
+
+    results = {}
+    for driver_name in drivers:
+        driver = ClientDriver(server.app) if driver_name == 'client' else HttpDriver(server.app)
+        try:
+            for scenario in scenarios:
+                result = run_scenario(driver, scenario, facility_count, args.concurrency, args.duration,
+                                      args.warmup, args.seed)
+                results.setdefault(driver_name, {})[scenario] = result
+                print(f"  {driver_name:<6} {scenario:<9} {result['throughput_rps']:>9.1f} "
+                      f"{result['p50_ms']:>8.1f}ms {result['p95_ms']:>7.1f}ms {result['p99_ms']:>7.1f}ms "
+                      f"{result['errors']:>5} {result['peak_rss_mb']:>8.1f}")
+        finally:
+            driver.close()
+
+    report = {
+        "meta": {
+            "facilities": facility_count,
+            "seed": args.seed,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "llm_latency_ms": args.llm_latency_ms,
+            "intent_threshold": args.intent_threshold,
+            "bcrypt_rounds": args.bcrypt_rounds,
+            "startup_seconds": round(startup, 2),
+            "rss_before_app_mb": rss_before_app,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "created_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("facilities") != facility_count:
+            print(f"\n[경고] 기준 결과의 시설 수가 다릅니다: {baseline.get('meta', {}).get('facilities')}")
+        print(f"\n기준 결과와 비교 ({args.baseline}, 허용 {args.tolerance:.0%})")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n악화 {len(regressions)}건")
+            sys.exit(1)
+        print("\n악화 없음")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+# backend/benchmarks/synthetic_data.py
+"""
+서울 영역 안에 무작위(시드 고정) 시설 데이터를 만들어 실제 DB와 같은 스키마의 SQLite 파일로 저장합니다.
+Facilities / OpeningHours / HolidayInfo / districts 테이블을 만들고, users 테이블은 앱이 시작할 때 만듭니다.
+
+    cd backend
+    python -m benchmarks.synthetic_data --size medium --out /tmp/animalloo_medium.sqlite
+"""
+import argparse
+import os
+import random
+import sqlite3
+import time
+
+SIZES = {"small": 4_000, "medium": 100_000, "large": 1_000_000}
+SEOUL_BBOX = (37.42, 37.70, 126.76, 127.19)
+INSERT_BATCH = 10_000
+
+# (이름, Facilities.District 값, 위도, 경도) - 실제 districts 테이블과 같은 값
+DISTRICTS = [
+    ('강남구', 'Administrative divisions of Gangnam District', 37.5172, 127.0473),
+    ('강동구', 'Gangdong District', 37.5301, 127.1238),
+    ('강서구', 'Gangseo District', 37.5509, 126.8495),
+    ('강북구', 'Gangbuk District', 37.6396, 127.0257),
+    ('관악구', 'Gwanak District', 37.4782, 126.9515),
+    ('광진구', 'Gwangjin District', 37.5385, 127.0824),
+    ('구로구', 'Guro District', 37.4954, 126.8875),
+    ('금천구', 'Geumcheon District', 37.4563, 126.9002),
+    ('노원구', 'Nowon District', 37.6542, 127.0568),
+    ('동대문구', 'Dongdaemun District', 37.5744, 127.0397),
+    ('도봉구', 'Dobong District', 37.6688, 127.0471),
+    ('동작구', 'Dongjak District', 37.5124, 126.9393),
+    ('마포구', 'Mapo District', 37.5662, 126.9015),
+    ('서대문구', 'Seodaemun District', 37.5791, 126.9368),
+    ('성동구', 'Seongdong District', 37.5635, 127.0364),
+    ('성북구', 'Seongbuk District', 37.5894, 127.0167),
+    ('서초구', 'Seocho District', 37.4837, 127.0324),
+    ('송파구', 'Songpa District', 37.5145, 127.1058),
+    ('영등포구', 'Yeongdeungpo District', 37.5263, 126.8963),
+    ('용산구', 'Yongsan District', 37.5325, 126.99),
+    ('양천구', 'Yangcheon District', 37.5169, 126.8664),
+    ('은평구', 'Eunpyeong District', 37.6027, 126.9291),
+    ('종로구', 'Jongno District', 37.5728, 126.9798),
+    ('중구', 'Jung District', 37.5639, 126.9975),
+    ('중랑구', 'Jungnang District', 37.6065, 127.0926),
+]
+
+# 카테고리별 비율 (실제 데이터의 분포를 따름)과 이름에 붙일 말
+CATEGORIES = [
+    ('pharmacy', 1795, '약국'),
+    ('shop', 1018, '펫샵'),
+    ('veterinary hospital', 861, '동물병원'),
+    ('beauty salon', 288, '애견미용'),
+    ('café au lait', 157, '애견카페'),
+    ('museum building', 124, '박물관'),
+    ('art museum', 45, '미술관'),
+    ('travel', 42, '여행'),
+    ('cultural center', 25, '문화센터'),
+    ('hotel', 5, '펫호텔'),
+    ('Korean restaurant', 4, '한식당'),
+    ('펜션', 2, '펜션'),
+]
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+# (평일 영업시간, 주말 영업시간) - 실제 데이터에 많은 형태
+SCHEDULES = [
+    (('10:00', '22:00'), ('10:00', '22:00')),
+    (('10:00', '20:00'), ('10:00', '18:00')),
+    (('00:00', '00:00'), ('00:00', '00:00')),   # 24시간
+    (('10:00', '19:00'), ('10:00', '17:00')),
+    (('09:00', '21:00'), ('09:00', '18:00')),
+    (('09:00', '19:00'), ('09:00', '13:00')),
+    (('18:00', '02:00'), ('18:00', '02:00')),   # 자정을 넘기는 영업
+]
+DAY_OFF = ['일요일', '연중무휴', '정보없음', '토요일', '월요일', '법정공휴일', '2,4째주 일요일', '화요일']
+DAY_OFF_WEIGHTS = [1726, 1505, 290, 279, 148, 103, 66, 54]
+
+SCHEMA = """
+CREATE TABLE "Facilities" (
+    Facility_ID INTEGER PRIMARY KEY,
+    Name TEXT NOT NULL,
+    Category TEXT,
+    Province TEXT,
+    District TEXT,
+    Neighborhood TEXT,
+    LotNumber TEXT,
+    RoadName TEXT,
+    Latitude REAL,
+    Longitude REAL,
+    PostalCode TEXT,
+    RoadAddress TEXT,
+    LotAddress TEXT,
+    PhoneNumber TEXT,
+    Website TEXT,
+    ParkingAvailable INTEGER,
+    AdmissionFeeInfo TEXT,
+    PetFriendly INTEGER,
+    PetExclusiveInfo TEXT,
+    PetSizeLimit TEXT,
+    PetRestrictions TEXT,
+    IsIndoor INTEGER,
+    IsOutdoor INTEGER,
+    Description TEXT,
+    PetExtraFee TEXT
+);
+CREATE TABLE OpeningHours (
+    Hour_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Facility_ID INTEGER NOT NULL,
+    DayOfWeek TEXT NOT NULL,
+    Opens TEXT,
+    Closes TEXT,
+    FOREIGN KEY (Facility_ID) REFERENCES Facilities (Facility_ID) ON DELETE CASCADE
+);
+CREATE TABLE HolidayInfo (
+    Holiday_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Facility_ID INTEGER NOT NULL,
+    Day_Off TEXT NOT NULL,
+    FOREIGN KEY (Facility_ID) REFERENCES Facilities (Facility_ID) ON DELETE CASCADE
+);
+CREATE TABLE districts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE NOT NULL,
+    description TEXT,
+    popular_services TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    Latitude REAL,
+    Longitude REAL,
+    en_name TEXT
+);
+CREATE TABLE bench_meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def parse_size(value) -> int:
+    """'small' / 'medium' / 'large' 또는 시설 개수"""
+    if str(value) in SIZES:
+        return SIZES[str(value)]
+    count = int(value)
+    if count < 1:
+        raise ValueError(f"시설 개수는 1 이상이어야 합니다: {value}")
+    return count
+
+
+def iter_facilities(count: int, seed: int):
+    """(facility 행, 영업시간 행 목록, 휴무일) 을 시설 ID 순서대로 만듭니다."""
+    rng = random.Random(seed)
+    lat_lo, lat_hi, lon_lo, lon_hi = SEOUL_BBOX
+    category_names = [c[0] for c in CATEGORIES]
+    category_weights = [c[1] for c in CATEGORIES]
+    labels = {c[0]: c[2] for c in CATEGORIES}
+
+    for facility_id in range(1, count + 1):
+        name_ko, district, center_lat, center_lon = rng.choice(DISTRICTS)
+        category = rng.choices(category_names, category_weights)[0]
+        lat = min(max(rng.gauss(center_lat, 0.015), lat_lo), lat_hi)
+        lon = min(max(rng.gauss(center_lon, 0.018), lon_lo), lon_hi)
+        road = f"합성로{rng.randint(1, 300)}길"
+        number = rng.randint(1, 999)
+        facility = (
+            facility_id, f"{name_ko} {labels[category]} {facility_id}", category, 'district of Seoul', district,
+            f"{name_ko[:-1]}{rng.randint(1, 9)}동", f"{number} 번지", road, round(lat, 6), round(lon, 6),
+            f"{rng.randint(1000, 9999)}", f"서울특별시 {name_ko} {road} {number}", f"서울특별시 {name_ko} {number}",
+            f"02-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}", None,
+            rng.randint(0, 1), '변동', 1, '해당없음', rng.choice(['모두 가능', '소형견', '중형견 이하']),
+            '제한사항 없음', 1, rng.randint(0, 1), f"합성 {labels[category]}", '없음',
+        )
+        weekday, weekend = rng.choice(SCHEDULES)
+        hours = [(facility_id, day, *(weekend if day in ('Saturday', 'Sunday') else weekday)) for day in DAYS]
+        day_off = rng.choices(DAY_OFF, DAY_OFF_WEIGHTS)[0]
+        yield facility, hours, day_off
+
+
+def generate(path: str, size, seed: int = 42, progress: bool = True) -> int:
+    """
+    path에 합성 DB를 새로 만들고 시설 개수를 반환합니다. (기존 파일은 덮어씀)
+    인덱스는 데이터를 다 넣은 뒤에 만들지 않고, 앱이 시작할 때 만드는 것에 맡깁니다. (실제 DB와 같은 상태)
+    """
+    count = parse_size(size)
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO districts (name, Latitude, Longitude, en_name) VALUES (?, ?, ?, ?)",
+        [(name, lat, lon, en_name) for name, en_name, lat, lon in DISTRICTS],
+    )
+
+    started = time.perf_counter()
+    facilities, hours, holidays = [], [], []
+
+    def flush():
+        conn.executemany(f"INSERT INTO Facilities VALUES ({', '.join('?' * 25)})", facilities)
+        conn.executemany("INSERT INTO OpeningHours (Facility_ID, DayOfWeek, Opens, Closes) VALUES (?, ?, ?, ?)", hours)
+        conn.executemany("INSERT INTO HolidayInfo (Facility_ID, Day_Off) VALUES (?, ?)", holidays)
+        facilities.clear()
+        hours.clear()
+        holidays.clear()
+
+    for facility, facility_hours, day_off in iter_facilities(count, seed):
+        facilities.append(facility)
+        hours.extend(facility_hours)
+        holidays.append((facility[0], day_off))
+        if len(facilities) >= INSERT_BATCH:
+            flush()
+            if progress:
+                print(f"\r[합성 데이터] {facility[0]:,}/{count:,}", end='', flush=True)
+    flush()
+
+    conn.executemany("INSERT INTO bench_meta VALUES (?, ?)", [("facilities", str(count)), ("seed", str(seed))])
+    conn.commit()
+    conn.close()
+    if progress:
+        print(f"\r[합성 데이터] 시설 {count:,}개 생성 ({time.perf_counter() - started:.1f}초): {path}")
+    return count
+
+
+def read_meta(path: str) -> dict:
+    """합성 DB의 (facilities, seed). 합성 DB가 아니면 빈 dict."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return dict(conn.execute("SELECT key, value FROM bench_meta").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}
+
+
+def ensure_dataset(directory: str, size, seed: int = 42) -> str:
+    """같은 크기/시드로 만든 파일이 directory에 있으면 재사용하고, 없으면 만듭니다."""
+    count = parse_size(size)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"synthetic_{count}_{seed}.sqlite")
+    if read_meta(path) != {"facilities": str(count), "seed": str(seed)}:
+        generate(path, count, seed)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='small', help=f"{', '.join(SIZES)} 또는 시설 개수")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', required=True)
+    args = parser.parse_args()
+    generate(args.out, args.size, args.seed)
+
+
+if __name__ == '__main__':
+    main()
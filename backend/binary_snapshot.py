@@ -0,0 +1,348 @@
+# backend/binary_snapshot.py
+"""
+Facilities / districts / OpeningHours를 한 파일로 묶은 바이너리 스냅샷입니다.
+서버는 이 파일을 mmap으로 열어 배열을 복사하지 않고 그대로 쓰므로, 데이터가 커져도
+시작 시간과 프로세스 메모리가 거의 늘지 않습니다. (페이지는 OS 페이지 캐시를 작업자들이 함께 씀)
+
+파일 구조 (리틀 엔디언):
+    [0:20)   MAGIC(8) + 형식 버전(u32) + 헤더 길이(u32) + 헤더 CRC32(u32)
+    [20:..)  헤더 JSON: 원본 DB 지문, 카테고리/구 사전, 날짜 휴무 규칙, 섹션 목록(위치/dtype/shape/CRC32)
+    이후     64바이트 경계에 맞춘 섹션들 (숫자 열은 고정 길이 배열, 문자열은 오프셋 배열 + UTF-8 blob)
+
+    cd backend
+    python binary_snapshot.py --db ../animalloo_en_db.sqlite --out ../animalloo_en_db.snapshot
+"""
+import argparse
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from facility_reload import CHANGE_TABLE, change_log_seq, ensure_change_log
+from facility_snapshot import FacilitySnapshot
+from opening_hours import OpeningHoursIndex
+from spatial_index import DEFAULT_CELL_DEG, FacilityGridIndex, grid_cells
+
+MAGIC = b'ANLSNAP\0'
+FORMAT_VERSION = 2  # 2: 일요일 24시 이후 시작 영업시간의 비트 배열 수정 (이전 스냅샷은 다시 만듦)
+PREFIX = struct.Struct('<8sIII')
+ALIGN = 64
+SOURCE_TABLES = ('Facilities', 'OpeningHours', 'HolidayInfo', 'districts')
+
+
+class SnapshotError(ValueError):
+    """스냅샷 파일을 쓸 수 없음 (형식/버전이 다르거나 손상됨)"""
+
+
+def default_snapshot_path(db_path: str) -> str:
+    return os.path.splitext(db_path)[0] + '.snapshot'
+
+
+def source_fingerprint(conn: sqlite3.Connection) -> dict:
+    """
+    원본 테이블별 (행 수, 최대 rowid)와 변경 기록(facility_changes)의 마지막 번호.
+    행 추가/삭제는 행 수로, 같은 행의 값만 바꾼 UPDATE는 변경 기록 트리거로 알아챕니다.
+    트리거가 없으면 UPDATE를 알 수 없으므로 변경 기록 값이 None이고, 이런 지문의 스냅샷은 쓰지 않습니다.
+    """
+    fingerprint = {
+        table: list(conn.execute(f'SELECT count(*), coalesce(max(rowid), 0) FROM "{table}"').fetchone())
+        for table in SOURCE_TABLES
+    }
+    fingerprint[CHANGE_TABLE] = change_log_seq(conn)
+    return fingerprint
+
+
+def _to_tuple(value):
+    # JSON에서 읽은 규칙(list)을 parse_day_off가 만드는 tuple 형태로 되돌립니다.
+    return tuple(_to_tuple(v) for v in value) if isinstance(value, list) else value
+
+
+class StringColumn:
+    """오프셋 배열(n + 1)과 UTF-8 blob으로 저장한 문자열 열. 읽을 때 해당 구간만 디코딩합니다."""
+
+    def __init__(self, offsets: np.ndarray, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def encode(cls, values: list) -> 'StringColumn':
+        encoded = [(value or '').encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return cls(offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position: int) -> str:
+        start, stop = self.offsets[position], self.offsets[position + 1]
+        return bytes(self.blob[start:stop]).decode('utf-8')
+
+
+class SnapshotFile:
+    """
+    mmap으로 연 스냅샷입니다. 배열은 모두 파일을 가리키는 읽기 전용 뷰입니다.
+
+    facilities: 좌표가 있는 시설을 ID 순으로 앞에 두고 (FacilitySnapshot은 앞쪽 located개를 그대로 씀),
+    좌표가 없는 시설을 뒤에 둡니다. names/district_codes도 같은 순서입니다.
+    """
+
+    def __init__(self, path: str, verify: bool = True):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # 빈 파일
+                raise SnapshotError(f"빈 스냅샷 파일: {path}") from e
+        self.header = self._read_header()
+        self._sections = {name: self._section(name, verify) for name in self.header["sections"]}
+
+        header = self.header
+        self.fingerprint = header["source"]
+        self.categories = header["categories"]
+        self.districts = header["districts"]          # Facilities.District 값 사전 (코드 -> 이름)
+        self.district_rows = header["district_rows"]  # districts 테이블
+        self.located = header["located"]
+        self.names = StringColumn(self._sections["name_offsets"], self._sections["name_blob"])
+        self.district_codes = self._sections["district_codes"]
+
+    def _read_header(self) -> dict:
+        if len(self._mmap) < PREFIX.size:
+            raise SnapshotError("스냅샷 파일이 너무 짧습니다.")
+        magic, version, header_len, header_crc = PREFIX.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise SnapshotError("스냅샷 파일 형식이 아닙니다.")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"스냅샷 형식 버전이 다릅니다: {version} (지원: {FORMAT_VERSION})")
+        raw = self._mmap[PREFIX.size:PREFIX.size + header_len]
+        if len(raw) != header_len or zlib.crc32(raw) != header_crc:
+            raise SnapshotError("스냅샷 헤더 체크섬이 맞지 않습니다.")
+        header = json.loads(raw)
+        header["data_start"] = _align(PREFIX.size + header_len)
+        return header
+
+    def _section(self, name: str, verify: bool) -> np.ndarray:
+        info = self.header["sections"][name]
+        offset = self.header["data_start"] + info["offset"]
+        if offset + info["nbytes"] > len(self._mmap):
+            raise SnapshotError(f"스냅샷 섹션이 잘렸습니다: {name}")
+        if verify and zlib.crc32(memoryview(self._mmap)[offset:offset + info["nbytes"]]) != info["crc32"]:
+            raise SnapshotError(f"스냅샷 섹션 체크섬이 맞지 않습니다: {name}")
+        count = int(np.prod(info["shape"], dtype=np.int64))
+        array = np.frombuffer(self._mmap, dtype=np.dtype(info["dtype"]), count=count, offset=offset)
+        return array.reshape(info["shape"])
+
+    def __len__(self):
+        return len(self.district_codes)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._mmap)
+
+    def facility_snapshot(self) -> FacilitySnapshot:
+        s, n = self._sections, self.located
+        return FacilitySnapshot(s["ids"][:n], s["category_codes"][:n], s["lats"][:n], s["lons"][:n], self.categories)
+
+    def facility_index(self, cell_deg: float = DEFAULT_CELL_DEG) -> FacilityGridIndex:
+        """저장된 격자를 그대로 쓰고, 셀 크기가 다르면 스냅샷 배열로 격자만 다시 만듭니다."""
+        snapshot = self.facility_snapshot()
+        cells = None
+        if cell_deg == self.header["cell_deg"]:
+            s = self._sections
+            cells = (s["grid_order"], s["grid_keys"], s["grid_starts"])
+        return FacilityGridIndex(snapshot, cell_deg, cells)
+
+    def opening_hours(self) -> OpeningHoursIndex:
+        s = self._sections
+        starts = s["rule_starts"].tolist()
+        date_rules = {
+            _to_tuple(rule): s["rule_positions"][starts[i]:starts[i + 1]]
+            for i, rule in enumerate(self.header["date_rules"])
+        }
+        arrays = {name: s[f"hours_{name}"] for name in ("ids", "weekly_ids", "holiday_ids", "weekly", "holiday")}
+        return OpeningHoursIndex.from_arrays(arrays, date_rules, self.header["skipped_hours_rows"])
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "bytes": self.nbytes,
+            "facilities": len(self),
+            "located": self.located,
+            "created_at": self.header["created_at"],
+        }
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _read_facilities(conn: sqlite3.Connection) -> tuple:
+    """(FacilitySnapshot에 들어갈 배열 + 좌표 없는 시설까지 포함한 이름/구 열)"""
+    rows = conn.execute(
+        "SELECT Facility_ID, Category, District, Name, Latitude, Longitude FROM facilities "
+        "ORDER BY (Latitude IS NULL OR Longitude IS NULL), Facility_ID"
+    ).fetchall()
+    category_index, district_index = {}, {}
+    codes, district_codes = [], []
+    for _, category, district, _, _, _ in rows:
+        codes.append(category_index.setdefault(category, len(category_index)))
+        district_codes.append(district_index.setdefault(district, len(district_index)))
+    located = sum(1 for row in rows if row[4] is not None and row[5] is not None)
+    facilities = {
+        "ids": np.array([row[0] for row in rows], dtype=np.int64),
+        "category_codes": np.array(codes, dtype=np.int32),
+        "district_codes": np.array(district_codes, dtype=np.int32),
+        "lats": np.array([row[4] if row[4] is not None else np.nan for row in rows], dtype=np.float64),
+        "lons": np.array([row[5] if row[5] is not None else np.nan for row in rows], dtype=np.float64),
+    }
+    names = StringColumn.encode([row[3] for row in rows])
+    return facilities, names, located, list(category_index), list(district_index)
+
+
+def export_snapshot(db_path: str, path: str, opening_hours: OpeningHoursIndex = None,
+                    fingerprint: dict = None, cell_deg: float = DEFAULT_CELL_DEG) -> dict:
+    """
+    db_path의 시설 데이터를 path에 스냅샷으로 씁니다. (임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 항상 온전한 파일을 봄)
+    opening_hours를 주면 이미 구축한 영업시간 인덱스를 그대로 저장하고, fingerprint를 주면 그 지문을 기록합니다.
+    (둘 다 데이터를 읽기 전에 얻은 값이어야 이후 변경을 놓치지 않음) 헤더를 반환합니다.
+    """
+    started = time.perf_counter()
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        conn.execute("BEGIN")  # 지문과 데이터를 같은 시점에서 읽음
+        if fingerprint is None:
+            fingerprint = source_fingerprint(conn)
+        if fingerprint.get(CHANGE_TABLE) is None:
+            raise SnapshotError("변경 기록 트리거가 없는 DB는 값만 바뀐 행을 알아챌 수 없어 스냅샷을 쓰지 않습니다.")
+        facilities, names, located, categories, districts = _read_facilities(conn)
+        district_rows = [
+            dict(zip(("id", "name", "en_name", "Latitude", "Longitude"), row))
+            for row in conn.execute("SELECT id, name, en_name, Latitude, Longitude FROM districts ORDER BY id")
+        ]
+        conn.rollback()
+    finally:
+        conn.close()
+    if opening_hours is None:
+        opening_hours = OpeningHoursIndex.from_db(db_path)
+
+    snapshot = FacilitySnapshot(facilities["ids"][:located], facilities["category_codes"][:located],
+                                facilities["lats"][:located], facilities["lons"][:located], categories)
+    order, keys, starts = grid_cells(snapshot, cell_deg)
+
+    rules = list(opening_hours.date_rules.items())
+    rule_starts = np.zeros(len(rules) + 1, dtype=np.int64)
+    np.cumsum([len(positions) for _, positions in rules], out=rule_starts[1:])
+    rule_positions = (np.concatenate([positions for _, positions in rules]).astype(np.int64)
+                      if rules else np.zeros(0, dtype=np.int64))
+
+    sections = dict(facilities)
+    sections.update({
+        "name_offsets": names.offsets,
+        "name_blob": names.blob,
+        "grid_order": order,
+        "grid_keys": keys,
+        "grid_starts": starts,
+        "rule_starts": rule_starts,
+        "rule_positions": rule_positions,
+    })
+    sections.update({f"hours_{name}": array for name, array in opening_hours.arrays().items()})
+
+    layout, offset = {}, 0
+    for name, array in sections.items():
+        array = np.ascontiguousarray(array)
+        sections[name] = array
+        layout[name] = {
+            "offset": offset,
+            "nbytes": array.nbytes,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "crc32": zlib.crc32(memoryview(array).cast('B')),
+        }
+        offset = _align(offset + array.nbytes)
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "created_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "source": fingerprint,
+        "cell_deg": cell_deg,
+        "located": located,
+        "categories": categories,
+        "districts": districts,
+        "district_rows": district_rows,
+        "date_rules": [rule for rule, _ in rules],
+        "skipped_hours_rows": opening_hours.skipped_rows,
+        "sections": layout,
+    }
+    raw = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    data_start = _align(PREFIX.size + len(raw))
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, len(raw), zlib.crc32(raw)))
+            f.write(raw)
+            for name, array in sections.items():
+                f.seek(data_start + layout[name]["offset"])
+                f.write(memoryview(array).cast('B'))
+            f.truncate(data_start + offset)  # 마지막 섹션 뒤 정렬 여백까지 (빈 섹션도 파일 안에 있도록)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    print(f"[스냅샷] 시설 {len(facilities['ids'])}개를 {path}에 저장 "
+          f"({os.path.getsize(path) / 1024 / 1024:.1f}MB, {time.perf_counter() - started:.2f}초)")
+    return header
+
+
+def load_snapshot(path: str, db_path: str, verify: bool = True):
+    """
+    path의 스냅샷이 db_path와 같은 데이터로 만든 것이면 SnapshotFile을, 아니면 (없음/오래됨/손상) None을 반환합니다.
+    두 번째 값은 비교에 쓴 원본 지문입니다. (스냅샷을 다시 쓸 때 export_snapshot에 넘김)
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        fingerprint = source_fingerprint(conn)
+    finally:
+        conn.close()
+    if fingerprint.get(CHANGE_TABLE) is None:
+        print("[스냅샷] 변경 기록 트리거가 없어 (값만 바뀐 행을 알 수 없음) 사용 안 함 - SQLite에서 구축합니다.")
+        return None, fingerprint
+    if not os.path.exists(path):
+        print(f"[스냅샷] {path} 없음 - SQLite에서 구축합니다.")
+        return None, fingerprint
+
+    started = time.perf_counter()
+    try:
+        snapshot = SnapshotFile(path, verify=verify)
+    except (OSError, SnapshotError, KeyError, ValueError) as e:
+        print(f"[스냅샷] 사용 안 함 ({e}) - SQLite에서 구축합니다.")
+        return None, fingerprint
+    if snapshot.fingerprint != fingerprint:
+        print("[스냅샷] 원본 DB가 바뀌어 사용 안 함 - SQLite에서 구축합니다.")
+        return None, fingerprint
+
+    print(f"[스냅샷] {path} 사용 (시설 {len(snapshot)}개, {snapshot.nbytes / 1024 / 1024:.1f}MB, "
+          f"{(time.perf_counter() - started) * 1000:.0f}ms, 체크섬 {'확인' if verify else '생략'})")
+    return snapshot, fingerprint
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', required=True, help="원본 SQLite 파일")
+    parser.add_argument('--out', help="스냅샷 파일 (기본: DB 파일 이름.snapshot)")
+    parser.add_argument('--cell-deg', type=float, default=DEFAULT_CELL_DEG)
+    args = parser.parse_args()
+    ensure_change_log(args.db)  # 이후 UPDATE도 알아채도록 변경 기록 트리거를 먼저 만듦
+    export_snapshot(args.db, args.out or default_snapshot_path(args.db), cell_deg=args.cell_deg)
+
+
+if __name__ == '__main__':
+    main()
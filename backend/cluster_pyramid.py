@@ -0,0 +1,249 @@
+# backend/cluster_pyramid.py
+"""
+지도 화면(bbox + 줌)용 시설 클러스터 피라미드입니다.
+
+줌 z에서 웹 메르카토르 화면을 CLUSTER_CELL_PX 픽셀 칸으로 나누면 한 변에 2^(z+2)칸이고,
+z칸 하나는 z+1의 2x2칸과 정확히 겹칩니다. 그래서 가장 세밀한 줌의 (칸, 카테고리)별 개수/좌표 합을
+한 번 구한 뒤 위 줌으로 합쳐 올라가며 전체 피라미드를 만듭니다. (시설 수가 아니라 채워진 칸 수만큼의 작업)
+
+조회는 화면에 걸친 칸 행마다 searchsorted 두 번으로 구간을 잘라 합치므로, 시설 수와 관계없이
+화면에 보이는 칸 수만큼만 일합니다.
+"""
+import math
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+TILE_PX = 256                 # 웹 메르카토르 타일 한 변 (줌 0에서 세계 전체 = 256px)
+CLUSTER_CELL_PX = 64          # 클러스터 칸 한 변 (화면 픽셀)
+MAX_CLUSTER_ZOOM = 16         # 이 줌까지 클러스터, 더 확대하면 개별 시설 (서울에서 64px ≈ 120m)
+MAX_ZOOM = 21
+MAX_VIEW_CELLS = 64 * 64      # 한 번에 조회할 수 있는 최대 칸 수 (약 4096px 화면)
+MAX_LATITUDE = 85.05112878    # 웹 메르카토르로 나타낼 수 있는 위도
+
+
+def cells_per_side(zoom: int) -> int:
+    return (TILE_PX << zoom) // CLUSTER_CELL_PX
+
+
+def mercator_xy(lats, lons) -> tuple:
+    """위경도를 0~1 범위의 웹 메르카토르 좌표(x는 동쪽, y는 남쪽으로 커짐)로 바꿉니다."""
+    lats = np.clip(np.asarray(lats, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE)
+    x = (np.asarray(lons, dtype=np.float64) + 180.0) / 360.0
+    sin_lat = np.sin(np.radians(lats))
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return x, y
+
+
+def cell_to_latlon(x: float, y: float) -> tuple:
+    """메르카토르 좌표(0~1)를 위경도로 되돌립니다. (칸 경계 계산용)"""
+    lon = x * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+    return lat, lon
+
+
+class CellRange(NamedTuple):
+    """줌 z 칸 단위로 바깥쪽에 맞춘 화면 범위 (양 끝 포함). 같은 범위면 같은 응답이므로 캐시 키로 씁니다."""
+    zoom: int
+    x_lo: int
+    x_hi: int
+    y_lo: int
+    y_hi: int
+
+    @property
+    def cell_count(self) -> int:
+        return (self.x_hi - self.x_lo + 1) * (self.y_hi - self.y_lo + 1)
+
+    def bbox(self) -> tuple:
+        """(min_lat, min_lon, max_lat, max_lon)"""
+        n = cells_per_side(self.zoom)
+        max_lat, min_lon = cell_to_latlon(self.x_lo / n, self.y_lo / n)
+        min_lat, max_lon = cell_to_latlon((self.x_hi + 1) / n, (self.y_hi + 1) / n)
+        return min_lat, min_lon, max_lat, max_lon
+
+
+def parse_bbox(value) -> tuple:
+    """"min_lon,min_lat,max_lon,max_lat" (GeoJSON 순서) 문자열 또는 목록을 (min_lat, min_lon, max_lat, max_lon)으로"""
+    if isinstance(value, str):
+        value = value.split(',')
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in value)
+    except (TypeError, ValueError):
+        raise ValueError("bbox는 'min_lon,min_lat,max_lon,max_lat' 형식이어야 합니다.") from None
+    if not all(map(math.isfinite, (min_lon, min_lat, max_lon, max_lat))):
+        raise ValueError("bbox 값이 올바르지 않습니다.")
+    if min_lat > max_lat or min_lon > max_lon:
+        raise ValueError("bbox의 최소값이 최대값보다 큽니다.")
+    if not (-90 <= min_lat <= 90 and -90 <= max_lat <= 90 and -180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+        raise ValueError("bbox가 위경도 범위를 벗어났습니다.")
+    return min_lat, min_lon, max_lat, max_lon
+
+
+def cell_range(bbox: tuple, zoom: int) -> CellRange:
+    """bbox를 줌 zoom의 칸 경계에 맞춰 바깥쪽으로 넓힙니다. 칸이 너무 많으면 ValueError."""
+    min_lat, min_lon, max_lat, max_lon = bbox
+    n = cells_per_side(zoom)
+    (x_lo, x_hi), (y_lo, y_hi) = mercator_xy([max_lat, min_lat], [min_lon, max_lon])
+    cells = CellRange(
+        zoom,
+        min(int(x_lo * n), n - 1), min(int(x_hi * n), n - 1),
+        min(int(y_lo * n), n - 1), min(int(y_hi * n), n - 1),
+    )
+    if cells.cell_count > MAX_VIEW_CELLS:
+        raise ValueError(f"bbox가 줌 {zoom}에 비해 너무 넓습니다. (최대 {MAX_VIEW_CELLS}칸)")
+    return cells
+
+
+class ClusterLevel(NamedTuple):
+    """한 줌의 (칸, 카테고리)별 집계. keys(= y * n + x) 오름차순, 같은 칸 안에서는 카테고리 코드 순입니다."""
+    zoom: int
+    keys: np.ndarray
+    codes: np.ndarray
+    counts: np.ndarray
+    sum_lats: np.ndarray
+    sum_lons: np.ndarray
+
+
+def _group(keys: np.ndarray, codes: np.ndarray, counts: np.ndarray, lats: np.ndarray, lons: np.ndarray, zoom: int):
+    """(칸, 카테고리)가 같은 행을 합칩니다. lats/lons는 좌표 합 (가장 세밀한 줌에서는 좌표 그대로)"""
+    order = np.lexsort((codes, keys))
+    keys, codes = keys[order], codes[order]
+    if len(keys) == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return ClusterLevel(zoom, keys, codes, np.empty(0, dtype=np.int64), empty, empty)
+    starts = np.concatenate(([0], np.flatnonzero((keys[1:] != keys[:-1]) | (codes[1:] != codes[:-1])) + 1))
+    return ClusterLevel(
+        zoom, keys[starts], codes[starts],
+        np.add.reduceat(counts[order], starts),
+        np.add.reduceat(lats[order], starts),
+        np.add.reduceat(lons[order], starts),
+    )
+
+
+class ClusterPyramid:
+    """
+    줌 0 ~ MAX_CLUSTER_ZOOM의 ClusterLevel 묶음입니다. 시설 인덱스(스냅샷)로 만들며 만든 뒤에는 바뀌지 않습니다.
+    클러스터 좌표는 칸 중심이 아니라 칸 안 시설들의 평균 위치(무게중심)입니다.
+    """
+
+    def __init__(self, levels: list, categories: list, size: int):
+        self.levels = levels
+        self.categories = list(categories)
+        self.category_index = {name: code for code, name in enumerate(self.categories)}
+        self.size = size
+
+    @classmethod
+    def from_snapshot(cls, snapshot, max_zoom: int = MAX_CLUSTER_ZOOM) -> 'ClusterPyramid':
+        located = np.flatnonzero(np.isfinite(snapshot.lats) & np.isfinite(snapshot.lons))  # 증분 반영으로 지운 행 제외
+        lats = snapshot.lats[located]
+        lons = snapshot.lons[located]
+        codes = snapshot.category_codes[located]
+        x, y = mercator_xy(lats, lons)
+
+        n = cells_per_side(max_zoom)
+        keys = np.minimum((y * n).astype(np.int64), n - 1) * n + np.minimum((x * n).astype(np.int64), n - 1)
+        level = _group(keys, codes, np.ones(len(keys), dtype=np.int64), lats, lons, max_zoom)
+        levels = [level]
+        for zoom in range(max_zoom - 1, -1, -1):
+            # z+1의 (x, y) 칸은 z의 (x // 2, y // 2) 칸 안에 들어갑니다.
+            child_n = n
+            n //= 2
+            parent_keys = (level.keys // child_n // 2) * n + (level.keys % child_n) // 2
+            level = _group(parent_keys, level.codes, level.counts, level.sum_lats, level.sum_lons, zoom)
+            levels.append(level)
+        levels.reverse()
+        return cls(levels, snapshot.categories, len(located))
+
+    @property
+    def max_zoom(self) -> int:
+        return len(self.levels) - 1
+
+    def clusters(self, cells: CellRange, categories: list = None) -> list:
+        """
+        cells 범위의 클러스터를 [{"lat", "lon", "count", "categories": {카테고리: 개수}}, ...]로 반환합니다.
+        categories가 비어 있으면 모든 카테고리를 셉니다.
+        """
+        level = self.levels[cells.zoom]
+        n = cells_per_side(cells.zoom)
+        rows = np.arange(cells.y_lo, cells.y_hi + 1, dtype=np.int64) * n
+        starts = np.searchsorted(level.keys, rows + cells.x_lo, side='left')
+        stops = np.searchsorted(level.keys, rows + cells.x_hi, side='right')
+        spans = [np.arange(start, stop) for start, stop in zip(starts.tolist(), stops.tolist()) if stop > start]
+        if not spans:
+            return []
+        selected = np.concatenate(spans)
+
+        if categories:
+            codes = [self.category_index[c] for c in categories if c in self.category_index]
+            selected = selected[np.isin(level.codes[selected], codes)]
+            if not len(selected):
+                return []
+
+        keys = level.keys[selected]
+        bounds = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1, [len(keys)]))
+        counts = np.add.reduceat(level.counts[selected], bounds[:-1])
+        lats = np.add.reduceat(level.sum_lats[selected], bounds[:-1]) / counts
+        lons = np.add.reduceat(level.sum_lons[selected], bounds[:-1]) / counts
+        entry_codes = level.codes[selected].tolist()
+        entry_counts = level.counts[selected].tolist()
+
+        clusters = []
+        for i, (start, stop) in enumerate(zip(bounds[:-1].tolist(), bounds[1:].tolist())):
+            clusters.append({
+                "lat": round(float(lats[i]), 6),
+                "lon": round(float(lons[i]), 6),
+                "count": int(counts[i]),
+                "categories": {self.categories[entry_codes[j]]: entry_counts[j] for j in range(start, stop)},
+            })
+        return clusters
+
+    def stats(self) -> dict:
+        return {
+            "facilities": self.size,
+            "max_zoom": self.max_zoom,
+            "entries": sum(len(level.keys) for level in self.levels),
+            "bytes": sum(
+                level.keys.nbytes + level.codes.nbytes + level.counts.nbytes
+                + level.sum_lats.nbytes + level.sum_lons.nbytes for level in self.levels
+            ),
+        }
+
+
+class PyramidCache:
+    """
+    시설 인덱스 버전마다 피라미드를 한 번만 만듭니다. 데이터가 갱신되면(버전이 바뀌면) 다음 조회 때 다시 만들고,
+    그동안 다른 요청은 같은 잠금에서 기다렸다가 새로 만든 피라미드를 씁니다.
+    """
+
+    def __init__(self, max_zoom: int = MAX_CLUSTER_ZOOM):
+        self.max_zoom = max_zoom
+        self._lock = threading.Lock()
+        self._built = (None, None)  # (인덱스 버전, 피라미드) - 참조 하나로 바꿔 끼움
+        self.builds = 0
+        self.last_build_ms = None
+
+    def get(self, current) -> ClusterPyramid:
+        """current: facility_reload.FacilityIndexes (index, opening_hours, version)"""
+        version, pyramid = self._built
+        if version == current.version:
+            return pyramid
+        with self._lock:
+            version, pyramid = self._built
+            if version != current.version:
+                started = time.perf_counter()
+                pyramid = ClusterPyramid.from_snapshot(current.index.snapshot, self.max_zoom)
+                self._built = (current.version, pyramid)
+                self.builds += 1
+                self.last_build_ms = round((time.perf_counter() - started) * 1000, 1)
+            return pyramid
+
+    def stats(self) -> dict:
+        version, pyramid = self._built
+        return {
+            "version": version,
+            "builds": self.builds,
+            "last_build_ms": self.last_build_ms,
+            **(pyramid.stats() if pyramid is not None else {}),
+        }
@@ -0,0 +1,181 @@
+# backend/db_pool.py
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# 읽기 전용 연결에 적용할 기본 PRAGMA 값
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024   # 256MB 메모리 매핑
+DEFAULT_CACHE_SIZE_KB = 16 * 1024       # 연결당 16MB 페이지 캐시
+DEFAULT_CACHED_STATEMENTS = 256         # 연결당 준비된 SQL 문 캐시 개수
+DEFAULT_MAX_IDLE = 16                   # 반납 후 보관할 최대 유휴 연결 수
+
+
+def sqlite_path_from_uri(uri: str) -> str:
+    """
+    'sqlite:///경로' 형태의 SQLAlchemy URI에서 파일 경로를 꺼냅니다.
+    """
+    prefix = 'sqlite:///'
+    if not uri.startswith(prefix):
+        raise ValueError(f"SQLite URI가 아닙니다: {uri}")
+    return os.path.abspath(uri[len(prefix):])
+
+
+def enable_wal(db_path: str):
+    """
+    DB 파일을 WAL 모드로 전환합니다. (파일에 저장되므로 서버 시작 시 1회면 충분)
+    WAL 모드에서는 읽기 연결이 쓰기 작업에 막히지 않습니다.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        print(f"[DB 풀] journal_mode={mode}")
+    finally:
+        conn.close()
+
+
+# 시설 ID로 자식 테이블을 읽는 조회(상세/일괄 상세)용 인덱스
+FACILITY_CHILD_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_openinghours_facility ON OpeningHours(Facility_ID)",
+    "CREATE INDEX IF NOT EXISTS idx_holidayinfo_facility ON HolidayInfo(Facility_ID)",
+]
+
+
+def ensure_indexes(db_path: str):
+    """
+    조회에 필요한 인덱스가 없으면 만듭니다. (읽기 연결은 읽기 전용이므로 서버 시작 시 1회)
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            for sql in FACILITY_CHILD_INDEXES:
+                conn.execute(sql)
+    except sqlite3.OperationalError as e:
+        print(f"[DB 경고] 인덱스를 만들 수 없습니다: {e}")
+    finally:
+        conn.close()
+
+
+class ReadConnectionPool:
+    """
+    읽기 전용 SQLite 연결을 재사용하는 풀입니다.
+    요청마다 connect/close 하지 않고, 한 번 연 연결에 PRAGMA와 SQL 문 캐시를 유지한 채 돌려 씁니다.
+
+    같은 스레드 안에서 중첩해서 connection()을 열면 같은 연결을 그대로 씁니다.
+    """
+
+    def __init__(self, db_path: str,
+                 mmap_size: int = DEFAULT_MMAP_SIZE,
+                 cache_size_kb: int = DEFAULT_CACHE_SIZE_KB,
+                 cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+                 max_idle: int = DEFAULT_MAX_IDLE):
+        self.db_path = db_path
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self.cached_statements = cached_statements
+        self.max_idle = max_idle
+
+        self._uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+        self._idle = []  # 반납된 연결 (LIFO: 최근에 쓴 연결의 캐시가 따뜻함)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self._created = 0
+        self._closed = 0
+        self._checkouts = 0
+        self._reused = 0
+        self._in_use = 0
+        self._peak_in_use = 0
+
+    @classmethod
+    def from_uri(cls, uri: str, **kwargs) -> 'ReadConnectionPool':
+        return cls(sqlite_path_from_uri(uri), **kwargs)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._uri, uri=True,
+            check_same_thread=False,  # 풀에서 다른 스레드로 넘겨 쓰므로 필요
+            cached_statements=self.cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size={-int(self.cache_size_kb)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA query_only=1")
+        return conn
+
+    def _checkout(self) -> sqlite3.Connection:
+        with self._lock:
+            self._checkouts += 1
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            if self._idle:
+                self._reused += 1
+                return self._idle.pop()
+            self._created += 1
+
+        try:
+            return self._open()
+        except sqlite3.Error:
+            with self._lock:
+                self._in_use -= 1
+                self._created -= 1
+            raise
+
+    def _release(self, conn: sqlite3.Connection):
+        with self._lock:
+            self._in_use -= 1
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+            self._closed += 1
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """
+        with read_pool.connection() as conn: 형태로 읽기 연결을 빌려 씁니다.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            # 같은 스레드의 중첩 사용: 이미 빌린 연결을 그대로 사용
+            yield conn
+            return
+
+        conn = self._checkout()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            if conn.in_transaction:
+                conn.rollback()
+            self._release(conn)
+
+    def close_all(self):
+        """유휴 연결을 모두 닫습니다. (사용 중인 연결은 반납 시 정리됩니다)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._closed += len(idle)
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "db_path": self.db_path,
+                "created": self._created,
+                "closed": self._closed,
+                "open": self._created - self._closed,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "peak_in_use": self._peak_in_use,
+                "checkouts": self._checkouts,
+                "reused": self._reused,
+                "reuse_ratio": round(self._reused / self._checkouts, 4) if self._checkouts else 0.0,
+                "max_idle": self.max_idle,
+                "mmap_size": self.mmap_size,
+                "cache_size_kb": self.cache_size_kb,
+                "cached_statements": self.cached_statements,
+            }
@@ -0,0 +1,618 @@
+# backend/facility_ingest.py
+"""
+CSV/JSONL 시설 파일을 Facilities / OpeningHours / HolidayInfo 테이블에 적재합니다.
+
+    cd backend
+    python facility_ingest.py facilities.jsonl --db ../animalloo_en_db.sqlite
+    python facility_ingest.py dump.csv --db ../animalloo_en_db.sqlite --dry-run --rejects /tmp/rejects.jsonl
+
+한 행(줄)이 시설 하나이고, 열 이름은 DB 컬럼명(Name, Latitude ...)과 API 필드명(name, road_address ...) 모두 됩니다.
+    opening_hours  [{"day_of_week": "Monday", "opens": "09:00", "closes": "18:00"}, ...] (상세 API와 같은 형태)
+                   CSV에서는 같은 JSON 문자열 또는 "Monday 09:00-18:00; Tuesday 09:00-18:00"
+    holidays       ["일요일", "법정공휴일"] (CSV에서는 "일요일|법정공휴일")
+
+- 구/카테고리는 districts 테이블과 기존 카테고리 이름으로 맞춥니다. ("강남구", "Gangnam-gu" -> DB의 구 값)
+- 가까운 곳(50m 이내)에 이름이 거의 같은 시설이 이미 있거나 같은 파일에 먼저 나왔으면 중복으로 건너뜁니다.
+- 파일 전체를 트랜잭션 하나로 넣습니다. 중간에 실패하면 아무것도 바뀌지 않습니다.
+  행마다 돌던 트리거(FTS, 변경 기록)는 적재하는 동안 내려 두었다가 끝에 새 시설만 한 번에 반영하고,
+  실행 중인 서버에는 전체 다시 읽기 표시를 남깁니다.
+"""
+import argparse
+import csv
+import json
+import math
+import re
+import sqlite3
+import time
+import unicodedata
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+from facility_reload import CHANGE_TABLE, ensure_change_log
+from fts import FTS_TABLE
+from LLM_part.LLM import DB_CATEGORIES
+from LLM_part.intent import CATEGORY_TERMS
+from serializers import COLUMN_BY_FIELD
+
+try:
+    import orjson  # 설치되어 있으면 JSONL 줄을 더 빨리 읽음
+except ImportError:
+    orjson = None
+
+INSERT_BATCH = 5_000          # executemany 한 번에 넣을 시설 수
+DUPLICATE_RADIUS_M = 50.0     # 이 거리 안의 시설끼리만 이름을 비교
+NAME_SIMILARITY = 0.85        # 정규화한 이름의 유사도가 이 값 이상이면 중복
+HASH_CELL_DEG = 0.001         # 중복 검사용 격자 크기 (약 110m x 90m, 주변 9칸이면 50m를 모두 덮음)
+FACILITY_TABLES = ('Facilities', 'OpeningHours', 'HolidayInfo')
+HOURS_FIELD = 'opening_hours'
+HOLIDAYS_FIELD = 'holidays'
+FIELD_ALIASES = {'openinghours': HOURS_FIELD, 'day_off': HOLIDAYS_FIELD, 'holidayinfo': HOLIDAYS_FIELD}
+
+DAY_NAMES = {
+    'monday': 'Monday', 'mon': 'Monday', '월': 'Monday', '월요일': 'Monday',
+    'tuesday': 'Tuesday', 'tue': 'Tuesday', '화': 'Tuesday', '화요일': 'Tuesday',
+    'wednesday': 'Wednesday', 'wed': 'Wednesday', '수': 'Wednesday', '수요일': 'Wednesday',
+    'thursday': 'Thursday', 'thu': 'Thursday', '목': 'Thursday', '목요일': 'Thursday',
+    'friday': 'Friday', 'fri': 'Friday', '금': 'Friday', '금요일': 'Friday',
+    'saturday': 'Saturday', 'sat': 'Saturday', '토': 'Saturday', '토요일': 'Saturday',
+    'sunday': 'Sunday', 'sun': 'Sunday', '일': 'Sunday', '일요일': 'Sunday',
+    '법정공휴일': '법정공휴일', '공휴일': '법정공휴일', 'holiday': '법정공휴일',
+}
+TRUE_WORDS = {'1', 'true', 'y', 'yes', 'o', '예', '가능', '있음'}
+FALSE_WORDS = {'0', 'false', 'n', 'no', 'x', '아니오', '불가', '불가능', '없음'}
+TIME_PATTERN = re.compile(r'^(\d{1,2}):?(\d{2})$')
+HOURS_ITEM = re.compile(r'^\s*(\S+)\s+(\d{1,2}:?\d{2})\s*[-~]\s*(\d{1,2}:?\d{2})\s*$')
+NAME_NOISE = re.compile(r'\(주\)|주식회사|[^0-9a-z가-힣]')
+DIGITS = re.compile(r'\d+')
+
+
+class InvalidRow(ValueError):
+    """적재할 수 없는 행 (이름/좌표가 잘못됨 등)"""
+
+
+def _key(value) -> str:
+    """비교용 이름: 유니코드 정규화 + 소문자 + 공백/기호 제거"""
+    text = unicodedata.normalize('NFKC', str(value)).lower()
+    return re.sub(r'[\s\-_.·]', '', text)
+
+
+def _text(value):
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _to_int(value):
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if not value:
+            return None
+        if value in TRUE_WORDS:
+            return 1
+        if value in FALSE_WORDS:
+            return 0
+        return int(float(value))
+    return None if value is None else int(value)
+
+
+def _to_float(value):
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+    return None if value is None else float(value)
+
+
+def _converter(declared: str):
+    # SQLite 타입 친화성 규칙과 같은 순서로 선언 타입을 봅니다.
+    if 'INT' in declared:
+        return _to_int
+    if 'CHAR' in declared or 'CLOB' in declared or 'TEXT' in declared:
+        return _text
+    if 'REAL' in declared or 'FLOA' in declared or 'DOUB' in declared:
+        return _to_float
+    return _text
+
+
+# ---------- 구 / 카테고리 정규화 ----------
+class DistrictNormalizer:
+    """
+    districts 테이블 기준으로 구 이름을 Facilities.District에 쓰는 값(en_name)으로 맞춥니다.
+    "강남구", "강남", "Gangnam-gu", "Gangnam District" 모두 같은 값이 되고,
+    구가 비어 있으면 주소("서울특별시 강남구 ...")에서 찾습니다.
+    """
+
+    def __init__(self, rows: list):
+        self._by_key = {}
+        self._by_korean = {}
+        self._memo = {}  # 입력 값 -> 결과 (같은 구 이름이 계속 반복되므로)
+        for name, en_name in rows:
+            value = en_name or name
+            base = (en_name or '').replace('Administrative divisions of ', '').replace(' District', '')
+            keys = [name, en_name, base, f"{base}gu", f"{base} district"] if base else [name, en_name]
+            if name and len(name) >= 3:
+                keys.append(name[:-1])  # "강남구" -> "강남" ("중구" -> "중"은 너무 짧아 제외)
+            for key in keys:
+                if key:
+                    self._by_key.setdefault(_key(key), value)
+            if name:
+                self._by_korean[name] = value
+
+    @classmethod
+    def from_db(cls, conn: sqlite3.Connection) -> 'DistrictNormalizer':
+        return cls(conn.execute("SELECT name, en_name FROM districts").fetchall())
+
+    def __call__(self, value, *addresses):
+        """(DB 값, 알아봤는지). 모르는 구 이름은 입력 그대로 둡니다."""
+        text = _text(value)
+        if text is not None:
+            result = self._memo.get(text)
+            if result is None:
+                found = self._by_key.get(_key(text))
+                result = self._memo[text] = (found, True) if found else (text, False)
+            return result
+        for address in addresses:
+            for token in (address or '').split():
+                if token in self._by_korean:
+                    return self._by_korean[token], True
+        return None, True
+
+
+class CategoryNormalizer:
+    """
+    기존 카테고리 이름(DB + DB_CATEGORIES)과 검색어 사전의 용어로 카테고리를 맞춥니다.
+    값 전체가 용어와 같을 때만 바꾸고 ("동물병원" -> "veterinary hospital"), 모르는 값은 그대로 둡니다.
+    """
+
+    def __init__(self, categories):
+        self._by_key = {}
+        self._memo = {}
+        for category in categories:
+            self._by_key.setdefault(_key(category), category)
+        for category, terms in CATEGORY_TERMS.items():
+            for term in terms:
+                self._by_key.setdefault(_key(term), category)
+
+    @classmethod
+    def from_db(cls, conn: sqlite3.Connection) -> 'CategoryNormalizer':
+        existing = [row[0] for row in conn.execute(
+            "SELECT DISTINCT Category FROM Facilities WHERE Category IS NOT NULL")]
+        return cls(list(DB_CATEGORIES) + existing)
+
+    def __call__(self, value):
+        text = _text(value)
+        if text is None:
+            return None, True
+        result = self._memo.get(text)
+        if result is None:
+            found = self._by_key.get(_key(text))
+            result = self._memo[text] = (found, True) if found else (text, False)
+        return result
+
+
+# ---------- 중복 검사 ----------
+def _name_key(name: str) -> str:
+    return NAME_NOISE.sub('', unicodedata.normalize('NFKC', name).lower())
+
+
+class DuplicateIndex:
+    """
+    공간 해시(HASH_CELL_DEG 격자) + 이름 유사도로 거의 같은 시설을 찾습니다.
+    주변 9칸에서 DUPLICATE_RADIUS_M 안의 시설만 이름을 비교하므로 시설 수가 늘어도 한 건 검사 비용은 거의 같습니다.
+    이름에 든 숫자가 다르면 ("2호점", "약국 123") 비슷해도 다른 시설로 봅니다.
+    좌표가 없는 시설은 정규화한 이름 + 주소가 같을 때만 중복입니다.
+    """
+
+    def __init__(self):
+        self._cells = {}
+        self._unlocated = {}
+
+    @staticmethod
+    def _cell(lat: float, lon: float) -> tuple:
+        return int(lat // HASH_CELL_DEG), int(lon // HASH_CELL_DEG)
+
+    def probe(self, name: str, lat, lon, address=None) -> tuple:
+        """find/add에 넘길 비교용 값. 이름 정규화는 시설마다 한 번만 합니다."""
+        name_key = _name_key(name or '')
+        if lat is None or lon is None:
+            return None, (name_key, _key(address or ''))
+        return self._cell(lat, lon), (lat, lon, name_key, DIGITS.findall(name_key))
+
+    def add(self, probe: tuple, facility_id: int):
+        cell, entry = probe
+        if cell is None:
+            self._unlocated.setdefault(entry, facility_id)
+        else:
+            self._cells.setdefault(cell, []).append((*entry, facility_id))
+
+    def find(self, probe: tuple):
+        """중복으로 보이는 기존 시설 ID, 없으면 None"""
+        cell, entry = probe
+        if cell is None:
+            return self._unlocated.get(entry)
+
+        lat, lon, name_key, digits = entry
+        row, col = cell
+        lon_scale = max(0.01, math.cos(math.radians(lat)))
+        for d_row in (-1, 0, 1):
+            for d_col in (-1, 0, 1):
+                for other_lat, other_lon, other_key, other_digits, facility_id in self._cells.get(
+                        (row + d_row, col + d_col), ()):
+                    if digits != other_digits:
+                        continue
+                    # 50m 정도에서는 평면 근사로 충분합니다.
+                    dy = (lat - other_lat) * 111_320.0
+                    dx = (lon - other_lon) * 111_320.0 * lon_scale
+                    if dx * dx + dy * dy > DUPLICATE_RADIUS_M ** 2:
+                        continue
+                    if name_key == other_key:
+                        return facility_id
+                    matcher = SequenceMatcher(None, name_key, other_key)
+                    if matcher.quick_ratio() >= NAME_SIMILARITY and matcher.ratio() >= NAME_SIMILARITY:
+                        return facility_id
+        return None
+
+    @classmethod
+    def from_db(cls, conn: sqlite3.Connection) -> 'DuplicateIndex':
+        index = cls()
+        for facility_id, name, lat, lon, address in conn.execute(
+                "SELECT Facility_ID, Name, Latitude, Longitude, coalesce(RoadAddress, LotAddress) FROM Facilities"):
+            index.add(index.probe(name, lat, lon, address), facility_id)
+        return index
+
+
+# ---------- 입력 파일 ----------
+def iter_records(path: str, fmt: str = None):
+    """(줄 번호, 행 dict 또는 InvalidRow)를 차례로 만듭니다. 파일 전체를 메모리에 올리지 않습니다."""
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+            return
+        loads = orjson.loads if orjson is not None else json.loads
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = loads(line)
+            except ValueError as e:  # json/orjson.JSONDecodeError
+                yield line_no, InvalidRow(f"JSON 형식 오류: {e}")
+                continue
+            yield line_no, record if isinstance(record, dict) else InvalidRow("JSON 객체가 아님")
+
+
+@lru_cache(maxsize=4096)
+def _parse_time(value: str) -> str:
+    match = TIME_PATTERN.match(value.strip())
+    if not match or int(match.group(1)) > 24 or int(match.group(2)) > 59:
+        raise InvalidRow(f"시간 형식 오류: {value!r}")
+    return f"{int(match.group(1)):02d}:{match.group(2)}"
+
+
+@lru_cache(maxsize=1024)
+def _parse_day(value: str) -> str:
+    text = value.strip()
+    return DAY_NAMES.get(text.lower(), text)
+
+
+def parse_opening_hours(value) -> list:
+    """opening_hours 값을 [(요일, 여는 시간, 닫는 시간), ...]으로 바꿉니다."""
+    if value is None or value == '':
+        return []
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith('[') or text.startswith('{'):
+            value = json.loads(text)
+        else:
+            items = []
+            for part in text.split(';'):
+                if not part.strip():
+                    continue
+                match = HOURS_ITEM.match(part)
+                if not match:
+                    raise InvalidRow(f"영업시간 형식 오류: {part.strip()!r}")
+                items.append((_parse_day(match.group(1)), _parse_time(match.group(2)), _parse_time(match.group(3))))
+            return items
+    if isinstance(value, dict):  # {"Monday": "09:00-18:00"} 또는 {"Monday": ["09:00", "18:00"]}
+        value = [
+            {"day_of_week": day, "opens": hours[0], "closes": hours[1]} if isinstance(hours, (list, tuple))
+            else dict(zip(("day_of_week", "opens", "closes"), [day, *re.split(r'\s*[-~]\s*', str(hours), 1)]))
+            for day, hours in value.items()
+        ]
+    items = []
+    for item in value:
+        day = item.get('day_of_week') or item.get('DayOfWeek') or item.get('day')
+        opens = item.get('opens') or item.get('Opens')
+        closes = item.get('closes') or item.get('Closes')
+        if not day or opens is None or closes is None:
+            raise InvalidRow(f"영업시간 항목 오류: {item!r}")
+        items.append((_parse_day(str(day)), _parse_time(str(opens)), _parse_time(str(closes))))
+    return items
+
+
+def parse_holidays(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split('|')
+    return [text for text in (_text(v) for v in value) if text]
+
+
+# ---------- 적재 ----------
+class FacilityIngestor:
+    """
+    입력 행을 검증/정규화해 배치로 모았다가 executemany로 넣습니다.
+    ingest()가 트랜잭션과 트리거를 관리하고, 이 클래스는 행 변환과 통계만 맡습니다.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, batch_size: int = INSERT_BATCH, rejects=None):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.rejects = rejects
+
+        table_info = conn.execute('PRAGMA table_info("Facilities")').fetchall()
+        self.columns = [row[1] for row in table_info]
+        self.converters = {row[1]: _converter((row[2] or '').upper()) for row in table_info}
+        self.column_by_key = {column.lower(): column for column in self.columns}
+        self.column_by_key.update({field: column for field, column in COLUMN_BY_FIELD.items()
+                                   if column.lower() in self.column_by_key})
+        self.id_index = self.columns.index('Facility_ID')
+        self.insert_sql = (f'INSERT INTO Facilities ({", ".join(self.columns)}) '
+                           f'VALUES ({", ".join("?" * len(self.columns))})')
+        self._plans = {}  # 입력 열 이름 목록 -> [(열 이름, 컬럼명 또는 HOURS_FIELD/HOLIDAYS_FIELD, 변환 함수)]
+
+        self.districts = DistrictNormalizer.from_db(conn)
+        self.categories = CategoryNormalizer.from_db(conn)
+        self.duplicates = DuplicateIndex.from_db(conn)
+        self.known_ids = {row[0] for row in conn.execute("SELECT Facility_ID FROM Facilities")}
+        self.next_id = max(self.known_ids, default=0) + 1
+
+        self._facilities, self._hours, self._holidays = [], [], []
+        self.counts = {
+            "read": 0, "inserted": 0, "opening_hours": 0, "holidays": 0,
+            "invalid": 0, "duplicate_id": 0, "near_duplicate": 0,
+            "unknown_district": 0, "unknown_category": 0,
+        }
+        self.unknown_columns = set()
+
+    def _target(self, key) -> str:
+        if key is None:
+            return ''  # CSV에서 머리글보다 많은 칸
+        lowered = key.strip().lower()
+        if lowered in (HOURS_FIELD, HOLIDAYS_FIELD) or lowered in FIELD_ALIASES:
+            return FIELD_ALIASES.get(lowered, lowered)
+        column = self.column_by_key.get(key.strip()) or self.column_by_key.get(lowered)
+        if column is None:
+            self.unknown_columns.add(key)
+            return ''
+        return column
+
+    def _plan(self, keys: tuple) -> list:
+        # CSV는 모든 행, JSONL도 대개 모든 행의 열 순서가 같으므로 열 이름 해석은 한 번만 합니다.
+        plan = self._plans.get(keys)
+        if plan is None:
+            plan = self._plans[keys] = [
+                (key, target, self.converters.get(target)) for key in keys if (target := self._target(key))
+            ]
+        return plan
+
+    def _normalize(self, record: dict) -> tuple:
+        row = dict.fromkeys(self.columns)
+        hours, holidays = (), ()
+        target = value = None
+        try:
+            for key, target, convert in self._plan(tuple(record)):
+                value = record[key]
+                if convert is not None:
+                    row[target] = convert(value)
+                elif target == HOURS_FIELD:
+                    hours = parse_opening_hours(value)
+                else:
+                    holidays = parse_holidays(value)
+        except InvalidRow:
+            raise
+        except (TypeError, ValueError, AttributeError):
+            raise InvalidRow(f"{target} 값 오류: {value!r}") from None
+
+        if not row['Name']:
+            raise InvalidRow("Name 없음")
+        lat, lon = row['Latitude'], row['Longitude']
+        if (lat is None) != (lon is None):
+            raise InvalidRow("Latitude/Longitude 중 하나만 있음")
+        if lat is not None and not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise InvalidRow(f"좌표 범위 오류: ({lat}, {lon})")
+
+        row['District'], known = self.districts(row['District'], row['RoadAddress'], row['LotAddress'])
+        if not known:
+            self.counts["unknown_district"] += 1
+        row['Category'], known = self.categories(row['Category'])
+        if not known:
+            self.counts["unknown_category"] += 1
+        return row, hours, holidays
+
+    def add(self, line_no: int, record):
+        self.counts["read"] += 1
+        try:
+            if isinstance(record, InvalidRow):
+                raise record
+            row, hours, holidays = self._normalize(record)
+        except InvalidRow as e:
+            self.counts["invalid"] += 1
+            self._reject(line_no, str(e), record)
+            return
+
+        facility_id = row['Facility_ID']
+        if facility_id is not None and facility_id in self.known_ids:
+            self.counts["duplicate_id"] += 1
+            self._reject(line_no, "Facility_ID 중복", record, duplicate_of=facility_id)
+            return
+        probe = self.duplicates.probe(row['Name'], row['Latitude'], row['Longitude'],
+                                      row['RoadAddress'] or row['LotAddress'])
+        duplicate_of = self.duplicates.find(probe)
+        if duplicate_of is not None:
+            self.counts["near_duplicate"] += 1
+            self._reject(line_no, "가까운 곳에 이름이 비슷한 시설이 있음", record, duplicate_of=duplicate_of)
+            return
+
+        if facility_id is None:
+            while self.next_id in self.known_ids:
+                self.next_id += 1
+            facility_id = row['Facility_ID'] = self.next_id
+        self.known_ids.add(facility_id)
+        self.next_id = max(self.next_id, facility_id + 1)
+        self.duplicates.add(probe, facility_id)
+
+        self._facilities.append(tuple(row.values()))
+        self._hours.extend((facility_id, day, opens, closes) for day, opens, closes in hours)
+        self._holidays.extend((facility_id, day_off) for day_off in holidays)
+        if len(self._facilities) >= self.batch_size:
+            self.flush()
+
+    def _reject(self, line_no: int, reason: str, record, duplicate_of=None):
+        if self.rejects is None:
+            return
+        entry = {"line": line_no, "reason": reason}
+        if duplicate_of is not None:
+            entry["duplicate_of"] = duplicate_of
+        if not isinstance(record, InvalidRow):
+            entry["record"] = record
+        self.rejects.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+
+    def flush(self):
+        if not self._facilities:
+            return
+        self.conn.executemany(self.insert_sql, self._facilities)
+        self.conn.executemany("INSERT INTO temp.ingested_ids (id) VALUES (?)",
+                              [(row[self.id_index],) for row in self._facilities])
+        self.conn.executemany(
+            "INSERT INTO OpeningHours (Facility_ID, DayOfWeek, Opens, Closes) VALUES (?, ?, ?, ?)", self._hours)
+        self.conn.executemany("INSERT INTO HolidayInfo (Facility_ID, Day_Off) VALUES (?, ?)", self._holidays)
+        self.counts["inserted"] += len(self._facilities)
+        self.counts["opening_hours"] += len(self._hours)
+        self.counts["holidays"] += len(self._holidays)
+        self._facilities.clear()
+        self._hours.clear()
+        self._holidays.clear()
+
+
+def _deferred_triggers(conn: sqlite3.Connection) -> list:
+    """시설 테이블에 걸린 트리거 (FTS 동기화, 변경 기록). 적재 중에는 내려 두었다가 같은 SQL로 다시 만듭니다."""
+    placeholders = ', '.join('?' * len(FACILITY_TABLES))
+    return conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ({placeholders})",
+        FACILITY_TABLES).fetchall()
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+
+def ingest(db_path: str, path: str, fmt: str = None, batch_size: int = INSERT_BATCH,
+           dry_run: bool = False, rejects_path: str = None, progress: bool = True) -> dict:
+    """
+    path의 시설을 db_path에 넣고 통계를 반환합니다. dry_run이면 검사와 통계만 하고 되돌립니다.
+
+    - 트랜잭션 하나 안에서 트리거를 내리고 INSERT_BATCH개씩 executemany로 넣은 뒤,
+      새 시설만 FTS 인덱스에 한 번에 넣고 트리거를 다시 만듭니다. (커밋 전이므로 다른 연결은 중간 상태를 보지 않음)
+    - 새 시설 ID는 기존 최대 ID 뒤에 붙으므로 자식 테이블 인덱스는 끝에만 추가되어 따로 다시 만들지 않습니다.
+    - 변경 기록 테이블이 있으면 facility_id가 NULL인 행(전체 다시 읽기)을 남겨 실행 중인 서버가 인덱스를 새로 만들게 합니다.
+    """
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path, isolation_level=None)  # BEGIN/COMMIT을 직접 관리
+    rejects = open(rejects_path, 'w', encoding='utf-8') if rejects_path else None
+    try:
+        conn.execute("PRAGMA cache_size = -262144")  # 적재 중 페이지 캐시 256MB
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("CREATE TEMP TABLE ingested_ids (id INTEGER PRIMARY KEY)")
+            triggers = _deferred_triggers(conn)
+            trigger_names = {name for name, _ in triggers}
+            for name, _ in triggers:
+                conn.execute(f'DROP TRIGGER "{name}"')
+
+            ingestor = FacilityIngestor(conn, batch_size=batch_size, rejects=rejects)
+            if progress:
+                print(f"[적재] 기존 시설 {len(ingestor.known_ids):,}개, 구 사전/중복 검사 준비 "
+                      f"({time.perf_counter() - started:.1f}초)")
+            load_started = time.perf_counter()
+            last_report = 0.0
+            for line_no, record in iter_records(path, fmt):
+                ingestor.add(line_no, record)
+                elapsed = time.perf_counter() - load_started
+                if progress and elapsed - last_report >= 1.0:
+                    last_report = elapsed
+                    counts = ingestor.counts
+                    print(f"\r[적재] {counts['read']:,}행 읽음, {counts['inserted'] + len(ingestor._facilities):,}개 추가 "
+                          f"({counts['read'] / elapsed:,.0f}행/초)", end='', flush=True)
+            ingestor.flush()
+            load_seconds = time.perf_counter() - load_started
+
+            finish_started = time.perf_counter()
+            if f"{FTS_TABLE}_ai" in trigger_names and ingestor.counts["inserted"]:
+                conn.execute(
+                    f"INSERT INTO {FTS_TABLE}(rowid, Name, Description, RoadAddress) "
+                    "SELECT Facility_ID, Name, Description, RoadAddress FROM Facilities "
+                    "WHERE Facility_ID IN (SELECT id FROM temp.ingested_ids)")
+            for _, sql in triggers:
+                conn.execute(sql)
+            if _table_exists(conn, CHANGE_TABLE) and ingestor.counts["inserted"]:
+                conn.execute(f"INSERT INTO {CHANGE_TABLE}(facility_id) VALUES (NULL)")
+            conn.execute("DROP TABLE temp.ingested_ids")
+            conn.execute("ROLLBACK" if dry_run else "COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+        if rejects is not None:
+            rejects.close()
+
+    counts = ingestor.counts
+    stats = {
+        **counts,
+        "unknown_columns": sorted(ingestor.unknown_columns),
+        "dry_run": dry_run,
+        "load_seconds": round(load_seconds, 2),
+        "finish_seconds": round(time.perf_counter() - finish_started, 2),
+        "total_seconds": round(time.perf_counter() - started, 2),
+        "rows_per_second": round(counts["read"] / load_seconds) if load_seconds > 0 else None,
+    }
+    if progress:
+        print(f"\r[적재] {counts['read']:,}행 읽음 -> 시설 {counts['inserted']:,}개, "
+              f"영업시간 {counts['opening_hours']:,}행, 휴무일 {counts['holidays']:,}행 "
+              f"{'검사만 함 (되돌림)' if dry_run else '추가'}")
+        print(f"[적재] 건너뜀: 형식 오류 {counts['invalid']:,}, ID 중복 {counts['duplicate_id']:,}, "
+              f"근접 중복 {counts['near_duplicate']:,} / 모르는 구 {counts['unknown_district']:,}, "
+              f"모르는 카테고리 {counts['unknown_category']:,}")
+        if ingestor.unknown_columns:
+            print(f"[적재] 무시한 열: {', '.join(stats['unknown_columns'])}")
+        print(f"[적재] 읽기/넣기 {stats['load_seconds']}초 ({stats['rows_per_second'] or 0:,}행/초), "
+              f"FTS/트리거 마무리 {stats['finish_seconds']}초, 전체 {stats['total_seconds']}초")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', help="CSV 또는 JSONL 파일")
+    parser.add_argument('--db', required=True, help="적재할 SQLite 파일")
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help="기본: 확장자가 .csv면 csv, 아니면 jsonl")
+    parser.add_argument('--batch-size', type=int, default=INSERT_BATCH)
+    parser.add_argument('--dry-run', action='store_true', help="검사와 통계만 하고 DB는 바꾸지 않음")
+    parser.add_argument('--rejects', help="건너뛴 행과 이유를 JSONL로 저장할 파일")
+    parser.add_argument('--snapshot', action='store_true', help="적재 후 바이너리 스냅샷도 다시 내보냄")
+    args = parser.parse_args()
+
+    stats = ingest(args.db, args.path, fmt=args.format, batch_size=args.batch_size,
+                   dry_run=args.dry_run, rejects_path=args.rejects)
+    if args.snapshot and not args.dry_run and stats["inserted"]:
+        from binary_snapshot import default_snapshot_path, export_snapshot
+        ensure_change_log(args.db)
+        export_snapshot(args.db, default_snapshot_path(args.db))
+
+
+if __name__ == '__main__':
+    main()
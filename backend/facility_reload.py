@@ -0,0 +1,313 @@
+# backend/facility_reload.py
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from log_queue import logger
+from opening_hours import OpeningHoursIndex
+from spatial_index import FacilityGridIndex
+
+CHANGE_TABLE = 'facility_changes'
+FACILITY_TABLES = ('Facilities', 'OpeningHours', 'HolidayInfo')  # 변경 기록 트리거를 다는 테이블
+DEFAULT_INTERVAL = 2.0            # 변경 확인 간격(초)
+DEFAULT_MAX_INCREMENTAL = 5000    # 한 번에 바뀐 시설이 이보다 많으면 전체 재구축
+DEFAULT_COMPACT_RATIO = 0.25      # 증분 반영으로 남은 이전 행이 시설 수의 이 비율을 넘으면 전체 재구축
+CHANGE_LOG_RETENTION = '-7 days'  # 서버 시작 시 이보다 오래된 변경 기록은 지움
+ID_CHUNK = 500                    # IN 절 하나에 넣을 최대 ID 개수
+
+# Facilities/OpeningHours/HolidayInfo가 바뀌면 바뀐 시설 ID를 남기는 트리거
+# (facility_id가 NULL인 행은 '전체 다시 읽기' 표시로, 트리거 없이 대량 적재한 뒤 직접 넣습니다)
+_CREATE_SQL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {CHANGE_TABLE} (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        facility_id INTEGER,
+        changed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+]
+CHANGE_TRIGGERS = [f"{CHANGE_TABLE}_{table.lower()}_{event}"
+                   for table in FACILITY_TABLES for event in ('ai', 'ad', 'au')]
+for _table in FACILITY_TABLES:
+    _CREATE_SQL += [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_{_table.lower()}_ai AFTER INSERT ON {_table} BEGIN
+            INSERT INTO {CHANGE_TABLE}(facility_id) VALUES (new.Facility_ID);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_{_table.lower()}_ad AFTER DELETE ON {_table} BEGIN
+            INSERT INTO {CHANGE_TABLE}(facility_id) VALUES (old.Facility_ID);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_{_table.lower()}_au AFTER UPDATE ON {_table} BEGIN
+            INSERT INTO {CHANGE_TABLE}(facility_id) VALUES (old.Facility_ID);
+            INSERT INTO {CHANGE_TABLE}(facility_id)
+            SELECT new.Facility_ID WHERE new.Facility_ID IS NOT old.Facility_ID;
+        END
+        """,
+    ]
+
+
+def ensure_change_log(db_path: str) -> bool:
+    """
+    변경 기록 테이블과 트리거를 만들고 오래된 기록을 지웁니다. (서버 시작 시 1회)
+    트리거가 없던 동안의 변경은 기록되지 않았으므로, 새로 만들었으면 '전체 다시 읽기' 표시(NULL)를 남겨
+    그 전에 만든 스냅샷이나 실행 중인 서버가 이를 최신으로 여기지 않게 합니다.
+    만들 수 없으면 (읽기 전용 DB 등) False를 반환하고, 이때는 행 수 비교로만 변경을 알아챕니다.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            created = not has_change_log(conn)
+            for sql in _CREATE_SQL:
+                conn.execute(sql)
+            if created:
+                conn.execute(f"INSERT INTO {CHANGE_TABLE}(facility_id) VALUES (NULL)")
+            # 가장 최근 기록은 남겨 둡니다. (last_change_seq가 뒤로 가지 않도록)
+            conn.execute(
+                f"DELETE FROM {CHANGE_TABLE} WHERE changed_at < datetime('now', ?) "
+                f"AND seq < (SELECT max(seq) FROM {CHANGE_TABLE})", (CHANGE_LOG_RETENTION,)
+            )
+        return True
+    except sqlite3.OperationalError as e:
+        print(f"[데이터 갱신 경고] 변경 기록 트리거를 만들 수 없습니다: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def has_change_log(conn: sqlite3.Connection) -> bool:
+    """변경 기록 테이블과 트리거가 모두 있는지. 트리거가 하나라도 없으면 그 테이블의 변경은 기록되지 않습니다."""
+    names = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE (type = 'table' AND name = ?) OR (type = 'trigger' AND name LIKE ?)",
+        (CHANGE_TABLE, f"{CHANGE_TABLE}_%"))}
+    return CHANGE_TABLE in names and all(trigger in names for trigger in CHANGE_TRIGGERS)
+
+
+def last_change_seq(conn: sqlite3.Connection) -> int:
+    return conn.execute(f"SELECT coalesce(max(seq), 0) FROM {CHANGE_TABLE}").fetchone()[0]
+
+
+def change_log_seq(conn: sqlite3.Connection):
+    """변경 기록을 믿을 수 있으면 마지막 번호, 아니면 None (같은 행의 값만 바꾼 UPDATE를 알아챌 방법이 없음)"""
+    return last_change_seq(conn) if has_change_log(conn) else None
+
+
+def _chunks(values: list, size: int = ID_CHUNK):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class FacilityIndexes(NamedTuple):
+    """한 번에 바꿔 끼우는 검색 구조 묶음. 요청은 current를 한 번 읽어 같은 버전의 인덱스만 씁니다."""
+    index: FacilityGridIndex
+    opening_hours: OpeningHoursIndex
+    version: int
+
+
+class FacilityReloader:
+    """
+    DB의 시설 데이터가 바뀌면 서버를 다시 시작하지 않고 공간/영업시간 인덱스에 반영합니다.
+
+    - 별도 스레드가 interval초마다 PRAGMA data_version으로 커밋이 있었는지만 확인하고,
+      있으면 변경 기록 테이블에서 바뀐 시설 ID를 읽어 그 시설들의 행만 다시 읽습니다.
+    - 새 인덱스는 기존 인덱스를 고치지 않고 따로 만든 뒤 current 참조 하나만 바꿔 끼우므로,
+      처리 중인 요청은 이전 인덱스를 끝까지 쓰고 반쯤 만든 상태를 보지 않습니다.
+    - 바뀐 시설이 많거나 증분 반영으로 남은 이전 행이 쌓이면 전체를 다시 구축합니다.
+    - on_swap은 바꿔 끼운 직후 불립니다. (응답 캐시 무효화 등)
+    """
+
+    def __init__(self, db_path: str, interval: float = DEFAULT_INTERVAL,
+                 max_incremental: int = DEFAULT_MAX_INCREMENTAL, compact_ratio: float = DEFAULT_COMPACT_RATIO,
+                 on_swap=None):
+        self.db_path = db_path
+        self.interval = interval
+        self.max_incremental = max_incremental
+        self.compact_ratio = compact_ratio
+        self.on_swap = on_swap
+        self.current = None
+
+        self._uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.Lock()  # 변경 반영은 한 번에 하나씩
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_raw = None
+        self._dead_rows = 0
+
+        self._incremental = 0
+        self._full = 0
+        self._changed_facilities = 0
+        self._errors = 0
+        self._last_reload_ms = None
+
+        # 인덱스를 만들기 전의 위치를 기억해 두어, 구축하는 사이에 생긴 변경도 다음 확인 때 반영합니다.
+        conn = self._connection()
+        self._use_change_log = has_change_log(conn)
+        self._last_seq = last_change_seq(conn) if self._use_change_log else 0
+        self._fingerprint = None if self._use_change_log else self._read_fingerprint(conn)
+
+    def _connection(self) -> sqlite3.Connection:
+        # fork된 작업자는 부모가 연 연결 대신 자기 연결을 엽니다.
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+            self._conn_pid = os.getpid()
+            self._last_raw = None
+        return self._conn
+
+    @staticmethod
+    def _read_fingerprint(conn: sqlite3.Connection) -> tuple:
+        return tuple(
+            conn.execute(f'SELECT count(*), coalesce(max(rowid), 0) FROM "{table}"').fetchone()
+            for table in FACILITY_TABLES
+        )
+
+    def publish(self, index: FacilityGridIndex, opening_hours: OpeningHoursIndex):
+        """처음 구축한 인덱스를 등록합니다. 이후 교체는 감시 스레드가 합니다."""
+        version = self.current.version + 1 if self.current else 1
+        self.current = FacilityIndexes(index, opening_hours, version)
+
+    # ---------- 감시 스레드 ----------
+    def start(self):
+        if self.interval <= 0:
+            return
+        self._start_thread()
+        print(f"[데이터 갱신] {self.interval}초마다 변경 확인 "
+              f"({'변경 기록 트리거' if self._use_change_log else '행 수 비교, 변경 시 전체 재구축'})")
+
+    def _start_thread(self):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='facility-reload', daemon=True)
+        self._thread.start()
+
+    def restart_in_child(self):
+        """
+        fork된 gunicorn 작업자에는 감시 스레드가 없고, 부모가 반영 중이었다면 잠금도 잡힌 채로 복사되었으므로 새로 만듭니다.
+        gunicorn의 post_fork에서만 부릅니다. (다른 자식 프로세스가 인덱스를 다시 읽지 않도록)
+        """
+        self._lock = threading.Lock()
+        if self._thread is not None:
+            self._start_thread()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                with self._lock:
+                    self._errors += 1
+                logger.exception("[데이터 갱신] 반영 실패: %s", e)
+
+    # ---------- 변경 반영 ----------
+    def check(self) -> bool:
+        """커밋이 있었으면 바뀐 시설을 반영하고, 인덱스를 바꿔 끼웠으면 True를 반환합니다."""
+        with self._lock:
+            conn = self._connection()
+            raw = conn.execute("PRAGMA data_version").fetchone()[0]
+            if raw == self._last_raw or self.current is None:
+                return False
+
+            started = time.perf_counter()
+            conn.execute("BEGIN")  # 변경 기록과 시설 행을 같은 시점에서 읽음
+            try:
+                if self._use_change_log:
+                    swapped = self._apply_change_log(conn)
+                else:
+                    swapped = self._apply_fingerprint(conn)
+            finally:
+                conn.rollback()
+            self._last_raw = raw  # 반영에 실패하면 다음 확인 때 다시 시도
+            if swapped:
+                self._last_reload_ms = round((time.perf_counter() - started) * 1000, 1)
+        if swapped and self.on_swap is not None:
+            self.on_swap()
+        return swapped
+
+    def _apply_change_log(self, conn: sqlite3.Connection) -> bool:
+        last_seq = last_change_seq(conn)
+        if last_seq <= self._last_seq:
+            return False  # 시설과 관계없는 커밋 (사용자, 즐겨찾기 등)
+        facility_ids = [row[0] for row in conn.execute(
+            f"SELECT DISTINCT facility_id FROM {CHANGE_TABLE} WHERE seq > ? AND seq <= ?",
+            (self._last_seq, last_seq))]
+
+        current = self.current
+        live = current.index.size or 1
+        if (None in facility_ids or len(facility_ids) > self.max_incremental
+                or (self._dead_rows + len(facility_ids)) / live > self.compact_ratio):
+            self._rebuild(len(facility_ids))
+            self._last_seq = last_seq
+            return True
+
+        facility_rows, hours_rows, day_off_rows = [], [], []
+        for chunk in _chunks(facility_ids):
+            placeholders = ', '.join('?' * len(chunk))
+            facility_rows += conn.execute(
+                "SELECT Facility_ID, Category, Latitude, Longitude FROM Facilities "
+                f"WHERE Facility_ID IN ({placeholders}) AND Latitude IS NOT NULL AND Longitude IS NOT NULL "
+                "ORDER BY Facility_ID", chunk).fetchall()
+            hours_rows += conn.execute(
+                "SELECT Facility_ID, DayOfWeek, Opens, Closes FROM OpeningHours "
+                f"WHERE Facility_ID IN ({placeholders})", chunk).fetchall()
+            day_off_rows += conn.execute(
+                f"SELECT Facility_ID, Day_Off FROM HolidayInfo WHERE Facility_ID IN ({placeholders})",
+                chunk).fetchall()
+
+        self.current = FacilityIndexes(
+            current.index.with_changes(facility_ids, facility_rows),
+            current.opening_hours.with_changes(facility_ids, hours_rows, day_off_rows),
+            current.version + 1,
+        )
+        self._last_seq = last_seq
+        self._dead_rows += len(facility_ids)
+        self._incremental += 1
+        self._changed_facilities += len(facility_ids)
+        logger.info("[데이터 갱신] 시설 %d개 증분 반영 (버전 %d)", len(facility_ids), self.current.version)
+        return True
+
+    def _apply_fingerprint(self, conn: sqlite3.Connection) -> bool:
+        fingerprint = self._read_fingerprint(conn)
+        if fingerprint == self._fingerprint:
+            return False
+        self._rebuild(None)
+        self._fingerprint = fingerprint
+        return True
+
+    def _rebuild(self, changed: int = None):
+        # from_db는 각자 새 연결로 읽으므로, 그 사이의 변경은 다음 확인 때 한 번 더 반영될 수 있습니다. (결과는 같음)
+        index = FacilityGridIndex.from_db(self.db_path)
+        opening_hours = OpeningHoursIndex.from_db(self.db_path)
+        self.current = FacilityIndexes(index, opening_hours, self.current.version + 1)
+        self._dead_rows = 0
+        self._full += 1
+        if changed:
+            self._changed_facilities += changed
+        logger.info("[데이터 갱신] 전체 재구축 (바뀐 시설 %s개, 버전 %d)",
+                    changed if changed is not None else '?', self.current.version)
+
+    def stats(self) -> dict:
+        # 전체 재구축 중에도 바로 응답하도록 _lock 없이 읽습니다.
+        current = self.current
+        return {
+            "version": current.version if current else None,
+            "facilities": current.index.size if current else 0,
+            "change_log": self._use_change_log,
+            "interval": self.interval,
+            "incremental_reloads": self._incremental,
+            "full_reloads": self._full,
+            "changed_facilities": self._changed_facilities,
+            "pending_compaction_rows": self._dead_rows,
+            "errors": self._errors,
+            "last_reload_ms": self._last_reload_ms,
+        }
@@ -0,0 +1,125 @@
+# backend/facility_snapshot.py
+import sqlite3
+import numpy as np
+
+EARTH_RADIUS_KM = 6371  # 지구 반지름 (km)
+
+# 여러 출발점을 한 번에 계산할 때 (출발점 x 시설) 행렬이 너무 커지지 않도록 나누는 단위
+BATCH_CELLS = 1_000_000
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    get_haversine_distance와 같은 식을 NumPy 배열 전체에 한 번에 적용합니다.
+    인자는 스칼라/배열 모두 가능하며 브로드캐스팅 규칙을 따릅니다.
+    """
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    delta_phi = np.radians(np.subtract(lat2, lat1))
+    delta_lambda = np.radians(np.subtract(lon2, lon1))
+    a = np.sin(delta_phi / 2)**2 + \
+        np.cos(phi1) * np.cos(phi2) * \
+        np.sin(delta_lambda / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+def radius_mask(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray, radius_km: float) -> tuple:
+    """
+    한 출발점에서 모든 후보까지의 거리를 구하고 (반경 내 여부, 거리) 배열을 반환합니다.
+    """
+    distances = haversine_km(lat, lon, lats, lons)
+    return distances <= radius_km, distances
+
+
+class FacilitySnapshot:
+    """
+    facilities 테이블의 (id, 카테고리 코드, 위도, 경도)를 열 단위 NumPy 배열로 보관합니다.
+    행마다 dict를 만들지 않고 배열 연산으로 거리 계산을 합니다.
+    """
+
+    def __init__(self, ids, category_codes, lats, lons, categories: list):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.category_codes = np.asarray(category_codes, dtype=np.int32)
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.categories = list(categories)  # 코드 -> 카테고리 이름
+        self.category_index = {name: code for code, name in enumerate(self.categories)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_db(cls, db_path: str) -> 'FacilitySnapshot':
+        """
+        facilities 테이블에서 좌표가 있는 시설만 읽어 스냅샷을 만듭니다.
+        """
+        conn = None
+        ids, codes, lats, lons = [], [], [], []
+        category_index = {}
+
+        try:
+            conn = sqlite3.connect(db_path)
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT Facility_ID, Category, Latitude, Longitude FROM facilities "
+                "WHERE Latitude IS NOT NULL AND Longitude IS NOT NULL "
+                "ORDER BY Facility_ID"
+            )
+            for facility_id, category, lat, lon in cursor:
+                ids.append(facility_id)
+                codes.append(category_index.setdefault(category, len(category_index)))
+                lats.append(lat)
+                lons.append(lon)
+        finally:
+            if conn:
+                conn.close()
+
+        return cls(ids, codes, lats, lons, list(category_index))
+
+    def category_positions(self, categories: list = None) -> np.ndarray:
+        """
+        주어진 카테고리에 속하는 행 위치를 반환합니다. 비어 있으면 전체 행입니다.
+        """
+        if not categories:
+            return np.arange(len(self.ids))
+        codes = [self.category_index[c] for c in set(categories) if c in self.category_index]
+        return np.flatnonzero(np.isin(self.category_codes, codes))
+
+    def score(self, lat: float, lon: float, radius_km: float, positions: np.ndarray = None) -> tuple:
+        """
+        한 출발점 기준으로 후보 행들을 한 번에 계산해 반경 내 (id 배열, 거리 배열)을 반환합니다.
+        positions를 주지 않으면 전체 행이 후보입니다.
+        """
+        if positions is None:
+            positions = np.arange(len(self.ids))
+        mask, distances = radius_mask(lat, lon, self.lats[positions], self.lons[positions], radius_km)
+        return self.ids[positions[mask]], distances[mask]
+
+    def score_batch(self, lats, lons, radius_km, categories: list = None) -> list:
+        """
+        여러 출발점을 한 번에 계산합니다.
+        radius_km는 스칼라 또는 출발점별 배열이며, 출발점마다 (id 배열, 거리 배열)을 반환합니다.
+        """
+        origin_lats = np.asarray(lats, dtype=np.float64)
+        origin_lons = np.asarray(lons, dtype=np.float64)
+        radii = np.broadcast_to(np.asarray(radius_km, dtype=np.float64), origin_lats.shape)
+
+        positions = self.category_positions(categories)
+        cand_lats = self.lats[positions]
+        cand_lons = self.lons[positions]
+        cand_ids = self.ids[positions]
+
+        results = []
+        step = max(1, BATCH_CELLS // max(1, len(positions)))
+        for start in range(0, len(origin_lats), step):
+            stop = start + step
+            distances = haversine_km(
+                origin_lats[start:stop, None], origin_lons[start:stop, None],
+                cand_lats[None, :], cand_lons[None, :]
+            )
+            masks = distances <= radii[start:stop, None]
+            for row_distances, row_mask in zip(distances, masks):
+                results.append((cand_ids[row_mask], row_distances[row_mask]))
+
+        return results
@@ -0,0 +1,224 @@
+# backend/fts.py
+import sqlite3
+
+FTS_TABLE = 'facilities_fts'
+
+# trigram 토크나이저는 3글자 이상 검색어만 인덱스로 찾을 수 있습니다.
+TRIGRAM_MIN_LENGTH = 3
+
+# bm25 열 가중치 (Name, Description, RoadAddress)
+BM25_WEIGHTS = (10.0, 2.0, 1.0)
+
+# 최종 정렬 점수 = TEXT_WEIGHT * 텍스트 관련도 - DISTANCE_WEIGHT * (거리 / 반경)
+TEXT_WEIGHT = 0.6
+DISTANCE_WEIGHT = 0.4
+
+_CREATE_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        Name, Description, RoadAddress,
+        content='Facilities', content_rowid='Facility_ID',
+        tokenize='trigram'
+    )
+    """,
+    # Facilities 변경 시 FTS 인덱스를 함께 갱신하는 트리거
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON Facilities BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, Name, Description, RoadAddress)
+        VALUES (new.Facility_ID, new.Name, new.Description, new.RoadAddress);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON Facilities BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, Name, Description, RoadAddress)
+        VALUES ('delete', old.Facility_ID, old.Name, old.Description, old.RoadAddress);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON Facilities BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, Name, Description, RoadAddress)
+        VALUES ('delete', old.Facility_ID, old.Name, old.Description, old.RoadAddress);
+        INSERT INTO {FTS_TABLE}(rowid, Name, Description, RoadAddress)
+        VALUES (new.Facility_ID, new.Name, new.Description, new.RoadAddress);
+    END
+    """,
+]
+
+
+def ensure_fts_index(db_path: str) -> bool:
+    """
+    FTS5 인덱스와 동기화 트리거를 만듭니다. 처음 만들 때는 기존 데이터로 인덱스를 채웁니다.
+    FTS5/trigram을 지원하지 않는 SQLite면 False를 반환합니다.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).fetchone() is not None
+
+        with conn:
+            for sql in _CREATE_SQL:
+                conn.execute(sql)
+            if not exists:
+                conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+        count = conn.execute(f"SELECT count(*) FROM {FTS_TABLE}").fetchone()[0]
+        print(f"[FTS] {FTS_TABLE} 준비 완료 ({count}개 시설, {'기존' if exists else '새로 구축'})")
+        return True
+    except sqlite3.OperationalError as e:
+        print(f"[FTS 경고] FTS5 인덱스를 만들 수 없습니다: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def rebuild_fts_index(db_path: str):
+    """Facilities 전체로 FTS 인덱스를 다시 만듭니다. (트리거 없이 대량 적재한 뒤 사용)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    finally:
+        conn.close()
+
+
+def _split_terms(text_filter: str) -> tuple:
+    """검색어를 trigram으로 찾을 수 있는 긴 단어와 2글자 단어로 나눕니다. (1글자는 무시)"""
+    long_terms, short_terms = [], []
+    for term in dict.fromkeys((text_filter or '').split()):
+        if len(term) >= TRIGRAM_MIN_LENGTH:
+            long_terms.append(term)
+        elif len(term) > 1:
+            short_terms.append(term)
+    return long_terms, short_terms
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def text_relevance(conn: sqlite3.Connection, text_filter: str, facility_ids: list,
+                   chunk_size: int = 500) -> dict:
+    """
+    후보 시설 중 text_filter와 맞는 시설의 관련도(0~1, 1이 가장 관련 높음)를 반환합니다.
+
+    - 3글자 이상 단어: FTS5 MATCH (단어끼리 OR) + bm25 점수
+    - 2글자 단어: trigram 인덱스를 쓸 수 없으므로 후보 시설에 한해 SQL instr()로 확인
+    관련도는 두 종류 단어의 점수를 단어 개수로 가중 평균한 값입니다.
+    """
+    long_terms, short_terms = _split_terms(text_filter)
+    if not facility_ids or not (long_terms or short_terms):
+        return {}
+
+    ids = list(dict.fromkeys(facility_ids))
+    long_scores = {}
+    short_scores = {}
+
+    if long_terms:
+        weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+        query = ' OR '.join(_quote(t) for t in long_terms)
+        rows = []
+        for i in range(0, len(ids), chunk_size):
+            chunk = ids[i:i + chunk_size]
+            placeholders = ', '.join('?' for _ in chunk)
+            # +rowid: FTS5가 IN 목록을 id마다 따로 MATCH하지 않고, 맞은 행 중 후보만 bm25를 계산하게 함
+            rows += conn.execute(
+                f"SELECT rowid, bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH ? AND +rowid IN ({placeholders})",
+                [query] + chunk
+            ).fetchall()
+        # bm25는 음수이고 작을수록 관련도가 높습니다.
+        best = min((score for _, score in rows), default=0.0)
+        for rowid, score in rows:
+            long_scores[rowid] = score / best if best < 0 else 1.0
+
+    if short_terms:
+        # NULL 열이 있으면 instr()도 NULL이 되어 합계 전체가 NULL이 되므로 빈 문자열로 바꿔 검사
+        hit_exprs = ' + '.join(
+            "(instr(ifnull(Name, ''), ?) > 0 OR instr(ifnull(Description, ''), ?) > 0"
+            " OR instr(ifnull(RoadAddress, ''), ?) > 0)"
+            for _ in short_terms
+        )
+        term_params = [p for t in short_terms for p in (t, t, t)]
+        for i in range(0, len(ids), chunk_size):
+            chunk = ids[i:i + chunk_size]
+            placeholders = ', '.join('?' for _ in chunk)
+            rows = conn.execute(
+                f"SELECT Facility_ID, {hit_exprs} AS hits FROM facilities "
+                f"WHERE Facility_ID IN ({placeholders})",
+                term_params + chunk
+            ).fetchall()
+            for facility_id, hits in rows:
+                if hits:
+                    short_scores[facility_id] = hits / len(short_terms)
+
+    total = len(long_terms) + len(short_terms)
+    relevance = {}
+    for facility_id in set(long_scores) | set(short_scores):
+        score = (len(long_terms) * long_scores.get(facility_id, 0.0) +
+                 len(short_terms) * short_scores.get(facility_id, 0.0)) / total
+        if score > 0:
+            relevance[facility_id] = score
+    return relevance
+
+
+def text_matcher(conn: sqlite3.Connection, text_filter: str, chunk_size: int = 500):
+    """
+    시설 ID 목록을 받아 text_filter와 맞는 ID 집합을 돌려주는 함수를 만듭니다.
+    (text_relevance(...).keys()와 같은 결과이며, 후보를 여러 번 나눠 물어볼 때 사용)
+
+    3글자 이상 단어의 MATCH는 처음 호출할 때 한 번만 실행해 맞은 ID 집합을 재사용하고,
+    2글자 단어는 호출마다 넘어온 ID에 한해 instr()로 확인합니다.
+    """
+    long_terms, short_terms = _split_terms(text_filter)
+    long_hits = None
+
+    def match(facility_ids) -> set:
+        nonlocal long_hits
+        ids = list(dict.fromkeys(facility_ids))
+        if not ids or not (long_terms or short_terms):
+            return set()
+
+        matched = set()
+        if long_terms:
+            if long_hits is None:
+                # 점수는 필요 없으므로 bm25 없이 rowid만 읽음
+                long_hits = {rowid for (rowid,) in conn.execute(
+                    f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?",
+                    (' OR '.join(_quote(t) for t in long_terms),)
+                )}
+            matched.update(facility_id for facility_id in ids if facility_id in long_hits)
+
+        rest = [facility_id for facility_id in ids if facility_id not in matched]
+        if short_terms and rest:
+            hit_exprs = ' OR '.join(
+                "instr(ifnull(Name, ''), ?) > 0 OR instr(ifnull(Description, ''), ?) > 0"
+                " OR instr(ifnull(RoadAddress, ''), ?) > 0"
+                for _ in short_terms
+            )
+            term_params = [p for t in short_terms for p in (t, t, t)]
+            for i in range(0, len(rest), chunk_size):
+                chunk = rest[i:i + chunk_size]
+                placeholders = ', '.join('?' for _ in chunk)
+                matched.update(facility_id for (facility_id,) in conn.execute(
+                    f"SELECT Facility_ID FROM facilities "
+                    f"WHERE Facility_ID IN ({placeholders}) AND ({hit_exprs})",
+                    chunk + term_params
+                ))
+        return matched
+
+    return match
+
+
+def score_by_text(conn: sqlite3.Connection, text_filter: str, matches: list, radius_km: float) -> list:
+    """
+    (facility_id, 거리km) 목록에서 text_filter와 맞는 시설만 남기고
+    텍스트 관련도와 거리를 합친 점수(클수록 좋음)를 붙여 (facility_id, 거리km, 점수) 목록으로 반환합니다.
+    """
+    relevance = text_relevance(conn, text_filter, [facility_id for facility_id, _ in matches])
+    radius = radius_km if radius_km > 0 else 1.0
+
+    return [
+        (facility_id, distance, TEXT_WEIGHT * relevance[facility_id] - DISTANCE_WEIGHT * (distance / radius))
+        for facility_id, distance in matches if facility_id in relevance
+    ]
@@ -0,0 +1,45 @@
+# backend/gunicorn.conf.py
+"""
+운영 서버(gunicorn) 설정
+
+    cd backend
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+- preload_app: 마스터가 앱을 한 번만 불러 공간/영업시간 인덱스, LLM 설정을 만들고 워밍업한 뒤 작업자를 fork합니다.
+  작업자들은 이 읽기 전용 데이터를 copy-on-write로 함께 쓰므로 작업자를 늘려도 작업자당 메모리가 거의 늘지 않습니다.
+- 작업자 수는 WEB_CONCURRENCY, 작업자당 스레드 수는 GUNICORN_THREADS로 정합니다.
+- 작업자는 GUNICORN_MAX_REQUESTS(+지터)개 요청을 처리하면 교체되며, 처리 중인 요청은 graceful_timeout까지 마무리합니다.
+"""
+import gc
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5001')
+workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+preload_app = True
+
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# 앱을 불러오는 동안 GC를 멈춰 (해제된 객체가 공유할 페이지 곳곳에 빈 자리를 남기지 않도록) 두고,
+# fork 직전에 gc.freeze()로 그때까지의 객체를 GC 대상에서 빼서 작업자의 GC가 공유 페이지에 쓰지 않게 합니다.
+gc.disable()
+
+
+def pre_fork(server, worker):
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import restart_after_fork  # preload_app이므로 이미 불러온 모듈
+    restart_after_fork()
+    gc.enable()
+    server.log.info("[작업자] pid=%s 시작 (스레드 %s개)", worker.pid, threads)
+
+
+def worker_exit(server, worker):
+    server.log.info("[작업자] pid=%s 종료", worker.pid)
@@ -0,0 +1,76 @@
+# backend/log_queue.py
+import atexit
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+from metrics import LOG_DROPPED
+
+DEFAULT_LEVEL = 'INFO'
+DEFAULT_QUEUE_SIZE = 10000
+LOG_FORMAT = '%(asctime)s %(levelname)s %(message)s'
+
+logger = logging.getLogger('animalloo')
+
+
+class DroppingQueueHandler(QueueHandler):
+    """대기열이 가득 차면 요청 스레드를 막지 않고 그 로그를 버립니다. (버린 개수는 /metrics)"""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_DROPPED.inc()
+
+
+_listener = None
+_restart = None
+
+
+def _start_listener(log_queue: queue.Queue):
+    global _listener
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def setup_logging(level: str = None, queue_size: int = DEFAULT_QUEUE_SIZE):
+    """
+    'animalloo' 로거(와 하위 로거)를 대기열 기반으로 설정합니다.
+    요청 스레드는 기록을 대기열에 넣기만 하고, 화면 출력은 별도 스레드가 합니다.
+    level은 LOG_LEVEL 환경 변수로도 정할 수 있습니다. (DEBUG면 요청마다 입력/샘플 로그 출력)
+    """
+    level = (level or os.environ.get('LOG_LEVEL') or DEFAULT_LEVEL).upper()
+    logger.setLevel(level)
+    if any(isinstance(h, DroppingQueueHandler) for h in logger.handlers):
+        return logger
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    logger.addHandler(handler)
+    logger.propagate = False
+    _start_listener(handler.queue)
+    atexit.register(_stop_listener)
+
+    def restart():
+        handler.queue = queue.Queue(maxsize=queue_size)
+        _start_listener(handler.queue)
+    global _restart
+    _restart = restart
+    return logger
+
+
+def restart_in_child():
+    """
+    fork된 gunicorn 작업자에는 출력 스레드가 없으므로 새 대기열과 함께 다시 띄웁니다.
+    os.register_at_fork 대신 gunicorn의 post_fork에서만 부릅니다. (비밀번호 해시 풀 같은 다른 자식 프로세스는 제외)
+    """
+    if _restart is not None:
+        _restart()
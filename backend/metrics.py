@@ -0,0 +1,237 @@
+# backend/metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# 지연 시간(초) 히스토그램 구간 (Prometheus 기본값과 같음)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 결과 개수 히스토그램 구간
+RESULT_SIZE_BUCKETS = (0, 1, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """레이블별로 늘어나기만 하는 값"""
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        with self._lock:
+            return self._values.get(labelvalues, 0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            yield self.name + _format_labels(self.labelnames, labelvalues), value
+
+
+class Histogram:
+    """
+    레이블별 구간 누적 개수/합계/개수를 보관하는 히스토그램입니다.
+    observe()는 구간 위치만 찾아 더하므로 요청 경로에서 불러도 부담이 적습니다.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # 레이블 값 -> [구간별 개수..., 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *labelvalues):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def count(self, *labelvalues) -> int:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            return series[-1] if series else 0
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labelvalues, list(series)) for labelvalues, series in self._series.items())
+        for labelvalues, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels}", cumulative
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels}", series[-2]
+            yield f"{self.name}_count{labels}", series[-1]
+
+
+class StatsCollector:
+    """
+    기존 stats() 사전(응답 캐시, 연결 풀 등)을 /metrics를 읽을 때만 불러 숫자 값을 내보냅니다.
+    counters/gauges는 {stats 키: 설명} 입니다.
+    """
+
+    def __init__(self, prefix: str, stats_fn, counters: dict = None, gauges: dict = None):
+        self.prefix = prefix
+        self.stats_fn = stats_fn
+        self.counters = counters or {}
+        self.gauges = gauges or {}
+
+    def families(self):
+        stats = self.stats_fn() or {}
+        for kind, keys in (('counter', self.counters), ('gauge', self.gauges)):
+            for key, documentation in keys.items():
+                value = stats.get(key)
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                suffix = '_total' if kind == 'counter' else ''
+                name = f"{self.prefix}_{key}{suffix}"
+                yield name, kind, documentation, [(name, value)]
+
+
+class MetricsRegistry:
+    """
+    요청 처리 중에 기록하는 지표와 /metrics 응답(Prometheus 텍스트 형식)을 관리합니다.
+    값은 프로세스마다 따로 모이므로, 여러 작업자로 띄우면 작업자별로 수집됩니다.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (),
+                  buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def register_stats(self, prefix: str, stats_fn, counters: dict = None, gauges: dict = None):
+        with self._lock:
+            self._collectors.append(StatsCollector(prefix, stats_fn, counters, gauges))
+
+    def reset(self):
+        """기록한 값을 모두 지웁니다. (작업자를 fork하기 전 워밍업 요청의 기록을 남기지 않도록)"""
+        with self._lock:
+            metrics = list(self._metrics)
+        for metric in metrics:
+            metric.reset()
+
+    def _add(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name} {_format_value(value)}" for name, value in metric.samples())
+        for collector in collectors:
+            try:
+                families = list(collector.families())
+            except Exception as e:
+                lines.append(f"# {collector.prefix} 수집 실패: {e}")
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f"{sample} {_format_value(value)}" for sample, value in samples)
+        return '\n'.join(lines) + '\n'
+
+
+class StageTimer:
+    """
+    한 요청 안에서 단계별 소요 시간을 모았다가 observe()할 때 단계마다 한 번씩 히스토그램에 기록합니다.
+    (DB 조회처럼 여러 번 나뉘어 실행되는 단계도 요청당 한 값이 되도록)
+    """
+    __slots__ = ('histogram', 'elapsed')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+        self.elapsed = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.elapsed[name] = self.elapsed.get(name, 0.0) + (time.perf_counter() - start)
+
+    def observe(self):
+        # 요청마다 새로 만들어 한 번만 부릅니다. (elapsed는 느린 요청 기록용으로 남겨 둠)
+        for name, seconds in self.elapsed.items():
+            self.histogram.observe(seconds, name)
+
+
+metrics = MetricsRegistry()
+
+REQUEST_LATENCY = metrics.histogram(
+    'animalloo_http_request_duration_seconds', 'API 응답 시간 (스트리밍은 첫 응답까지)',
+    ('endpoint', 'method', 'status'),
+)
+SEARCH_STAGE_LATENCY = metrics.histogram(
+    'animalloo_search_stage_seconds', '/api/search 단계별 소요 시간 (llm, rank, db_fetch, serialize)',
+    ('stage',),
+)
+RESULT_SIZE = metrics.histogram(
+    'animalloo_result_size', '응답에 담긴 시설 수', ('endpoint',), buckets=RESULT_SIZE_BUCKETS,
+)
+LOG_DROPPED = metrics.counter('animalloo_log_dropped_total', '로그 대기열이 가득 차서 버린 로그 수')
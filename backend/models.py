@@ -1,5 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
@@ -13,7 +14,51 @@ class User(db.Model):
     
     nickname = db.Column(db.String(100), nullable=True)  # ⬅️ 새로 추가! 닉네임 (변경 가능)
     profile_url = db.Column(db.String(500), nullable=True)
-    favorite_hospitals = db.Column(db.JSON, nullable=True)
+    favorite_hospitals = db.Column(db.JSON, nullable=True)  # 이전 형식 (user_favorites로 이전 후 비워 둠)
     
     def __repr__(self):
-        return f'<User {self.username}>'
\ No newline at end of file
+        return f'<User {self.username}>'
+
+class UserFavorite(db.Model):
+    """
+    사용자별 즐겨찾기 시설 (user_id, facility_id 복합 기본키)
+    같은 시설을 두 번 넣어도 기본키 충돌로 무시되므로 동시 요청에도 중복이 생기지 않습니다.
+    """
+    __tablename__ = 'user_favorites'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    facility_id = db.Column(db.Integer, primary_key=True)  # facilities.Facility_ID
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.current_timestamp())
+    
+    # "이 시설을 즐겨찾기한 사용자" 조회용
+    __table_args__ = (db.Index('idx_user_favorites_facility', 'facility_id'),)
+    
+    def __repr__(self):
+        return f'<UserFavorite {self.user_id}:{self.facility_id}>'
+
+def migrate_favorite_hospitals() -> int:
+    """
+    users.favorite_hospitals(JSON 목록)를 user_favorites 테이블로 옮기고 JSON 컬럼은 비웁니다.
+    이미 옮긴 항목은 무시하므로 여러 번 실행해도 안전합니다. 옮긴 행 수를 반환합니다.
+    """
+    moved = 0
+    users = User.query.filter(User.favorite_hospitals.isnot(None)).all()
+    for user in users:
+        facility_ids = set()
+        for value in user.favorite_hospitals or []:
+            try:
+                facility_ids.add(int(value))
+            except (TypeError, ValueError):
+                print(f"[즐겨찾기 이전] 잘못된 시설 ID 무시: user={user.id}, value={value!r}")
+        
+        if facility_ids:
+            stmt = sqlite_insert(UserFavorite).values(
+                [{"user_id": user.id, "facility_id": facility_id} for facility_id in sorted(facility_ids)]
+            ).on_conflict_do_nothing()
+            moved += db.session.execute(stmt).rowcount
+        user.favorite_hospitals = db.null()
+    
+    db.session.commit()
+    if users:
+        print(f"[즐겨찾기 이전] 사용자 {len(users)}명, {moved}개 항목을 user_favorites로 이전")
+    return moved
@@ -0,0 +1,399 @@
+# backend/opening_hours.py
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+# 서울 시간 (일광절약시간 없음)
+KST = timezone(timedelta(hours=9), 'KST')
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+DAY_OF_WEEK = {
+    'Monday': 0, 'Tuesday': 1, 'Wednesday': 2, 'Thursday': 3, 'Friday': 4, 'Saturday': 5, 'Sunday': 6,
+}
+WEEKDAY_KO = {'월': 0, '화': 1, '수': 2, '목': 3, '금': 4, '토': 5, '일': 6}
+PUBLIC_HOLIDAY = '법정공휴일'  # OpeningHours.DayOfWeek / HolidayInfo.Day_Off 공통 값
+
+# 양력 공휴일 (월, 일)
+SOLAR_HOLIDAYS = [(1, 1), (3, 1), (5, 5), (6, 6), (8, 15), (10, 3), (10, 9), (12, 25)]
+
+# 음력 공휴일 당일 (설날/추석은 앞뒤 하루까지 연휴). 새 연도는 여기에 추가합니다.
+LUNAR_HOLIDAYS = {
+    'seollal': {2025: date(2025, 1, 29), 2026: date(2026, 2, 17), 2027: date(2027, 2, 7)},
+    'chuseok': {2025: date(2025, 10, 6), 2026: date(2026, 9, 25), 2027: date(2027, 9, 15)},
+    'buddha': {2025: date(2025, 5, 5), 2026: date(2026, 5, 24), 2027: date(2027, 5, 13)},
+}
+
+_TIME_RE = re.compile(r'^(\d{1,2}):(\d{2})$')
+_NTH_WEEK_RE = re.compile(r'^([\d,]+)째주\s*([월화수목금토일])요일$')
+_LAST_WEEK_RE = re.compile(r'^매달\s*마지막주\s*([월화수목금토일])요일$')
+_DATE_RE = re.compile(r'^(\d{1,2})월\s*(\d{1,2})일$')
+
+
+def parse_time(value: str):
+    """
+    '9:30', '21:00' -> 자정부터의 분. 형식이 틀리면 None.
+    '25:00'처럼 24시를 넘는 값은 다음 날 새벽(1500분)으로 그대로 둡니다.
+    """
+    match = _TIME_RE.match((value or '').strip())
+    if not match:
+        return None
+    hour, minute = int(match.group(1)), int(match.group(2))
+    if hour >= 48 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def parse_open_at(value: str) -> datetime:
+    """
+    open_at 파라미터(ISO 8601, 예: '2025-05-05T14:30')를 서울 시간으로 바꿉니다.
+    시간대가 없으면 서울 시간으로 간주합니다.
+    """
+    try:
+        when = datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f"open_at 형식이 올바르지 않습니다 (예: 2025-05-05T14:30): {value}")
+    if when.tzinfo is None:
+        return when.replace(tzinfo=KST)
+    return when.astimezone(KST)
+
+
+def now_kst() -> datetime:
+    return datetime.now(KST)
+
+
+def public_holidays(year: int) -> set:
+    """해당 연도의 공휴일 날짜 집합 (대체공휴일 제외)"""
+    days = {date(year, month, day) for month, day in SOLAR_HOLIDAYS}
+    for name, by_year in LUNAR_HOLIDAYS.items():
+        day = by_year.get(year)
+        if day is None:
+            continue
+        days.add(day)
+        if name in ('seollal', 'chuseok'):
+            days.update((day - timedelta(days=1), day + timedelta(days=1)))
+    return days
+
+
+def parse_day_off(value: str):
+    """
+    HolidayInfo.Day_Off 문자열을 규칙으로 바꿉니다.
+
+    반환: ('weekday', 요일) / ('public_holiday',) / ('nth', (주차...), 요일) / ('last', 요일)
+          / ('date', 월, 일) / ('lunar', (이름...), 연휴 포함 여부) / None(휴무 없음 또는 알 수 없음)
+    '격주', '변동'처럼 날짜를 정할 수 없는 값은 None으로 두어 영업시간대로 판단합니다.
+    """
+    text = (value or '').strip()
+    if len(text) == 3 and text.endswith('요일') and text[0] in WEEKDAY_KO:
+        return ('weekday', WEEKDAY_KO[text[0]])
+    if text == PUBLIC_HOLIDAY:
+        return ('public_holiday',)
+
+    match = _NTH_WEEK_RE.match(text)
+    if match:
+        weeks = tuple(sorted({int(n) for n in match.group(1).split(',') if n}))
+        return ('nth', weeks, WEEKDAY_KO[match.group(2)])
+    match = _LAST_WEEK_RE.match(text)
+    if match:
+        return ('last', WEEKDAY_KO[match.group(1)])
+    match = _DATE_RE.match(text)
+    if match:
+        return ('date', int(match.group(1)), int(match.group(2)))
+
+    if '설' in text or '추석' in text:
+        names = tuple(name for name, word in (('seollal', '설'), ('chuseok', '추석')) if word in text)
+        return ('lunar', names, '연휴' in text)
+    return None
+
+
+def rule_applies(rule: tuple, day: date) -> bool:
+    """날짜 규칙(요일 규칙 제외)이 해당 날짜에 휴무인지 확인합니다."""
+    kind = rule[0]
+    if kind == 'public_holiday':
+        return day in public_holidays(day.year)
+    if kind == 'nth':
+        return day.weekday() == rule[2] and (day.day - 1) // 7 + 1 in rule[1]
+    if kind == 'last':
+        return day.weekday() == rule[1] and (day + timedelta(days=7)).month != day.month
+    if kind == 'date':
+        return (day.month, day.day) == (rule[1], rule[2])
+    if kind == 'lunar':
+        for name in rule[1]:
+            holiday = LUNAR_HOLIDAYS[name].get(day.year)
+            if holiday is None:
+                continue
+            if day == holiday or (rule[2] and abs((day - holiday).days) == 1):
+                return True
+    return False
+
+
+def _add_range(intervals: list, start: int, opens: int, closes: int, period: int):
+    """
+    start(요일 시작 분) 기준 opens~closes 구간을 추가합니다.
+    closes <= opens이면 자정을 넘기는 영업(다음 날로 이어짐), 같으면 24시간 영업으로 봅니다.
+    """
+    if closes == opens:
+        closes = opens + MINUTES_PER_DAY
+    elif closes < opens:
+        closes += MINUTES_PER_DAY
+    begin, end = start + opens, start + closes
+    if begin >= period:
+        # 일요일 '26:00' 시작처럼 시작부터 다음 주로 넘어가면 통째로 앞으로 옮깁니다.
+        begin, end = begin - period, end - period
+    if end <= period:
+        intervals.append((begin, end))
+    else:
+        # 일요일 밤 -> 월요일 새벽처럼 주 경계를 넘으면 앞으로 감습니다.
+        intervals.append((begin, period))
+        intervals.append((0, end - period))
+
+
+def _merge(intervals: list) -> tuple:
+    merged = []
+    for begin, end in sorted(intervals):
+        if merged and begin <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((begin, end))
+    return tuple(merged)
+
+
+def _pack(schedules: list, period: int) -> np.ndarray:
+    """구간 목록들을 (일정 수, period/8) 크기의 비트 배열로 만듭니다."""
+    bits = np.zeros((max(len(schedules), 1), period), dtype=bool)
+    for row, intervals in enumerate(schedules):
+        for begin, end in intervals:
+            bits[row, begin:end] = True
+    return np.packbits(bits, axis=1, bitorder='little')
+
+
+def _bit_column(packed: np.ndarray, minute: int) -> np.ndarray:
+    return ((packed[:, minute >> 3] >> (minute & 7)) & 1).astype(bool)
+
+
+def _append_schedules(packed: np.ndarray, extra: np.ndarray) -> tuple:
+    """
+    extra의 일정 행을 packed 뒤에 붙이되 이미 있는 일정은 다시 넣지 않습니다.
+    (합친 배열, extra 행 번호 -> 합친 배열 행 번호)
+    """
+    existing = {row.tobytes(): i for i, row in enumerate(packed)}
+    mapping, added = [], []
+    for row in extra:
+        key = row.tobytes()
+        if key not in existing:
+            existing[key] = len(packed) + len(added)
+            added.append(row)
+        mapping.append(existing[key])
+    if added:
+        packed = np.concatenate((packed, np.array(added, dtype=packed.dtype)))
+    return packed, np.array(mapping, dtype=np.int32)
+
+
+class OpeningHoursIndex:
+    """
+    OpeningHours/HolidayInfo로 미리 계산해 둔 영업 여부 인덱스입니다.
+
+    - 시설마다 주간 영업 구간(월요일 0시 기준 분)을 만들고, 같은 일정끼리 묶어
+      주 10080분짜리 비트 배열 하나로 저장합니다. 요일 휴무는 이때 반영합니다.
+    - 법정공휴일에는 '법정공휴일' 영업시간이 있는 시설은 그 시간으로, 공휴일 휴무 시설은 휴무로 봅니다.
+    - 'N째주', '마지막주', 'M월D일', 설/추석 같은 날짜 휴무는 규칙별 시설 마스크로 따로 둡니다.
+
+    특정 시각에 영업 중인 시설 ID 집합을 배열 연산 한 번으로 만들고 분 단위로 캐시하므로,
+    후보 시설마다의 확인은 집합 조회(O(1))입니다. 영업시간 정보가 없는 시설은 영업 중으로 보지 않습니다.
+    """
+
+    def __init__(self, hours_rows: list, day_off_rows: list, cache_size: int = 64):
+        rules_by_id = {}
+        for facility_id, day_off in day_off_rows:
+            rule = parse_day_off(day_off)
+            if rule is not None:
+                rules_by_id.setdefault(facility_id, []).append(rule)
+
+        weekly = {}   # facility_id -> [(시작, 끝), ...] 주간 분
+        holiday = {}  # facility_id -> [(시작, 끝), ...] 공휴일 하루 분
+        skipped = 0
+        for facility_id, day_of_week, opens, closes in hours_rows:
+            opens_min, closes_min = parse_time(opens), parse_time(closes)
+            if opens_min is None or closes_min is None:
+                skipped += 1
+                continue
+            if day_of_week == PUBLIC_HOLIDAY:
+                # 공휴일 영업시간은 그날 자정까지만 반영합니다. (시작=마감이면 24시간)
+                begin = 0 if opens_min == closes_min else opens_min
+                end = min(closes_min, MINUTES_PER_DAY) if closes_min > opens_min else MINUTES_PER_DAY
+                holiday.setdefault(facility_id, []).append((begin, end))
+                continue
+            weekday = DAY_OF_WEEK.get(day_of_week)
+            if weekday is None:
+                skipped += 1
+                continue
+            closed_weekdays = {r[1] for r in rules_by_id.get(facility_id, ()) if r[0] == 'weekday'}
+            if weekday in closed_weekdays:
+                continue
+            _add_range(weekly.setdefault(facility_id, []), weekday * MINUTES_PER_DAY,
+                       opens_min, closes_min, MINUTES_PER_WEEK)
+
+        ids = np.array(sorted(set(weekly) | set(holiday) | set(rules_by_id)), dtype=np.int64)
+
+        # 같은 일정은 한 번만 저장 (0번은 영업시간 정보 없음)
+        weekly_keys = {(): 0}
+        holiday_keys = {}
+        weekly_ids = np.zeros(len(ids), dtype=np.int32)
+        holiday_ids = np.full(len(ids), -1, dtype=np.int32)
+        for pos, facility_id in enumerate(ids.tolist()):
+            key = _merge(weekly.get(facility_id, []))
+            weekly_ids[pos] = weekly_keys.setdefault(key, len(weekly_keys))
+            if facility_id in holiday:
+                key = _merge(holiday[facility_id])
+                holiday_ids[pos] = holiday_keys.setdefault(key, len(holiday_keys))
+
+        # 날짜 휴무 규칙 -> 해당 시설 위치
+        date_rules = {}
+        for pos, facility_id in enumerate(ids.tolist()):
+            for rule in rules_by_id.get(facility_id, ()):
+                if rule[0] != 'weekday':
+                    date_rules.setdefault(rule, []).append(pos)
+
+        self._init_arrays(ids, weekly_ids, holiday_ids,
+                          _pack(list(weekly_keys), MINUTES_PER_WEEK), _pack(list(holiday_keys), MINUTES_PER_DAY),
+                          {rule: np.array(positions, dtype=np.int64) for rule, positions in date_rules.items()},
+                          skipped, cache_size)
+
+    def _init_arrays(self, ids, weekly_ids, holiday_ids, weekly, holiday, date_rules: dict,
+                     skipped_rows: int, cache_size: int):
+        self.ids = ids
+        self.skipped_rows = skipped_rows
+        self._weekly_ids = weekly_ids
+        self._holiday_ids = holiday_ids
+        self._weekly = weekly
+        self._holiday = holiday
+        self._date_rules = date_rules  # 규칙 -> 휴무인 시설 위치 배열
+
+        self._cache = OrderedDict()  # (날짜, 분) -> frozenset(영업 중 시설 ID)
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, date_rules: dict, skipped_rows: int = 0,
+                    cache_size: int = 64) -> 'OpeningHoursIndex':
+        """
+        arrays()로 꺼낸 배열(바이너리 스냅샷)로 만듭니다. 배열은 복사하지 않고 그대로 씁니다.
+        date_rules는 {규칙: 시설 위치 배열} 입니다.
+        """
+        index = cls.__new__(cls)
+        index._init_arrays(arrays['ids'], arrays['weekly_ids'], arrays['holiday_ids'],
+                           arrays['weekly'], arrays['holiday'], date_rules, skipped_rows, cache_size)
+        return index
+
+    def arrays(self) -> dict:
+        """스냅샷 파일에 저장할 배열들 (날짜 휴무 규칙은 date_rules로 따로)"""
+        return {
+            "ids": self.ids,
+            "weekly_ids": self._weekly_ids,
+            "holiday_ids": self._holiday_ids,
+            "weekly": self._weekly,
+            "holiday": self._holiday,
+        }
+
+    def with_changes(self, facility_ids, hours_rows: list, day_off_rows: list) -> 'OpeningHoursIndex':
+        """
+        facility_ids 시설만 hours_rows/day_off_rows (그 시설들의 지금 DB 행)로 다시 계산한 새 인덱스를 반환합니다.
+        이 인덱스는 그대로 둡니다. 이전 위치는 영업시간 없음(항상 휴무)으로 바꾸고 새 값은 배열 끝에 붙이므로,
+        변경 후의 ids는 정렬되어 있지 않고 같은 ID가 (휴무로 남은 이전 위치와 함께) 두 번 나올 수 있습니다.
+        """
+        changed = OpeningHoursIndex(hours_rows, day_off_rows)
+        dead = np.flatnonzero(np.isin(self.ids, np.fromiter(facility_ids, dtype=np.int64)))
+        base = len(self.ids)
+
+        weekly, weekly_map = _append_schedules(self._weekly, changed._weekly)
+        holiday, holiday_map = _append_schedules(self._holiday, changed._holiday)
+        weekly_ids = self._weekly_ids.copy()
+        weekly_ids[dead] = 0
+        holiday_ids = self._holiday_ids.copy()
+        holiday_ids[dead] = -1
+        weekly_ids = np.concatenate((weekly_ids, weekly_map[changed._weekly_ids]))
+        holiday_ids = np.concatenate((holiday_ids, np.where(
+            changed._holiday_ids >= 0, holiday_map[np.maximum(changed._holiday_ids, 0)], -1).astype(np.int32)))
+
+        date_rules = {}
+        for rule, positions in self._date_rules.items():
+            kept = positions[~np.isin(positions, dead)]
+            if len(kept):
+                date_rules[rule] = kept
+        for rule, positions in changed._date_rules.items():
+            date_rules[rule] = np.concatenate((date_rules.get(rule, np.empty(0, dtype=np.int64)), positions + base))
+
+        arrays = {
+            "ids": np.concatenate((self.ids, changed.ids)),
+            "weekly_ids": weekly_ids,
+            "holiday_ids": holiday_ids,
+            "weekly": weekly,
+            "holiday": holiday,
+        }
+        return OpeningHoursIndex.from_arrays(arrays, date_rules, self.skipped_rows + changed.skipped_rows,
+                                             self._cache_size)
+
+    @property
+    def date_rules(self) -> dict:
+        return self._date_rules
+
+    @classmethod
+    def from_db(cls, db_path: str) -> 'OpeningHoursIndex':
+        """OpeningHours/HolidayInfo 전체를 읽어 인덱스를 구축합니다. (서버 시작 시 1회)"""
+        conn = sqlite3.connect(db_path)
+        try:
+            hours_rows = conn.execute(
+                "SELECT Facility_ID, DayOfWeek, Opens, Closes FROM OpeningHours"
+            ).fetchall()
+            day_off_rows = conn.execute("SELECT Facility_ID, Day_Off FROM HolidayInfo").fetchall()
+        finally:
+            conn.close()
+
+        index = cls(hours_rows, day_off_rows)
+        print(f"[영업시간 인덱스] {len(index.ids)}개 시설, 주간 일정 {len(index._weekly)}종류, "
+              f"날짜 휴무 규칙 {len(index._date_rules)}종류로 구축 완료 (해석 못한 행 {index.skipped_rows}개)")
+        return index
+
+    def open_mask(self, when: datetime) -> np.ndarray:
+        """self.ids 순서로 when(서울 시간) 시각 영업 여부 배열을 반환합니다."""
+        if when.tzinfo is not None:
+            when = when.astimezone(KST)
+        day = when.date()
+        minute = when.hour * 60 + when.minute
+
+        is_open = _bit_column(self._weekly, day.weekday() * MINUTES_PER_DAY + minute)[self._weekly_ids]
+        if day in public_holidays(day.year):
+            has_hours = self._holiday_ids >= 0
+            if has_hours.any():
+                is_open[has_hours] = _bit_column(self._holiday, minute)[self._holiday_ids[has_hours]]
+
+        for rule, positions in self._date_rules.items():
+            if rule_applies(rule, day):
+                is_open[positions] = False
+        return is_open
+
+    def open_ids(self, when: datetime) -> frozenset:
+        """when 시각에 영업 중인 시설 ID 집합 (분 단위로 캐시)"""
+        if when.tzinfo is not None:
+            when = when.astimezone(KST)
+        key = (when.date(), when.hour * 60 + when.minute)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        result = frozenset(self.ids[self.open_mask(when)].tolist())
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def is_open(self, facility_id: int, when: datetime) -> bool:
+        return facility_id in self.open_ids(when)
@@ -0,0 +1,60 @@
+# backend/pagination.py
+import base64
+import heapq
+import json
+
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    """클라이언트가 보낸 cursor를 해석할 수 없습니다."""
+
+
+def encode_cursor(key: tuple) -> str:
+    """정렬 키를 URL에 그대로 쓸 수 있는 문자열로 만듭니다."""
+    raw = json.dumps(list(key), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"잘못된 cursor입니다: {cursor}") from e
+    if not isinstance(key, list) or not all(isinstance(v, (int, float)) for v in key):
+        raise InvalidCursorError(f"잘못된 cursor입니다: {cursor}")
+    return tuple(key)
+
+
+def parse_limit(value) -> int:
+    """limit 파라미터를 검증합니다. 없으면 None(전체)."""
+    if value is None or value == '':
+        return None
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"limit은 정수여야 합니다: {value}")
+    if limit < 1:
+        raise ValueError("limit은 1 이상이어야 합니다.")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def top_k(items, key, limit: int = None, after: tuple = None) -> tuple:
+    """
+    정렬 키 기준으로 after 다음부터 limit개를 골라 (선택된 항목, 다음 cursor)를 반환합니다.
+
+    전체 정렬 대신 힙으로 limit+1개만 유지하므로 시간은 O(n log k), 메모리는 O(k)입니다.
+    limit이 None이면 전체를 정렬해 반환하고 다음 cursor는 None입니다.
+    """
+    if after is not None:
+        items = (item for item in items if key(item) > after)
+
+    if limit is None:
+        return sorted(items, key=key), None
+
+    selected = heapq.nsmallest(limit + 1, items, key=key)
+    if len(selected) <= limit:
+        return selected, None
+    selected = selected[:limit]
+    return selected, encode_cursor(key(selected[-1]))
@@ -0,0 +1,169 @@
+# backend/password_hasher.py
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+import bcrypt as _bcrypt
+
+DEFAULT_ROUNDS = 12
+DEFAULT_MAX_QUEUE = 32       # 작업자가 모두 바쁠 때 기다릴 수 있는 요청 수
+DEFAULT_TIMEOUT_SECONDS = 10.0
+BCRYPT_MAX_BYTES = 72        # bcrypt는 72바이트까지만 사용 (기존 해시와 같도록 잘라서 사용)
+
+
+class HasherBusyError(RuntimeError):
+    """해시 작업 대기열이 가득 찼거나 제한 시간 안에 끝나지 않았습니다. (503으로 응답)"""
+
+
+def _to_bytes(value) -> bytes:
+    return value.encode('utf-8') if isinstance(value, str) else value
+
+
+def _hash_password(password: bytes, rounds: int) -> str:
+    # 작업 프로세스에서 실행되므로 모듈 최상위 함수여야 합니다.
+    return _bcrypt.hashpw(password[:BCRYPT_MAX_BYTES], _bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def _check_password(pw_hash: bytes, password: bytes) -> bool:
+    try:
+        return _bcrypt.checkpw(password[:BCRYPT_MAX_BYTES], pw_hash)
+    except ValueError:
+        return False  # 잘못된 형식의 해시
+
+
+def hash_rounds(pw_hash: str):
+    """'$2b$12$...' 형식 해시의 cost. 해석할 수 없으면 None."""
+    parts = (pw_hash or '').split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """
+    bcrypt 해시 생성/검증을 요청 스레드 대신 프로세스 풀에서 실행합니다.
+
+    - 동시에 처리 중이거나 기다리는 작업은 max_workers + max_queue개까지만 받고,
+      넘치면 즉시 HasherBusyError를 던져 503으로 돌려보냅니다. (로그인 폭주가 다른 API를 막지 않도록)
+    - 프로세스 풀은 처음 사용할 때 만들고, fork된 뒤(gunicorn 작업자 등)에는 그 프로세스에서 새로 만듭니다.
+      풀의 작업 프로세스는 spawn으로 띄우므로 서버의 스레드, 잠금, fork 훅을 물려받지 않습니다.
+    - max_workers=0이면 풀 없이 호출한 스레드에서 바로 계산합니다. (개발/테스트용, 대기열 제한은 동일)
+
+    Flask 확장처럼 init_app(app)으로 BCRYPT_LOG_ROUNDS, PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_QUEUE, PASSWORD_HASH_TIMEOUT 설정을 읽습니다.
+    """
+
+    def __init__(self, rounds: int = DEFAULT_ROUNDS, max_workers: int = None,
+                 max_queue: int = DEFAULT_MAX_QUEUE, timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self.configure(rounds, max_workers, max_queue, timeout)
+
+        self._submitted = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._rehashed = 0
+
+    def init_app(self, app):
+        self.configure(
+            rounds=app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_ROUNDS),
+            max_workers=app.config.get('PASSWORD_HASH_WORKERS'),
+            max_queue=app.config.get('PASSWORD_HASH_MAX_QUEUE', DEFAULT_MAX_QUEUE),
+            timeout=app.config.get('PASSWORD_HASH_TIMEOUT', DEFAULT_TIMEOUT_SECONDS),
+        )
+
+    def configure(self, rounds: int = DEFAULT_ROUNDS, max_workers: int = None,
+                  max_queue: int = DEFAULT_MAX_QUEUE, timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        if max_workers is None:
+            max_workers = min(4, os.cpu_count() or 1)
+        with self._lock:
+            self.rounds = int(rounds)
+            self.max_workers = int(max_workers)
+            self.max_queue = int(max_queue)
+            self.timeout = float(timeout)
+            self._slots = threading.BoundedSemaphore(max(1, self.max_workers) + self.max_queue)
+            self._in_flight = 0
+            old, self._executor = self._executor, None
+        if old is not None and self._executor_pid == os.getpid():
+            old.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                # 서버 프로세스는 스레드가 여럿이고 fork 훅도 있으므로, fork 대신 spawn으로 깨끗한 프로세스를 띄웁니다.
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HasherBusyError("비밀번호 처리 요청이 많습니다. 잠시 후 다시 시도해주세요.")
+
+        with self._lock:
+            self._submitted += 1
+            self._in_flight += 1
+
+        def release(_future=None):
+            with self._lock:
+                self._in_flight -= 1
+            slots.release()
+
+        if self.max_workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                release()
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            release()
+            raise
+        # 제한 시간이 지나 응답을 포기해도 작업이 끝날 때까지 자리는 차지합니다.
+        future.add_done_callback(release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            raise HasherBusyError("비밀번호 처리 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.")
+
+    def hash(self, password: str) -> str:
+        if not password:
+            raise ValueError('Password must be non-empty.')
+        return self._run(_hash_password, _to_bytes(password), self.rounds)
+
+    def verify(self, pw_hash: str, password: str) -> bool:
+        if not pw_hash or not password:
+            return False
+        return self._run(_check_password, _to_bytes(pw_hash), _to_bytes(password))
+
+    def needs_rehash(self, pw_hash: str) -> bool:
+        """해시의 cost가 현재 설정(BCRYPT_LOG_ROUNDS)과 다르면 True"""
+        return hash_rounds(pw_hash) != self.rounds
+
+    def record_rehash(self):
+        with self._lock:
+            self._rehashed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rounds": self.rounds,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "rehashed": self._rehashed,
+            }
+
+
+password_hasher = PasswordHasher()
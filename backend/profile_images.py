@@ -0,0 +1,341 @@
+# backend/profile_images.py
+import hashlib
+import os
+import queue
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from PIL import Image, UnidentifiedImageError
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 스레드 잠금만 사용
+    fcntl = None
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024   # 업로드 원본 최대 크기
+DEFAULT_MAX_DIMENSION = 4096          # 가로/세로 최대 픽셀 (압축 폭탄 방지)
+DEFAULT_THUMBNAIL_SIZES = (128, 256)
+DEFAULT_QUEUE_SIZE = 64
+CHUNK_SIZE = 64 * 1024
+# 작업 디렉터리와 관계없이 Flask(app.root_path)와 같은 위치를 쓰도록 이 파일 기준으로 정합니다.
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'profiles')
+LOCK_NAME = '.lock'
+
+# Pillow 포맷 -> 저장 확장자 (파일 이름의 확장자는 믿지 않고 실제 내용으로 정합니다)
+FORMAT_EXTENSIONS = {'PNG': 'png', 'JPEG': 'jpg', 'GIF': 'gif'}
+# 썸네일 저장 포맷 (GIF는 첫 프레임만 PNG로)
+THUMBNAIL_FORMATS = {'png': ('PNG', 'png'), 'jpg': ('JPEG', 'jpg'), 'gif': ('PNG', 'png')}
+
+# 콘텐츠 주소 이름: <sha256 앞 2글자>/<sha256>.<확장자>, 썸네일은 <sha256>_<크기>.<확장자>
+STORED_NAME = re.compile(r'^([0-9a-f]{2})/(\1[0-9a-f]{62})(?:_(\d+))?\.(png|jpg|gif)$')
+
+
+class ImageRejectedError(ValueError):
+    """크기/해상도 제한을 넘었거나 이미지로 읽을 수 없는 업로드 (400/413으로 응답)"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class StagedImage(NamedTuple):
+    """검사를 마치고 임시 파일에 있는 업로드. publish()하기 전에는 저장소에 보이지 않습니다."""
+    name: str
+    digest: str
+    ext: str
+    tmp_path: str
+
+
+def parse_stored_name(name: str):
+    """저장소 안의 상대 경로를 (digest, 썸네일 크기 또는 None, 확장자)로 나눕니다. 아니면 None."""
+    match = STORED_NAME.match(name or '')
+    if match is None:
+        return None
+    _, digest, size, ext = match.groups()
+    return digest, (int(size) if size else None), ext
+
+
+class ProfileImageStore:
+    """
+    프로필 사진을 내용의 SHA-256 이름으로 저장하는 저장소입니다.
+
+    - 업로드는 조각 단위로 임시 파일에 쓰면서 해시를 계산하고, 최대 크기를 넘으면 바로 중단합니다.
+    - 헤더만 읽어 해상도를 확인한 뒤 원본을 최종 경로로 옮깁니다. (같은 내용이면 같은 파일)
+    - 썸네일은 백그라운드 스레드가 만들고, 준비되기 전에는 원본을 대신 보냅니다.
+    - 이름이 내용으로 정해지므로 한 번 보낸 파일은 바뀌지 않아 오래 캐시해도 됩니다.
+    - 같은 내용을 올린 사용자들은 파일 하나를 함께 씁니다. 그래서 지울 때는 저장소 잠금(프로세스 간 flock)을
+      잡은 채 아무도 쓰지 않는지 확인하고, 업로드는 DB에 기록한 뒤 같은 잠금 안에서 publish()합니다.
+      (그 사이 다른 사용자가 지웠더라도 publish()가 임시 파일로 되살림)
+
+    Flask 확장처럼 init_app(app)으로 PROFILE_IMAGE_DIR, PROFILE_IMAGE_MAX_BYTES,
+    PROFILE_IMAGE_MAX_DIMENSION, PROFILE_THUMBNAIL_SIZES 설정을 읽습니다.
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_dimension: int = DEFAULT_MAX_DIMENSION, thumbnail_sizes: tuple = DEFAULT_THUMBNAIL_SIZES,
+                 queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_dimension = max_dimension
+        self.thumbnail_sizes = tuple(thumbnail_sizes)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        self._store_lock = threading.Lock()
+
+        self._stored = 0
+        self._deduplicated = 0
+        self._rejected = 0
+        self._thumbnails = 0
+        self._thumbnail_errors = 0
+        self._thumbnail_dropped = 0
+        self._collected = 0
+        self._kept = 0
+
+    def init_app(self, app):
+        # 상대 경로는 send_from_directory처럼 app.root_path 기준
+        self.root = os.path.join(app.root_path, app.config.get('PROFILE_IMAGE_DIR', self.root))
+        self.max_bytes = app.config.get('PROFILE_IMAGE_MAX_BYTES', DEFAULT_MAX_BYTES)
+        self.max_dimension = app.config.get('PROFILE_IMAGE_MAX_DIMENSION', DEFAULT_MAX_DIMENSION)
+        self.thumbnail_sizes = tuple(app.config.get('PROFILE_THUMBNAIL_SIZES', DEFAULT_THUMBNAIL_SIZES))
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, digest: str, ext: str, size: int = None) -> str:
+        return os.path.join(self.root, self.name_for(digest, ext, size))
+
+    @staticmethod
+    def name_for(digest: str, ext: str, size: int = None) -> str:
+        suffix = f"_{size}" if size else ''
+        return f"{digest[:2]}/{digest}{suffix}.{ext}"
+
+    # ---------- 저장 ----------
+    def save(self, stream) -> str:
+        """
+        업로드 스트림을 저장하고 저장소 안의 상대 경로 ('ab/abcd....png')를 반환합니다.
+        제한을 넘거나 이미지가 아니면 ImageRejectedError를 던집니다.
+        (DB에 기록하는 업로드는 stage() -> 커밋 -> publish() 순서로 부릅니다)
+        """
+        staged = self.stage(stream)
+        try:
+            return self.publish(staged)
+        finally:
+            self.discard(staged)
+
+    def stage(self, stream) -> StagedImage:
+        """업로드를 임시 파일에 쓰면서 해시를 계산하고 검사합니다. 끝나면 publish() 또는 discard()를 부릅니다."""
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.upload_', dir=self.root)
+        try:
+            digest = hashlib.sha256()
+            total = 0
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    total += len(chunk)
+                    if total > self.max_bytes:
+                        raise ImageRejectedError(
+                            f"파일이 너무 큽니다 (최대 {self.max_bytes // (1024 * 1024)}MB)", status=413)
+                    digest.update(chunk)
+                    out.write(chunk)
+            if total == 0:
+                raise ImageRejectedError("빈 파일입니다")
+
+            ext = self._inspect(tmp_path)
+        except ImageRejectedError:
+            with self._lock:
+                self._rejected += 1
+            os.remove(tmp_path)
+            raise
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        digest = digest.hexdigest()
+        return StagedImage(self.name_for(digest, ext), digest, ext, tmp_path)
+
+    def publish(self, staged: StagedImage) -> str:
+        """임시 파일을 최종 경로로 옮깁니다. 같은 내용의 파일이 이미 있으면 그대로 씁니다."""
+        final_path = self.path_for(staged.digest, staged.ext)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        with self._locked():
+            if os.path.exists(final_path):
+                os.remove(staged.tmp_path)
+                with self._lock:
+                    self._deduplicated += 1
+            else:
+                os.replace(staged.tmp_path, final_path)
+                with self._lock:
+                    self._stored += 1
+        self.schedule_thumbnails(staged.digest, staged.ext)
+        return staged.name
+
+    @staticmethod
+    def discard(staged: StagedImage):
+        """publish()하지 않은(또는 이미 옮긴) 임시 파일을 정리합니다."""
+        try:
+            os.remove(staged.tmp_path)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def _locked(self):
+        # 같은 파일을 여러 사용자가 함께 쓰므로 publish와 remove는 작업자 프로세스 사이에서도 한 번에 하나만
+        with self._store_lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, LOCK_NAME), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _inspect(self, path: str) -> str:
+        # Image.open은 헤더만 읽으므로 해상도를 먼저 확인하고, verify()로 내용이 온전한지 봅니다.
+        try:
+            with Image.open(path) as image:
+                ext = FORMAT_EXTENSIONS.get(image.format)
+                if ext is None:
+                    raise ImageRejectedError("허용되지 않는 파일 형식입니다")
+                width, height = image.size
+                if width > self.max_dimension or height > self.max_dimension:
+                    raise ImageRejectedError(f"이미지 해상도가 너무 큽니다 (최대 {self.max_dimension}px)")
+                image.verify()
+        except Image.DecompressionBombError as e:
+            raise ImageRejectedError(f"이미지 해상도가 너무 큽니다 (최대 {self.max_dimension}px)") from e
+        except (UnidentifiedImageError, OSError, SyntaxError) as e:
+            raise ImageRejectedError("이미지 파일을 읽을 수 없습니다") from e
+        return ext
+
+    # ---------- 썸네일 ----------
+    def schedule_thumbnails(self, digest: str, ext: str):
+        if not self.thumbnail_sizes:
+            return
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((digest, ext))
+        except queue.Full:
+            # 대기열이 넘치면 건너뜀 (원본으로 대신 응답하고, 다음 업로드 때 다시 시도)
+            with self._lock:
+                self._thumbnail_dropped += 1
+
+    def _ensure_worker(self):
+        # fork된 프로세스(gunicorn 작업자 등)에는 스레드가 따라오지 않으므로 프로세스마다 새로 띄웁니다.
+        with self._lock:
+            if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            if self._worker_pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._worker = threading.Thread(target=self._run_worker, name='profile-thumbnails', daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def _run_worker(self):
+        while True:
+            digest, ext = self._queue.get()
+            try:
+                self.make_thumbnails(digest, ext)
+            except Exception as e:
+                with self._lock:
+                    self._thumbnail_errors += 1
+                print(f"[썸네일] 생성 실패 {digest[:12]}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def make_thumbnails(self, digest: str, ext: str):
+        source = self.path_for(digest, ext)
+        save_format, thumb_ext = THUMBNAIL_FORMATS[ext]
+        with Image.open(source) as image:
+            image.seek(0)
+            image = image.convert('RGB' if save_format == 'JPEG' else 'RGBA')
+            for size in self.thumbnail_sizes:
+                target = self.path_for(digest, thumb_ext, size)
+                if os.path.exists(target):
+                    continue
+                thumb = image.copy()
+                thumb.thumbnail((size, size), Image.LANCZOS)
+                fd, tmp_path = tempfile.mkstemp(prefix='.thumb_', dir=os.path.dirname(target))
+                try:
+                    with os.fdopen(fd, 'wb') as out:
+                        thumb.save(out, format=save_format, optimize=True)
+                    os.replace(tmp_path, target)
+                except BaseException:
+                    os.remove(tmp_path)
+                    raise
+                with self._lock:
+                    self._thumbnails += 1
+
+    def wait_for_thumbnails(self):
+        """대기 중인 썸네일 작업이 끝날 때까지 기다립니다. (벤치마크/점검용)"""
+        self._queue.join()
+
+    def thumbnail_name(self, name: str, size: int):
+        """원본 이름에 맞는 썸네일 이름. 지원하지 않는 크기면 None."""
+        parsed = parse_stored_name(name)
+        if parsed is None or parsed[1] is not None or size not in self.thumbnail_sizes:
+            return None
+        digest, _, ext = parsed
+        return self.name_for(digest, THUMBNAIL_FORMATS[ext][1], size)
+
+    # ---------- 정리 ----------
+    def remove(self, name: str, in_use=None) -> bool:
+        """
+        원본과 썸네일을 지웁니다. in_use가 있으면 저장소 잠금을 잡은 채 불러,
+        True(아직 누가 쓰는 중)면 지우지 않고 False를 반환합니다.
+        """
+        parsed = parse_stored_name(name)
+        if parsed is None or parsed[1] is not None:
+            return False
+        digest, _, ext = parsed
+        paths = [self.path_for(digest, ext)]
+        paths += [self.path_for(digest, THUMBNAIL_FORMATS[ext][1], size) for size in self.thumbnail_sizes]
+        removed = 0
+        with self._locked():
+            if in_use is not None and in_use():
+                with self._lock:
+                    self._kept += 1
+                return False
+            for path in paths:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self._collected += removed
+        return True
+
+    def remove_legacy(self, filename: str, user_id: int):
+        """이전 방식('user_<id>_<시각>.<확장자>')으로 저장된 그 사용자의 파일을 지웁니다."""
+        if not re.fullmatch(rf'user_{int(user_id)}_\d+\.(png|jpg|jpeg|gif)', filename or ''):
+            return
+        try:
+            os.remove(os.path.join(self.root, filename))
+            with self._lock:
+                self._collected += 1
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "stored": self._stored,
+                "deduplicated": self._deduplicated,
+                "rejected": self._rejected,
+                "thumbnails": self._thumbnails,
+                "thumbnail_errors": self._thumbnail_errors,
+                "thumbnail_dropped": self._thumbnail_dropped,
+                "thumbnail_queue": self._queue.qsize(),
+                "collected_files": self._collected,
+                "kept_shared": self._kept,
+            }
+
+
+profile_images = ProfileImageStore()
@@ -0,0 +1,248 @@
+# backend/request_profiler.py
+import cProfile
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter as FrameCounter, deque
+
+from flask import g, request
+
+from log_queue import logger
+
+DEFAULT_DIR = 'request_profiles'
+DEFAULT_MAX_FILES = 50
+DEFAULT_HISTORY = 500             # 느린 요청 목록을 고를 최근 요청 수
+DEFAULT_SAMPLE_INTERVAL = 0.002   # 샘플링 프로파일러 간격(초)
+PROFILE_HEADER = 'X-Profile'
+MODES = ('cprofile', 'sample')
+
+
+class StackSampler:
+    """
+    대상 스레드의 호출 스택을 일정 간격으로 읽어 collapsed stack 형식
+    ('바깥 함수;...;안쪽 함수 횟수')으로 모읍니다. (flamegraph.pl, speedscope에서 바로 열 수 있음)
+    """
+
+    def __init__(self, thread_id: int, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = FrameCounter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-sampler', daemon=True)
+
+    @property
+    def empty(self) -> bool:
+        return not self.stacks  # 샘플 간격보다 짧게 끝난 요청
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def dump(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfiler:
+    """
+    필요할 때만 켜는 요청 프로파일러입니다.
+
+    - 헤더 'X-Profile: <PROFILE_TOKEN>'을 보낸 요청, 또는 PROFILE_SAMPLE_RATE 비율로 고른 요청을
+      cProfile(.pstats) 또는 스택 샘플링(.collapsed)으로 기록해 PROFILE_DIR에 남깁니다.
+      파일은 최신 PROFILE_MAX_FILES개만 보관합니다.
+    - 켜져 있으면 최근 요청의 소요 시간과 검색 단계별 시간(g.stage_timer)을 보관해
+      slowest()로 가장 느린 요청을 보여 줍니다. 스트리밍 응답은 본문을 다 보낸 뒤의 시간으로 기록합니다.
+      (조회는 PROFILE_TOKEN이 있어야 하므로, 샘플링만 켜면 파일로만 확인할 수 있음)
+    - 토큰도 샘플링 비율도 없으면 요청 훅을 아예 등록하지 않으므로 꺼져 있을 때 비용이 없습니다.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.token = None
+        self.sample_rate = 0.0
+        self.mode = 'cprofile'
+        self.directory = DEFAULT_DIR
+        self.max_files = DEFAULT_MAX_FILES
+        self.sample_interval = DEFAULT_SAMPLE_INTERVAL
+        self._history = deque(maxlen=DEFAULT_HISTORY)
+        self._lock = threading.Lock()
+        self._cprofile_lock = threading.Lock()  # cProfile은 동시에 하나만 (3.12부터 전역 제한)
+        self._seq = 0
+        self._profiled = 0
+        self._skipped = 0
+
+    def init_app(self, app):
+        self.token = app.config.get('PROFILE_TOKEN') or None
+        self.sample_rate = float(app.config.get('PROFILE_SAMPLE_RATE', 0.0))
+        self.mode = app.config.get('PROFILE_MODE', 'cprofile')
+        if self.mode not in MODES:
+            raise ValueError(f"PROFILE_MODE는 {MODES} 중 하나여야 합니다: {self.mode}")
+        self.directory = app.config.get('PROFILE_DIR', DEFAULT_DIR)
+        self.max_files = int(app.config.get('PROFILE_MAX_FILES', DEFAULT_MAX_FILES))
+        self.sample_interval = float(app.config.get('PROFILE_SAMPLE_INTERVAL', DEFAULT_SAMPLE_INTERVAL))
+        self._history = deque(maxlen=int(app.config.get('PROFILE_HISTORY', DEFAULT_HISTORY)))
+
+        self.enabled = bool(self.token) or self.sample_rate > 0
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        print(f"[프로파일러] 사용 (모드={self.mode}, 샘플링 비율={self.sample_rate}, "
+              f"헤더={'사용' if self.token else '사용 안 함'}, 저장 위치={self.directory})")
+        if not self.token:
+            print("[프로파일러] PROFILE_TOKEN이 없어 /api/debug/slow-requests는 사용할 수 없습니다.")
+
+    def authorized(self, value) -> bool:
+        return bool(self.token) and bool(value) and hmac.compare_digest(value, self.token)
+
+    # ---------- 요청 훅 ----------
+    def _before_request(self):
+        g.profile_started = time.perf_counter()
+        wanted = self.authorized(request.headers.get(PROFILE_HEADER)) or (
+            self.sample_rate > 0 and random.random() < self.sample_rate)
+        if not wanted:
+            return
+
+        if self.mode == 'sample':
+            sampler = StackSampler(threading.get_ident(), self.sample_interval)
+            sampler.start()
+            g.profile_session = sampler
+        elif self._cprofile_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+            profile.enable()
+            g.profile_session = profile
+        else:
+            with self._lock:
+                self._skipped += 1  # 다른 요청을 프로파일링하는 중
+
+    def _stop_session(self, session):
+        if session is None:
+            return None
+        if isinstance(session, cProfile.Profile):
+            session.disable()
+            self._cprofile_lock.release()
+        else:
+            session.stop()
+        return session
+
+    def _after_request(self, response):
+        started = g.pop('profile_started', None)
+        if started is None:
+            return response
+        finish = self._recorder(started, g.pop('profile_session', None), response.status_code)
+        if response.is_streamed:
+            # 스트리밍 응답은 본문을 내보내는 동안에도 단계 시간이 쌓이므로 본문을 다 보내고 닫을 때 기록합니다.
+            # (이 Flask 버전은 teardown_request도 본문보다 먼저 부르므로 call_on_close를 씀)
+            response.call_on_close(finish)
+            return response
+        profile_file = finish()
+        if profile_file:
+            response.headers['X-Profile-File'] = profile_file
+        return response
+
+    def _teardown_request(self, exc):
+        # after_request를 거치지 않고 끝난 요청(예외)도 프로파일러를 멈추고 기록합니다.
+        started = g.pop('profile_started', None)
+        if started is not None:
+            self._recorder(started, g.pop('profile_session', None), 500)()
+
+    def _recorder(self, started: float, session, status: int):
+        """요청 정보는 지금 읽어 두고, 돌려준 함수를 부를 때 프로파일러를 멈추고 기록합니다. (요청 컨텍스트 밖에서도 부를 수 있음)"""
+        timer = g.get('stage_timer')
+        entry = {
+            "at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "method": request.method,
+            "path": request.full_path.rstrip('?'),
+            "endpoint": request.endpoint,
+            "status": status,
+        }
+
+        def finish():
+            session_done = self._stop_session(session)
+            elapsed = time.perf_counter() - started
+            profile_file = None
+            if session_done is not None and not getattr(session_done, 'empty', False):
+                profile_file = self._write(session_done, elapsed, entry["endpoint"])
+            entry["duration_ms"] = round(elapsed * 1000, 2)
+            entry["stages_ms"] = ({name: round(seconds * 1000, 2) for name, seconds in timer.elapsed.items()}
+                                  if timer else None)
+            entry["profile"] = profile_file
+            with self._lock:
+                self._history.append(entry)
+            return profile_file
+        return finish
+
+    # ---------- 파일 ----------
+    def _write(self, session, elapsed: float, endpoint: str) -> str:
+        with self._lock:
+            self._seq += 1
+            self._profiled += 1
+            seq = self._seq
+        ext = 'pstats' if isinstance(session, cProfile.Profile) else 'collapsed'
+        name = (f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{seq:05d}-"
+                f"{endpoint or 'unknown'}-{int(elapsed * 1000)}ms.{ext}")
+        try:
+            path = os.path.join(self.directory, name)
+            if ext == 'pstats':
+                session.dump_stats(path)
+            else:
+                session.dump(path)
+            self._rotate()
+        except OSError as e:
+            logger.warning("[프로파일러] 저장 실패: %s", e)
+            return None
+        return name
+
+    def _rotate(self):
+        files = [entry for entry in os.scandir(self.directory)
+                 if entry.is_file() and entry.name.endswith(('.pstats', '.collapsed'))]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files[:len(files) - self.max_files]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    # ---------- 조회 ----------
+    def slowest(self, limit: int = 20) -> list:
+        with self._lock:
+            history = list(self._history)
+        return sorted(history, key=lambda entry: entry["duration_ms"], reverse=True)[:limit]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "mode": self.mode,
+                "sample_rate": self.sample_rate,
+                "directory": self.directory,
+                "profiled": self._profiled,
+                "skipped": self._skipped,
+                "tracked_requests": len(self._history),
+            }
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,204 @@
+# backend/response_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from flask import Response, request
+
+from serializers import dumps
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024  # 32MB
+DEFAULT_VERSION_CHECK_INTERVAL = 1.0  # data_version 확인 최소 간격(초)
+
+
+class DataVersion:
+    """
+    지정한 테이블의 데이터가 바뀌었는지 감지합니다.
+
+    PRAGMA data_version은 DB 파일 어디에 커밋하든 바뀌므로 (로그인, 즐겨찾기 등 users 쪽 쓰기 포함)
+    커밋이 있었다는 신호로만 쓰고, 그때 감시 테이블의 지문을 읽어 실제로 달라졌을 때만 버전을 올립니다.
+    - 지문: 변경 기록의 마지막 번호(change_log_seq(conn), 기록을 믿을 수 없으면 None) + 나머지 테이블별 (행 수, 최대 rowid)
+      변경 기록 트리거가 감시하는 테이블(tracked_tables)은 변경 기록이 있으면 행 수를 세지 않습니다.
+    - 매 요청마다 확인하지 않도록 check_interval초 동안은 마지막 값을 그대로 씁니다.
+    """
+
+    def __init__(self, db_path: str, check_interval: float = DEFAULT_VERSION_CHECK_INTERVAL,
+                 tables: tuple = (), change_log_seq=None, tracked_tables: tuple = ()):
+        self.check_interval = check_interval
+        self.tables = tuple(tables)
+        self.change_log_seq = change_log_seq
+        self.tracked_tables = tuple(tracked_tables)
+        self._uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+        self._conn = self._open()
+        self._lock = threading.Lock()
+        self._last_raw = None
+        self._last_fingerprint = None
+        self._version = 0
+        self._checked_at = 0.0
+
+    def current(self) -> int:
+        """감시하는 데이터가 바뀔 때마다 1씩 늘어나는 버전 번호를 반환합니다."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at >= self.check_interval:
+                raw = self._read_raw()
+                if raw != self._last_raw:
+                    fingerprint = self._read_fingerprint()
+                    if self._last_fingerprint is not None and fingerprint != self._last_fingerprint:
+                        self._version += 1
+                    self._last_fingerprint = fingerprint
+                self._last_raw = raw
+                self._checked_at = now
+            return self._version
+
+    def _open(self) -> sqlite3.Connection:
+        self._conn_pid = os.getpid()
+        return sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+
+    def _read_raw(self) -> int:
+        # fork된 작업자는 부모의 연결 대신 새 연결로 확인합니다.
+        # data_version은 연결마다 따로 세므로 비교할 기준이 없어, 부모에게서 받은 캐시 항목은 무효로 합니다.
+        if self._conn_pid != os.getpid():
+            self._conn = self._open()
+            self._last_raw = None
+            self._last_fingerprint = None
+            self._version += 1
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _read_fingerprint(self) -> tuple:
+        conn = self._conn
+        tables = self.tables
+        fingerprint = ()
+        seq = self.change_log_seq(conn) if self.change_log_seq is not None else None
+        if seq is not None:
+            fingerprint = (seq,)
+            tables = tuple(t for t in tables if t not in self.tracked_tables)
+        return fingerprint + tuple(
+            conn.execute(f'SELECT count(*), coalesce(max(rowid), 0) FROM "{table}"').fetchone()
+            for table in tables
+        )
+
+    def bump(self):
+        """같은 프로세스에서 데이터를 바꾼 직후 즉시 무효화할 때 호출합니다."""
+        with self._lock:
+            self._version += 1
+            self._checked_at = 0.0
+
+
+class ResponseCache:
+    """
+    엔드포인트 + 정규화된 파라미터 단위로 JSON 응답 본문을 캐시합니다.
+
+    - 항목은 만들 때의 DB 버전을 기억하고, 버전이 바뀌면 무효입니다.
+    - 전체 본문 크기가 max_bytes를 넘으면 가장 오래 안 쓴 항목부터 지웁니다.
+    """
+
+    def __init__(self, version_source: DataVersion, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.version_source = version_source
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (버전, 본문, etag)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._not_modified = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def make_key(endpoint: str, params: dict) -> str:
+        return endpoint + '?' + json.dumps(params, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+
+    def get(self, key: str, version: int):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != version:
+                self._remove(key)
+                self._invalidations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(self, key: str, version: int, body: bytes, etag: str):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (version, body, etag)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def _remove(self, key: str):
+        _, body, _ = self._entries.pop(key)
+        self._bytes -= len(body)
+
+    def record_not_modified(self):
+        with self._lock:
+            self._not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "not_modified": self._not_modified,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "data_version": self.version_source.current(),
+            }
+
+
+def cached_json_response(cache: ResponseCache, endpoint: str, params: dict, build, max_age: int) -> Response:
+    """
+    캐시에 있으면 저장된 본문으로, 없으면 build()의 결과를 JSON으로 만들어 응답합니다.
+    강한 ETag와 Cache-Control을 붙이고, GET 요청의 If-None-Match가 맞으면 DB 조회 없이 304를 돌려줍니다.
+    build()가 None을 반환하면(찾는 데이터 없음) 캐시하지 않고 None을 반환합니다.
+    """
+    key = cache.make_key(endpoint, params)
+    version = cache.version_source.current()
+    entry = cache.get(key, version)
+
+    if entry is None:
+        payload = build()
+        if payload is None:
+            return None
+        body = dumps(payload)
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        cache.put(key, version, body, etag)
+        status = 'MISS'
+    else:
+        _, body, etag = entry
+        status = 'HIT'
+
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.headers['X-Cache'] = status
+
+    response = response.make_conditional(request)
+    if response.status_code == 304:
+        cache.record_not_modified()
+    return response
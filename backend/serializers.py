@@ -0,0 +1,135 @@
+# backend/serializers.py
+import json
+from functools import lru_cache
+
+from flask import Response
+
+try:
+    import orjson  # 설치되어 있으면 더 빠른 JSON 인코더 사용
+except ImportError:
+    orjson = None
+
+ID_COLUMN = 'Facility_ID'
+
+# DB 컬럼명 -> API 필드명 (여기 없는 컬럼은 DB 컬럼명 그대로)
+FIELD_MAPPING = {
+    'Facility_ID': 'id',
+    'Name': 'name',
+    'Category': 'category',
+    'District': 'district',
+    'PhoneNumber': 'phone',
+    'LotAddress': 'address',
+    'RoadAddress': 'road_address',
+    'Description': 'description',
+    'Website': 'website',
+    'ParkingAvailable': 'parking_available',
+    'PetFriendly': 'pet_friendly',
+    'AdmissionFeeInfo': 'admission_fee',
+    'PetRestrictions': 'pet_restrictions',
+}
+COLUMN_BY_FIELD = {field: column for column, field in FIELD_MAPPING.items()}
+
+
+class InvalidFieldsError(ValueError):
+    """fields 파라미터에 없는 필드가 들어 있습니다."""
+
+
+def api_name(column: str) -> str:
+    return FIELD_MAPPING.get(column, column)
+
+
+def facility_fields(conn) -> list:
+    """facilities 테이블 컬럼을 API 필드명 목록으로 반환합니다. (fields 검증용)"""
+    return [api_name(row[1]) for row in conn.execute("PRAGMA table_info(facilities)")]
+
+
+def parse_fields(value, allowed) -> tuple:
+    """
+    fields 파라미터("id,name,distance_km" 또는 목록)를 검증해 요청 순서대로 튜플로 반환합니다.
+    비어 있으면 None(전체 필드)입니다.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    fields = tuple(dict.fromkeys(f.strip() for f in value if f and f.strip()))
+    if not fields:
+        return None
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise InvalidFieldsError(f"알 수 없는 fields입니다: {', '.join(unknown)}")
+    return fields
+
+
+def select_list(fields: tuple = None) -> str:
+    """
+    fields에 필요한 컬럼만 고르는 SELECT 목록을 만듭니다.
+    결과를 ID로 다시 찾을 수 있도록 Facility_ID는 항상 맨 앞에 둡니다.
+    """
+    if fields is None:
+        return '*'
+    columns = [ID_COLUMN]
+    for field in fields:
+        column = COLUMN_BY_FIELD.get(field, field)
+        if column not in columns:
+            columns.append(column)
+    return ', '.join(columns)
+
+
+class RowSerializer:
+    """
+    커서 컬럼 순서에 맞춰 한 번만 만들어 두는 행 -> API dict 변환기입니다.
+
+    컬럼 위치와 API 필드명을 미리 정해 dict 리터럴을 만드는 함수 하나로 컴파일하므로
+    행마다 dict(row) 복사나 필드명 매핑 조회가 없습니다. (sqlite3.Row와 튜플 모두 사용 가능)
+    """
+
+    def __init__(self, columns: tuple, fields: tuple = None):
+        self.columns = columns
+        self.id_index = columns.index(ID_COLUMN) if ID_COLUMN in columns else None
+
+        index_by_field = {}
+        for i, column in enumerate(columns):
+            index_by_field.setdefault(api_name(column), i)
+
+        if fields is None:
+            names = list(index_by_field)
+        else:
+            names = [f for f in fields if f in index_by_field]
+        self.names = tuple(names)
+
+        # 예: lambda row: {'id': str(row[0]), 'name': row[1], ...}
+        items = []
+        for name in names:
+            i = index_by_field[name]
+            value = f"str(row[{i}])" if i == self.id_index else f"row[{i}]"
+            items.append(f"{name!r}: {value}")
+        self._convert = eval(f"lambda row: {{{', '.join(items)}}}", {'str': str})
+
+    def __call__(self, row) -> dict:
+        return self._convert(row)
+
+    def serialize_all(self, rows) -> list:
+        convert = self._convert
+        return [convert(row) for row in rows]
+
+
+@lru_cache(maxsize=64)
+def _compile(columns: tuple, fields: tuple) -> RowSerializer:
+    return RowSerializer(columns, fields)
+
+
+def get_serializer(description, fields: tuple = None) -> RowSerializer:
+    """cursor.description(컬럼 구성)과 fields 조합마다 한 번만 컴파일해 재사용합니다."""
+    return _compile(tuple(d[0] for d in description), fields)
+
+
+def dumps(payload) -> bytes:
+    """정렬/ASCII 이스케이프 없이 바로 bytes로 인코딩합니다."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(payload, status: int = 200, headers: dict = None) -> Response:
+    return Response(dumps(payload), status=status, mimetype='application/json', headers=headers)
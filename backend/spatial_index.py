@@ -0,0 +1,353 @@
+# backend/spatial_index.py
+import heapq
+import math
+import numpy as np
+from facility_snapshot import EARTH_RADIUS_KM, FacilitySnapshot
+
+# 격자 한 칸의 크기 (도 단위). 0.01도 ≈ 위도 1.1km, 서울 경도 0.9km
+DEFAULT_CELL_DEG = 0.01
+
+# 최근접 검색에서 더 넓히지 않는 최대 반경 (서울 전체를 덮는 정도)
+DEFAULT_MAX_RADIUS_KM = 20.0
+# 요청으로 받을 수 있는 max_radius_km 상한 (고리 수가 반경에 비례하고 계산량은 그 제곱에 비례)
+MAX_NEAREST_RADIUS_KM = 50.0
+
+
+def get_haversine_distance(lat1, lon1, lat2, lon2):
+    R = EARTH_RADIUS_KM
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    delta_phi = math.radians(lat2 - lat1)
+    delta_lambda = math.radians(lon2 - lon1)
+    a = math.sin(delta_phi / 2)**2 + \
+        math.cos(phi1) * math.cos(phi2) * \
+        math.sin(delta_lambda / 2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return R * c
+
+
+def parse_radius_km(value, default: float = DEFAULT_MAX_RADIUS_KM,
+                    max_km: float = MAX_NEAREST_RADIUS_KM) -> float:
+    """max_radius_km 파라미터를 검증합니다. 없으면 default, 0 이하/숫자 아님/max_km 초과면 ValueError."""
+    if value is None or value == '':
+        return default
+    try:
+        radius_km = float(value)
+    except (TypeError, ValueError):
+        radius_km = math.nan
+    if not math.isfinite(radius_km):
+        raise ValueError(f"max_radius_km는 숫자여야 합니다: {value}")
+    if radius_km <= 0:
+        raise ValueError(f"max_radius_km는 0보다 커야 합니다: {value}")
+    if radius_km > max_km:
+        raise ValueError(f"max_radius_km는 최대 {max_km:g}km까지 지정할 수 있습니다.")
+    return radius_km
+
+
+def _grow_extent(extents: dict, category: str, row: int, col: int):
+    """카테고리별로 채워진 셀의 (행 최소, 행 최대, 열 최소, 열 최대)를 넓힙니다."""
+    extent = extents.get(category)
+    if extent is None:
+        extents[category] = (row, row, col, col)
+    else:
+        extents[category] = (min(extent[0], row), max(extent[1], row), min(extent[2], col), max(extent[3], col))
+
+
+def grid_cells(snapshot: FacilitySnapshot, cell_deg: float) -> tuple:
+    """
+    스냅샷 행을 (카테고리, 격자 행, 격자 열) 순으로 정렬해 셀 단위로 자릅니다.
+    (정렬된 행 위치, 셀 키 (셀 수, 3), 셀 경계 (셀 수 + 1))을 반환하며, 셀 i의 행 위치는
+    order[starts[i]:starts[i + 1]]입니다. 안정 정렬이라 한 셀 안의 위치는 오름차순입니다.
+    """
+    rows = np.floor(snapshot.lats / cell_deg).astype(np.int64)
+    cols = np.floor(snapshot.lons / cell_deg).astype(np.int64)
+    order = np.lexsort((cols, rows, snapshot.category_codes))
+    keys = np.stack((snapshot.category_codes[order], rows[order], cols[order]), axis=1)
+    boundaries = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+    starts = np.concatenate(([0], boundaries, [len(order)])).astype(np.int64) if len(order) else np.zeros(1, np.int64)
+    return order.astype(np.int64), keys[starts[:-1]], starts
+
+
+class FacilityGridIndex:
+    """
+    시설 좌표를 균일한 위경도 격자에 담아두는 공간 인덱스입니다.
+    카테고리마다 격자를 따로 두고, 반경 검색 시 반경에 걸치는 셀의 시설만
+    FacilitySnapshot 배열에서 한 번에 거리 계산합니다.
+    """
+
+    def __init__(self, snapshot: FacilitySnapshot, cell_deg: float = DEFAULT_CELL_DEG, cells: tuple = None):
+        self.snapshot = snapshot
+        self.cell_deg = cell_deg
+        # grid_cells() 결과 (바이너리 스냅샷에 저장된 것을 주면 다시 정렬하지 않음)
+        self.cells = cells if cells is not None else grid_cells(snapshot, cell_deg)
+        # category -> {(lat 셀, lon 셀): 스냅샷 행 위치 배열}
+        self._grids = {}
+        # category -> 채워진 셀 범위 (최근접 검색이 더 넓혀도 새 셀이 없는 고리를 알기 위함)
+        self._extents = {}
+
+        order, keys, starts = self.cells
+        for (code, row, col), start, stop in zip(keys.tolist(), starts[:-1].tolist(), starts[1:].tolist()):
+            category = snapshot.categories[code]
+            self._grids.setdefault(category, {})[(row, col)] = order[start:stop]
+            _grow_extent(self._extents, category, row, col)
+
+        self.size = len(snapshot)
+
+    @classmethod
+    def from_db(cls, db_path: str, cell_deg: float = DEFAULT_CELL_DEG) -> 'FacilityGridIndex':
+        """
+        facilities 테이블로 스냅샷을 만들고 인덱스를 구축합니다. (서버 시작 시 1회)
+        """
+        index = cls(FacilitySnapshot.from_db(db_path), cell_deg)
+        print(f"[공간 인덱스] {index.size}개 시설, {len(index._grids)}개 카테고리로 구축 완료")
+        return index
+
+    def with_changes(self, facility_ids, rows: list) -> 'FacilityGridIndex':
+        """
+        facility_ids 시설을 rows [(facility_id, 카테고리, 위도, 경도), ...] (지금 DB의 좌표 있는 행)로 바꾼
+        새 인덱스를 반환합니다. 이 인덱스는 그대로 두므로 검색 중인 요청은 계속 이전 인덱스를 씁니다.
+
+        행 위치를 바꾸지 않도록 이전 행은 좌표를 NaN으로 지워 (거리 계산에서 항상 빠짐) 셀에서 빼고,
+        새 행은 배열 끝에 붙여 해당 셀에만 넣습니다. 바뀌지 않은 셀의 위치 배열은 새 인덱스와 함께 씁니다.
+        """
+        snapshot = self.snapshot
+        changed = np.isin(snapshot.ids, np.fromiter(facility_ids, dtype=np.int64))
+        removed = np.flatnonzero(changed & ~np.isnan(snapshot.lats))
+
+        categories = list(snapshot.categories)
+        category_index = dict(snapshot.category_index)
+        codes = [category_index.setdefault(row[1], len(category_index)) for row in rows]
+        categories.extend(list(category_index)[len(categories):])
+
+        base = len(snapshot)
+        lats = np.concatenate((snapshot.lats, np.array([row[2] for row in rows], dtype=np.float64)))
+        lons = np.concatenate((snapshot.lons, np.array([row[3] for row in rows], dtype=np.float64)))
+        lats[removed] = np.nan
+        lons[removed] = np.nan
+        updated = FacilitySnapshot(
+            np.concatenate((snapshot.ids, np.array([row[0] for row in rows], dtype=np.int64))),
+            np.concatenate((snapshot.category_codes, np.array(codes, dtype=np.int32))),
+            lats, lons, categories,
+        )
+
+        index = FacilityGridIndex.__new__(FacilityGridIndex)
+        index.snapshot = updated
+        index.cell_deg = self.cell_deg
+        index.cells = None  # 위치가 띄엄띄엄이라 grid_cells() 형태로는 두지 않음
+        index._grids = {category: dict(grid) for category, grid in self._grids.items()}
+        # 지운 셀은 범위를 줄이지 않습니다. (넓은 범위는 최근접 검색이 고리를 조금 더 볼 뿐 결과는 같음)
+        index._extents = dict(self._extents)
+        for pos in removed.tolist():
+            category = snapshot.categories[snapshot.category_codes[pos]]
+            cell = self._cell(snapshot.lats[pos], snapshot.lons[pos])
+            grid = index._grids[category]
+            positions = grid[cell][grid[cell] != pos]
+            if len(positions):
+                grid[cell] = positions
+            else:
+                del grid[cell]
+                if not grid:
+                    del index._grids[category]
+        for offset, (_, category, lat, lon) in enumerate(rows):
+            grid = index._grids.setdefault(category, {})
+            cell = self._cell(lat, lon)
+            # 새 위치는 기존 위치보다 크므로 셀 안의 오름차순이 유지됩니다.
+            grid[cell] = np.append(grid.get(cell, np.empty(0, dtype=np.int64)), base + offset)
+            _grow_extent(index._extents, category, *cell)
+        index.size = self.size - len(removed) + len(rows)
+        return index
+
+    def _cell(self, lat: float, lon: float) -> tuple:
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def categories(self) -> list:
+        return list(self._grids.keys())
+
+    def _candidate_cells(self, lat: float, lon: float, radius_km: float):
+        """
+        중심점에서 radius_km 이내의 점을 모두 포함하는 셀 범위를 계산합니다.
+        반경이 극점을 넘어가면 None(전체 셀)을 반환합니다.
+        """
+        angular = radius_km / EARTH_RADIUS_KM
+        lat_min = lat - math.degrees(angular)
+        lat_max = lat + math.degrees(angular)
+        if lat_min <= -90 or lat_max >= 90:
+            return None
+
+        sin_angular = math.sin(angular)
+        cos_lat = math.cos(math.radians(lat))
+        if angular >= math.pi / 2 or sin_angular >= cos_lat:
+            return None
+        delta_lon = math.degrees(math.asin(sin_angular / cos_lat))
+
+        # 부동소수 오차로 경계의 셀을 놓치지 않도록 1셀 여유를 둡니다.
+        row_lo, col_lo = self._cell(lat_min, lon - delta_lon)
+        row_hi, col_hi = self._cell(lat_max, lon + delta_lon)
+        return (row_lo - 1, row_hi + 1, col_lo - 1, col_hi + 1)
+
+    def _category_grids(self, categories: list = None) -> list:
+        if categories:
+            return [self._grids[c] for c in set(categories) if c in self._grids]
+        return list(self._grids.values())
+
+    @staticmethod
+    def _positions_in(grids: list, bounds) -> np.ndarray:
+        """bounds (행 최소, 행 최대, 열 최소, 열 최대) 셀 범위의 스냅샷 행 위치. None이면 전체 셀."""
+        cells = []
+
+        for grid in grids:
+            if bounds is None:
+                cells.extend(grid.values())
+                continue
+
+            row_lo, row_hi, col_lo, col_hi = bounds
+            # 후보 셀 수가 실제로 채워진 셀보다 많으면 채워진 셀만 확인합니다.
+            if (row_hi - row_lo + 1) * (col_hi - col_lo + 1) > len(grid):
+                cells.extend(
+                    positions for (row, col), positions in grid.items()
+                    if row_lo <= row <= row_hi and col_lo <= col <= col_hi
+                )
+            else:
+                cells.extend(
+                    grid[(row, col)]
+                    for row in range(row_lo, row_hi + 1)
+                    for col in range(col_lo, col_hi + 1)
+                    if (row, col) in grid
+                )
+
+        if not cells:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(cells)
+
+    def candidate_positions(self, lat: float, lon: float, radius_km: float, categories: list = None) -> np.ndarray:
+        """
+        반경에 걸치는 셀에 들어 있는 스냅샷 행 위치를 모두 모아 반환합니다.
+        """
+        return self._positions_in(self._category_grids(categories), self._candidate_cells(lat, lon, radius_km))
+
+    def query_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                   categories: list = None) -> np.ndarray:
+        """
+        사각형 범위(경계 포함) 안의 시설을 스냅샷 행 위치 배열로 반환합니다. (지도 화면 영역 조회용)
+        증분 반영으로 지운 행은 좌표가 NaN이라 비교에서 저절로 빠집니다.
+        """
+        row_lo, col_lo = self._cell(min_lat, min_lon)
+        row_hi, col_hi = self._cell(max_lat, max_lon)
+        positions = self._positions_in(self._category_grids(categories), (row_lo, row_hi, col_lo, col_hi))
+        lats = self.snapshot.lats[positions]
+        lons = self.snapshot.lons[positions]
+        inside = (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+        return positions[inside]
+
+    def query_radius(self, lat: float, lon: float, radius_km: float, categories: list = None) -> list:
+        """
+        반경 radius_km 이내의 시설을 (facility_id, 거리km) 목록으로 반환합니다.
+        categories가 비어 있으면 모든 카테고리를 검색합니다.
+        """
+        positions = self.candidate_positions(lat, lon, radius_km, categories)
+        ids, distances = self.snapshot.score(lat, lon, radius_km, positions)
+        return list(zip(ids.tolist(), distances.tolist()))
+
+    def query_radius_batch(self, lats, lons, radius_km, categories: list = None) -> list:
+        """
+        여러 출발점의 반경 검색을 한 번에 처리합니다. 출발점마다 (facility_id, 거리km) 목록을 반환합니다.
+        """
+        return [
+            list(zip(ids.tolist(), distances.tolist()))
+            for ids, distances in self.snapshot.score_batch(lats, lons, radius_km, categories)
+        ]
+
+    def _ring_positions(self, grids: list, center_row: int, center_col: int, ring: int) -> np.ndarray:
+        """
+        중심 셀에서 체비셰프 거리로 정확히 ring만큼 떨어진 셀들의 스냅샷 행 위치를 모읍니다.
+        (이전 고리에서 본 셀은 다시 보지 않습니다)
+        """
+        if ring == 0:
+            ring_cells = [(center_row, center_col)]
+        else:
+            ring_cells = []
+            for col in range(center_col - ring, center_col + ring + 1):
+                ring_cells.append((center_row - ring, col))
+                ring_cells.append((center_row + ring, col))
+            for row in range(center_row - ring + 1, center_row + ring):
+                ring_cells.append((row, center_col - ring))
+                ring_cells.append((row, center_col + ring))
+
+        cells = []
+        for grid in grids:
+            if len(ring_cells) > len(grid):
+                cells.extend(
+                    positions for (row, col), positions in grid.items()
+                    if max(abs(row - center_row), abs(col - center_col)) == ring
+                )
+            else:
+                cells.extend(grid[cell] for cell in ring_cells if cell in grid)
+
+        if not cells:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(cells)
+
+    def _covered_radius_km(self, lat: float, lon: float, center_row: int, center_col: int, ring: int) -> float:
+        """
+        고리 ring까지의 셀 블록 바깥에 있는 점은 모두 이 거리(km)보다 멉니다.
+        위도 방향은 자오선 거리, 경도 방향은 경선까지의 대원 거리로 계산합니다.
+        """
+        lat_lo = (center_row - ring) * self.cell_deg
+        lat_hi = (center_row + ring + 1) * self.cell_deg
+        lon_lo = (center_col - ring) * self.cell_deg
+        lon_hi = (center_col + ring + 1) * self.cell_deg
+
+        lat_km = math.radians(min(lat - lat_lo, lat_hi - lat)) * EARTH_RADIUS_KM
+        delta_lon = math.radians(min(lon - lon_lo, lon_hi - lon))
+        if delta_lon >= math.pi / 2:
+            lon_km = float('inf')
+        else:
+            lon_km = math.asin(min(1.0, math.cos(math.radians(lat)) * math.sin(delta_lon))) * EARTH_RADIUS_KM
+        return max(0.0, min(lat_km, lon_km))
+
+    def nearest(self, lat: float, lon: float, k: int, categories: list = None,
+                max_radius_km: float = DEFAULT_MAX_RADIUS_KM, accept=None) -> tuple:
+        """
+        가까운 순서로 최대 k개 시설을 찾습니다.
+        중심 셀에서 한 고리씩 넓혀 가며 새 셀만 계산하고, k번째 시설이 이미 확인한 범위 안에 있거나
+        max_radius_km에 닿거나, 시설이 있는 셀을 모두 봤으면 멈춥니다.
+        max_radius_km가 0 이하이거나 NaN이면 ValueError.
+
+        accept: 후보 facility_id 목록을 받아 통과한 id 집합을 돌려주는 함수 (text_filter 등 추가 조건)
+        반환: ([(facility_id, 거리km), ...] 거리순, 실제 사용한 반경km)
+        """
+        if not max_radius_km > 0:
+            raise ValueError(f"max_radius_km는 0보다 커야 합니다: {max_radius_km}")
+        names = [c for c in set(categories) if c in self._grids] if categories else list(self._grids)
+        grids = [self._grids[c] for c in names]
+
+        center_row, center_col = self._cell(lat, lon)
+        # 이 고리까지 보면 시설이 있는 셀은 모두 본 것
+        last_ring = max((max(center_row - row_lo, row_hi - center_row, center_col - col_lo, col_hi - center_col)
+                         for row_lo, row_hi, col_lo, col_hi in (self._extents[c] for c in names)), default=0)
+        found = []  # (거리, facility_id)
+        ring = 0
+
+        while grids and k > 0:
+            positions = self._ring_positions(grids, center_row, center_col, ring)
+            if len(positions):
+                ids, distances = self.snapshot.score(lat, lon, max_radius_km, positions)
+                pairs = list(zip(distances.tolist(), ids.tolist()))
+                if accept is not None and pairs:
+                    allowed = accept([facility_id for _, facility_id in pairs])
+                    pairs = [p for p in pairs if p[1] in allowed]
+                found.extend(pairs)
+
+            covered = self._covered_radius_km(lat, lon, center_row, center_col, ring)
+            if covered >= max_radius_km or ring >= last_ring:
+                break
+            if len(found) >= k and heapq.nsmallest(k, found)[-1][0] <= covered:
+                break
+            ring += 1
+
+        selected = heapq.nsmallest(k, found) if k > 0 else []
+        effective_radius_km = selected[-1][0] if len(selected) == k else max_radius_km
+        # 반경 검색과 같은 순서 (반올림 거리, ID)
+        selected.sort(key=lambda p: (round(p[0], 2), p[1]))
+        return [(facility_id, distance) for distance, facility_id in selected], effective_radius_km
+
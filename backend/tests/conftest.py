@@ -0,0 +1,49 @@
+# backend/tests/conftest.py
+"""
+backend 모듈은 패키지가 아니라 backend 폴더에서 바로 불러오므로 (python app.py, gunicorn wsgi:app)
+테스트도 같은 방식으로 불러오도록 경로를 추가합니다.
+
+    cd backend
+    python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from facility_snapshot import FacilitySnapshot, haversine_km
+
+# 인덱스 테스트에서 함께 쓰는 가짜 시설 데이터와 전체 스캔 기준값
+CATEGORIES = ['veterinary hospital', 'pharmacy', 'café', 'hotel']
+
+
+STACKED_AT = (37.5665, 126.9780)
+
+
+def make_snapshot(rng, n=3000, far=200, deleted=0, stacked=0):
+    """
+    서울 근처에 몰린 시설 + 전국에 흩어진 시설 far개 (셀 경계/빈 셀이 고루 나오도록)
+    앞의 deleted개는 증분 반영으로 지운 행(NaN 좌표), 그다음 stacked개는 STACKED_AT 한 점에 몰린 시설입니다.
+    """
+    lats = np.concatenate((rng.uniform(37.45, 37.65, n - far), rng.uniform(33.0, 38.5, far)))
+    lons = np.concatenate((rng.uniform(126.85, 127.15, n - far), rng.uniform(125.0, 130.0, far)))
+    lats[:deleted] = lons[:deleted] = np.nan
+    lats[deleted:deleted + stacked], lons[deleted:deleted + stacked] = STACKED_AT
+    ids = rng.permutation(np.arange(1, n + 1) * 3)  # ID와 행 위치가 달라야 섞여도 드러남
+    codes = rng.integers(0, len(CATEGORIES), n)
+    return FacilitySnapshot(ids, codes, lats, lons, CATEGORIES)
+
+
+def brute_force_radius(snapshot, lat, lon, radius_km, categories):
+    """시설을 하나씩 haversine으로 재서 반경 안의 (facility_id, 거리km)를 ID 순으로 반환합니다."""
+    positions = snapshot.category_positions(categories)
+    distances = haversine_km(lat, lon, snapshot.lats[positions], snapshot.lons[positions])
+    keep = distances <= radius_km  # NaN(지운 행)은 항상 False
+    return sorted(zip(snapshot.ids[positions][keep].tolist(), distances[keep].tolist()))
+
+
+def assert_same_matches(actual, expected):
+    assert [facility_id for facility_id, _ in sorted(actual)] == [facility_id for facility_id, _ in expected]
+    np.testing.assert_allclose([d for _, d in sorted(actual)], [d for _, d in expected], rtol=0, atol=1e-9)
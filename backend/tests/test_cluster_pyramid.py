@@ -0,0 +1,138 @@
+# backend/tests/test_cluster_pyramid.py
+"""위 줌으로 합쳐 올린 클러스터가 시설마다 칸을 다시 계산해 묶은 결과와 같은지 확인합니다."""
+from collections import defaultdict
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from cluster_pyramid import (
+    MAX_CLUSTER_ZOOM, MAX_VIEW_CELLS, ClusterPyramid, PyramidCache, cell_range, cells_per_side, mercator_xy,
+    parse_bbox,
+)
+from conftest import CATEGORIES, STACKED_AT, make_snapshot
+from facility_reload import FacilityIndexes
+
+SEOUL = (37.43, 126.80, 37.70, 127.20)  # (min_lat, min_lon, max_lat, max_lon)
+
+
+def brute_force(snapshot, cells, categories=None):
+    """시설마다 줌 cells.zoom의 칸을 구해 범위 안의 칸별로 묶습니다."""
+    n = cells_per_side(cells.zoom)
+    x, y = mercator_xy(snapshot.lats, snapshot.lons)
+    groups = defaultdict(list)
+    for lat, lon, code, fx, fy in zip(snapshot.lats.tolist(), snapshot.lons.tolist(),
+                                      snapshot.category_codes.tolist(), x.tolist(), y.tolist()):
+        if not np.isfinite(lat) or (categories and CATEGORIES[code] not in categories):
+            continue
+        cx, cy = min(int(fx * n), n - 1), min(int(fy * n), n - 1)
+        if cells.x_lo <= cx <= cells.x_hi and cells.y_lo <= cy <= cells.y_hi:
+            groups[cy * n + cx].append((lat, lon, CATEGORIES[code]))
+
+    clusters = []
+    for key in sorted(groups):
+        members = groups[key]
+        by_category = defaultdict(int)
+        for _, _, category in members:
+            by_category[category] += 1
+        clusters.append({
+            "lat": sum(m[0] for m in members) / len(members),
+            "lon": sum(m[1] for m in members) / len(members),
+            "count": len(members),
+            "categories": dict(by_category),
+        })
+    return clusters
+
+
+def assert_same(actual, expected):
+    assert [c["count"] for c in actual] == [c["count"] for c in expected]
+    assert [c["categories"] for c in actual] == [c["categories"] for c in expected]
+    np.testing.assert_allclose([c["lat"] for c in actual], [c["lat"] for c in expected], atol=1e-6)
+    np.testing.assert_allclose([c["lon"] for c in actual], [c["lon"] for c in expected], atol=1e-6)
+
+
+@pytest.fixture(scope='module')
+def snapshot():
+    return make_snapshot(np.random.default_rng(9), n=4000, far=300, deleted=50, stacked=10)
+
+
+@pytest.fixture(scope='module')
+def pyramid(snapshot):
+    return ClusterPyramid.from_snapshot(snapshot)
+
+
+@pytest.mark.parametrize('zoom', [0, 3, 7, 10, 12, 14, 16])
+def test_clusters_match_per_facility_grouping(snapshot, pyramid, zoom):
+    rng = np.random.default_rng(zoom)
+    for _ in range(10):
+        # 줌에 맞는 크기의 화면을 서울 근처 임의 위치에
+        span = min(170.0, 360.0 / 2 ** zoom * 4)
+        lat, lon = rng.uniform(SEOUL[0], SEOUL[2]), rng.uniform(SEOUL[1], SEOUL[3])
+        bbox = (max(-85.0, lat - span / 4), max(-180.0, lon - span / 2),
+                min(85.0, lat + span / 4), min(180.0, lon + span / 2))
+        cells = cell_range(bbox, zoom)
+        for categories in (None, ['pharmacy'], ['hotel', 'café', 'nonexistent']):
+            assert_same(pyramid.clusters(cells, categories), brute_force(snapshot, cells, categories))
+
+
+def test_every_level_counts_all_located_facilities(snapshot, pyramid):
+    located = int(np.isfinite(snapshot.lats).sum())
+    assert pyramid.size == located
+    assert pyramid.max_zoom == MAX_CLUSTER_ZOOM
+    for level in pyramid.levels:
+        assert int(level.counts.sum()) == located
+        assert np.all(np.diff(level.keys) >= 0)
+    assert sum(c["count"] for c in pyramid.clusters(cell_range((-85, -180, 85, 180), 0))) == located
+
+
+def test_stacked_facilities_form_one_cluster(pyramid):
+    lat, lon = STACKED_AT
+    cells = cell_range((lat - 1e-4, lon - 1e-4, lat + 1e-4, lon + 1e-4), MAX_CLUSTER_ZOOM)
+    [cluster] = pyramid.clusters(cells)
+    assert cluster["count"] == 10
+    assert (cluster["lat"], cluster["lon"]) == STACKED_AT
+
+
+def test_empty_view_and_unknown_category(pyramid):
+    assert pyramid.clusters(cell_range((-40.0, -60.0, -39.0, -59.0), 8)) == []
+    assert pyramid.clusters(cell_range(SEOUL, 10), ['nonexistent']) == []
+
+
+def test_cell_range_covers_bbox():
+    for zoom in (5, 10, 16):
+        cells = cell_range((37.55, 126.97, 37.56, 126.99), zoom)
+        min_lat, min_lon, max_lat, max_lon = cells.bbox()
+        assert min_lat <= 37.55 and max_lat >= 37.56 and min_lon <= 126.97 and max_lon >= 126.99
+    world = cell_range((-90, -180, 90, 180), 0)  # 끝 칸을 넘지 않음
+    assert (world.x_lo, world.x_hi, world.y_lo, world.y_hi) == (0, 3, 0, 3)
+
+
+def test_cell_range_rejects_too_many_cells():
+    with pytest.raises(ValueError):
+        cell_range(SEOUL, MAX_CLUSTER_ZOOM)
+    assert cell_range(SEOUL, 11).cell_count <= MAX_VIEW_CELLS
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('126.9,37.5,127.1,37.6', (37.5, 126.9, 37.6, 127.1)),
+    (['126.9', '37.5', '127.1', '37.6'], (37.5, 126.9, 37.6, 127.1)),
+])
+def test_parse_bbox(value, expected):
+    assert parse_bbox(value) == expected
+
+
+@pytest.mark.parametrize('value', ['126.9,37.5,127.1', 'a,b,c,d', '126.9,37.6,127.1,37.5', '126.9,37.5,200,37.6',
+                                   'nan,37.5,127.1,37.6', None])
+def test_parse_bbox_rejects(value):
+    with pytest.raises(ValueError):
+        parse_bbox(value)
+
+
+def test_cache_rebuilds_only_on_new_version(snapshot):
+    index = SimpleNamespace(snapshot=snapshot)  # 피라미드는 index.snapshot만 씀
+    cache = PyramidCache(max_zoom=8)
+    first = cache.get(FacilityIndexes(index, None, 1))
+    assert cache.get(FacilityIndexes(index, None, 1)) is first
+    assert cache.get(FacilityIndexes(index, None, 2)) is not first
+    assert cache.builds == 2
+    assert cache.stats()["max_zoom"] == 8
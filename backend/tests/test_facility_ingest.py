@@ -0,0 +1,250 @@
+# backend/tests/test_facility_ingest.py
+"""적재 CLI의 중복 검사와 트랜잭션/트리거 처리를 확인합니다."""
+import csv
+import json
+import math
+import random
+import sqlite3
+
+import pytest
+
+from facility_ingest import DUPLICATE_RADIUS_M, HASH_CELL_DEG, DuplicateIndex, ingest
+from facility_reload import CHANGE_TABLE, CHANGE_TRIGGERS, ensure_change_log
+from fts import FTS_TABLE, ensure_fts_index
+
+NAMES = ['행복 동물병원', '튼튼 약국', '멍멍 카페', '해피펫 호텔', '우리동네 애견미용', '초록 동물병원 2호점']
+EXISTING = [
+    # Facility_ID, Name, Category, District, Latitude, Longitude, RoadAddress
+    (1, '행복 동물병원', 'veterinary hospital', 'Administrative divisions of Gangnam District',
+     37.5000, 127.0300, '서울특별시 강남구 테헤란로 1'),
+    (2, '튼튼약국', 'pharmacy', 'Mapo District', 37.5550, 126.9100, '서울특별시 마포구 월드컵로 2'),
+    (3, '이름만 있는 펜션', '펜션', None, None, None, '서울특별시 중구 세종대로 3'),
+]
+
+
+def distance_m(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6_371_000 * math.asin(math.sqrt(a))
+
+
+def offset(lat, lon, north_m, east_m):
+    return lat + north_m / 111_320.0, lon + east_m / (111_320.0 * math.cos(math.radians(lat)))
+
+
+# ---------- DuplicateIndex ----------
+def make_index(entries):
+    index = DuplicateIndex()
+    for facility_id, name, lat, lon in entries:
+        index.add(index.probe(name, lat, lon), facility_id)
+    return index
+
+
+@pytest.mark.parametrize('name, north_m, east_m, expected', [
+    ('행복 동물병원', 20, 0, 1),          # 같은 이름, 가까움
+    ('행복동물병원(주)', 0, -30, 1),       # 공백/회사 표기만 다름
+    ('행복 동물 병원', 35, 25, 1),
+    ('행복 동물병원', 80, 0, None),        # 50m 밖
+    ('행복 고양이병원', 10, 0, None),      # 이름이 다름
+])
+def test_find_near_duplicates(name, north_m, east_m, expected):
+    index = make_index([(1, '행복 동물병원', 37.5, 127.03)])
+    lat, lon = offset(37.5, 127.03, north_m, east_m)
+    assert index.find(index.probe(name, lat, lon)) == expected
+
+
+def test_numbers_in_name_must_match():
+    index = make_index([(1, '초록 동물병원 2호점', 37.5, 127.03)])
+    assert index.find(index.probe('초록 동물병원 2호점', 37.5, 127.03)) == 1
+    assert index.find(index.probe('초록 동물병원 3호점', 37.5, 127.03)) is None
+
+
+def test_finds_duplicates_across_cell_boundary():
+    # 해시 격자 경계 바로 양쪽 (위도/경도 모두)
+    lat, lon = 37.5 + HASH_CELL_DEG * 0.999, 127.03 + HASH_CELL_DEG * 0.999
+    index = make_index([(1, '멍멍 카페', lat, lon)])
+    other_lat, other_lon = offset(lat, lon, 15, 15)
+    assert index._cell(lat, lon) != index._cell(other_lat, other_lon)
+    assert index.find(index.probe('멍멍 카페', other_lat, other_lon)) == 1
+
+
+def test_unlocated_facilities_match_on_name_and_address():
+    index = DuplicateIndex()
+    index.add(index.probe('이름만 있는 펜션', None, None, '서울 중구 세종대로 3'), 3)
+    assert index.find(index.probe('이름만 있는 펜션', None, None, '서울 중구 세종대로 3')) == 3
+    assert index.find(index.probe('이름만 있는 펜션', None, None, '서울 중구 세종대로 4')) is None
+    assert index.find(index.probe('이름만 있는 펜션', 37.5, 127.0)) is None
+
+
+def test_find_matches_pairwise_scan():
+    rng = random.Random(5)
+    entries = []
+    for facility_id in range(1, 1501):
+        lat, lon = rng.uniform(37.49, 37.51), rng.uniform(127.02, 127.04)
+        entries.append((facility_id, rng.choice(NAMES), lat, lon))
+    index = make_index(entries)
+
+    checked = 0
+    for _ in range(1000):
+        name = rng.choice(NAMES)
+        lat, lon = rng.uniform(37.49, 37.51), rng.uniform(127.02, 127.04)
+        distances = [(distance_m(lat, lon, e_lat, e_lon), facility_id, e_name)
+                     for facility_id, e_name, e_lat, e_lon in entries]
+        if any(abs(d - DUPLICATE_RADIUS_M) < 2 for d, _, e_name in distances if e_name == name):
+            continue  # 평면 근사와 haversine이 갈릴 수 있는 경계는 건너뜀
+        expected = {facility_id for d, facility_id, e_name in distances if d <= DUPLICATE_RADIUS_M and e_name == name}
+        found = index.find(index.probe(name, lat, lon))
+        assert (found in expected) if expected else found is None
+        checked += 1
+    assert checked > 900
+
+
+# ---------- ingest ----------
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'ingest.sqlite')
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("""
+            CREATE TABLE Facilities (
+                Facility_ID INTEGER PRIMARY KEY, Name TEXT NOT NULL, Category TEXT, District TEXT,
+                Latitude REAL, Longitude REAL, RoadAddress TEXT, LotAddress TEXT, Description TEXT,
+                ParkingAvailable INTEGER
+            )
+        """)
+        conn.execute("CREATE TABLE OpeningHours (Facility_ID INTEGER, DayOfWeek TEXT, Opens TEXT, Closes TEXT)")
+        conn.execute("CREATE TABLE HolidayInfo (Facility_ID INTEGER, Day_Off TEXT)")
+        conn.execute("CREATE TABLE districts (id INTEGER PRIMARY KEY, name TEXT, en_name TEXT)")
+        conn.executemany("INSERT INTO districts (name, en_name) VALUES (?, ?)", [
+            ('강남구', 'Administrative divisions of Gangnam District'), ('마포구', 'Mapo District'), ('중구', 'Jung District'),
+        ])
+        conn.executemany("INSERT INTO Facilities (Facility_ID, Name, Category, District, Latitude, Longitude, "
+                         "RoadAddress) VALUES (?, ?, ?, ?, ?, ?, ?)", EXISTING)
+    conn.close()
+    assert ensure_fts_index(path)
+    assert ensure_change_log(path)
+    return path
+
+
+def write_jsonl(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(record if isinstance(record, str) else json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+    return str(path)
+
+
+def new_records():
+    near_lat, near_lon = offset(37.5, 127.03, 15, -10)
+    return [
+        {"name": "새싹 동물병원", "category": "동물병원", "district": "강남", "Latitude": 37.51, "Longitude": 127.05,
+         "road_address": "서울특별시 강남구 봉은사로 10", "parking_available": "예",
+         "opening_hours": [{"day_of_week": "Monday", "opens": "9:00", "closes": "18:00"}],
+         "holidays": ["일요일", "법정공휴일"]},
+        {"name": "행복동물병원", "Latitude": near_lat, "Longitude": near_lon},          # 기존 1번과 근접 중복
+        {"name": "새싹 동물병원", "Latitude": 37.51, "Longitude": 127.05},              # 같은 파일 안의 중복
+        {"Facility_ID": 2, "name": "다른 약국", "Latitude": 37.6, "Longitude": 127.1},  # ID 중복
+        {"name": "이름만 있는 펜션", "road_address": "서울특별시 중구 세종대로 3"},         # 좌표 없는 중복
+        {"name": "", "Latitude": 37.5, "Longitude": 127.0},                             # 이름 없음
+        {"name": "좌표 오류", "Latitude": 137.5, "Longitude": 127.0},
+        {"name": "좌표 반쪽", "Latitude": 37.5},
+        {"name": "영업시간 오류", "opening_hours": "Monday 9-18"},
+        "{not json",
+        {"name": "마포 애견카페", "category": "Mystery Category", "road_address": "서울특별시 마포구 월드컵로 99",
+         "Latitude": 37.556, "Longitude": 126.905, "color": "blue"},
+    ]
+
+
+def test_ingest_skips_duplicates_and_invalid_rows(db_path, tmp_path):
+    rejects_path = str(tmp_path / 'rejects.jsonl')
+    stats = ingest(db_path, write_jsonl(tmp_path / 'in.jsonl', new_records()), batch_size=2,
+                   rejects_path=rejects_path, progress=False)
+
+    assert {k: stats[k] for k in ('read', 'inserted', 'invalid', 'duplicate_id', 'near_duplicate',
+                                  'unknown_category', 'opening_hours', 'holidays')} == {
+        'read': 11, 'inserted': 2, 'invalid': 5, 'duplicate_id': 1, 'near_duplicate': 3,
+        'unknown_category': 1, 'opening_hours': 1, 'holidays': 2,
+    }
+    assert stats['unknown_columns'] == ['color']
+
+    with open(rejects_path, encoding='utf-8') as f:
+        rejects = [json.loads(line) for line in f]
+    assert [r['line'] for r in rejects] == [2, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert [r.get('duplicate_of') for r in rejects[:4]] == [1, 4, 2, 3]
+    assert 'record' not in rejects[-1]  # JSON 형식 오류는 원문 없이 이유만
+
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT Facility_ID, Name, Category, District, ParkingAvailable FROM Facilities "
+                            "WHERE Facility_ID > 3 ORDER BY Facility_ID").fetchall()
+        assert rows == [
+            (4, '새싹 동물병원', 'veterinary hospital', 'Administrative divisions of Gangnam District', 1),
+            (5, '마포 애견카페', 'Mystery Category', 'Mapo District', None),  # 구는 주소에서 찾음
+        ]
+        assert conn.execute("SELECT * FROM OpeningHours").fetchall() == [(4, 'Monday', '09:00', '18:00')]
+        assert conn.execute("SELECT * FROM HolidayInfo ORDER BY Day_Off").fetchall() == \
+            [(4, '법정공휴일'), (4, '일요일')]
+
+        # 내려 두었던 트리거가 돌아오고, 새 시설은 FTS에 들어가고, 서버에는 전체 다시 읽기 표시가 남음
+        assert {row[0] for row in conn.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?", ('"새싹 동물"',))} == {4}
+        triggers = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        assert set(CHANGE_TRIGGERS) | {f"{FTS_TABLE}_ai", f"{FTS_TABLE}_ad", f"{FTS_TABLE}_au"} <= triggers
+        assert conn.execute(f"SELECT facility_id FROM {CHANGE_TABLE} ORDER BY seq DESC LIMIT 1").fetchone() == (None,)
+    finally:
+        conn.close()
+
+
+def test_dry_run_leaves_database_unchanged(db_path, tmp_path):
+    def dump():
+        conn = sqlite3.connect(db_path)
+        try:
+            return [conn.execute(f"SELECT * FROM {table}").fetchall()
+                    for table in ('Facilities', 'OpeningHours', 'HolidayInfo', CHANGE_TABLE, FTS_TABLE)]
+        finally:
+            conn.close()
+
+    before = dump()
+    stats = ingest(db_path, write_jsonl(tmp_path / 'in.jsonl', new_records()), dry_run=True, progress=False)
+    assert stats['inserted'] == 2 and stats['dry_run']
+    assert dump() == before
+
+
+def test_failed_ingest_rolls_back(db_path, tmp_path):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        # 휴무일이 두 개인 첫 행이 마지막 executemany에서 실패하도록
+        conn.execute("CREATE UNIQUE INDEX one_holiday ON HolidayInfo (Facility_ID)")
+    conn.close()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        ingest(db_path, write_jsonl(tmp_path / 'in.jsonl', new_records()), progress=False)
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT count(*) FROM Facilities").fetchone()[0] == len(EXISTING)
+        assert conn.execute("SELECT count(*) FROM sqlite_master WHERE type = 'trigger'").fetchone()[0] == \
+            len(CHANGE_TRIGGERS) + 3
+    finally:
+        conn.close()
+
+
+def test_csv_hours_and_holidays(db_path, tmp_path):
+    path = str(tmp_path / 'in.csv')
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Name', 'Category', 'District', 'Latitude', 'Longitude', 'opening_hours', 'holidays'])
+        writer.writerow(['튼튼 약국 본점', '약국', 'Mapo-gu', '37.56', '126.92',
+                         'Monday 09:00-18:00; 화 1000~1900', '일요일|법정공휴일'])
+        writer.writerow(['멍멍 카페', 'cafe', '', '', '', '', ''])
+    stats = ingest(db_path, path, progress=False)
+    assert (stats['inserted'], stats['invalid']) == (2, 0)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("SELECT Name, Category, District FROM Facilities WHERE Facility_ID > 3 "
+                            "ORDER BY Facility_ID").fetchall() == [
+            ('튼튼 약국 본점', 'pharmacy', 'Mapo District'), ('멍멍 카페', 'café au lait', None)]
+        assert conn.execute("SELECT DayOfWeek, Opens, Closes FROM OpeningHours ORDER BY DayOfWeek").fetchall() == [
+            ('Monday', '09:00', '18:00'), ('Tuesday', '10:00', '19:00')]
+    finally:
+        conn.close()
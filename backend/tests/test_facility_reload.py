@@ -0,0 +1,171 @@
+# backend/tests/test_facility_reload.py
+"""변경 기록으로 증분 반영한 인덱스가 DB 전체를 다시 읽어 만든 인덱스와 같은 결과를 내는지 확인합니다."""
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from facility_reload import CHANGE_TABLE, FacilityReloader, ensure_change_log
+from opening_hours import KST, OpeningHoursIndex
+from spatial_index import FacilityGridIndex
+
+CATEGORIES = ['veterinary hospital', 'pharmacy', 'café', 'hotel']
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday', '법정공휴일']
+TIMES = ['0:00', '9:00', '12:30', '18:00', '22:00', '2:00']
+DAY_OFFS = ['월요일', '법정공휴일', '2째주 수요일', '1월1일']
+ORIGINS = [(37.50, 127.00, 3.0), (37.55, 126.95, 1.0), (37.60, 127.05, 8.0), (37.45, 126.90, 0.5)]
+TIMES_TO_CHECK = [datetime(2025, 6, 2, 10, 0, tzinfo=KST) + timedelta(hours=h * 7) for h in range(24)]
+
+
+def facility_row(rng, facility_id):
+    lat, lon = rng.uniform(37.43, 37.67), rng.uniform(126.85, 127.15)
+    if rng.random() < 0.03:
+        lat = lon = None  # 좌표 없는 시설은 인덱스에 들어가지 않음
+    return facility_id, rng.choice(CATEGORIES), lat, lon
+
+
+def hours_rows(rng, facility_id):
+    return [(facility_id, day, rng.choice(TIMES), rng.choice(TIMES)) for day in rng.sample(DAYS, rng.randint(0, 5))]
+
+
+def create_db(path, seed, n=600):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("CREATE TABLE Facilities (Facility_ID INTEGER PRIMARY KEY, Category TEXT, "
+                     "Latitude REAL, Longitude REAL)")
+        conn.execute("CREATE TABLE OpeningHours (Facility_ID INTEGER, DayOfWeek TEXT, Opens TEXT, Closes TEXT)")
+        conn.execute("CREATE TABLE HolidayInfo (Facility_ID INTEGER, Day_Off TEXT)")
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        for facility_id in range(1, n + 1):
+            conn.execute("INSERT INTO Facilities VALUES (?, ?, ?, ?)", facility_row(rng, facility_id))
+            conn.executemany("INSERT INTO OpeningHours VALUES (?, ?, ?, ?)", hours_rows(rng, facility_id))
+            if rng.random() < 0.2:
+                conn.execute("INSERT INTO HolidayInfo VALUES (?, ?)", (facility_id, rng.choice(DAY_OFFS)))
+    conn.close()
+
+
+def random_changes(conn, rng, count):
+    """시설 이동/카테고리 변경, 추가, 삭제, 영업시간/휴무 변경을 섞어 한 번에 커밋합니다."""
+    ids = [row[0] for row in conn.execute("SELECT Facility_ID FROM Facilities")]
+    next_id = max(ids) + 1
+    with conn:
+        for facility_id in rng.sample(ids, count):
+            action = rng.choice(['move', 'category', 'delete', 'hours', 'day_off'])
+            if action == 'move':
+                _, _, lat, lon = facility_row(rng, facility_id)
+                conn.execute("UPDATE Facilities SET Latitude = ?, Longitude = ? WHERE Facility_ID = ?",
+                             (lat, lon, facility_id))
+            elif action == 'category':
+                conn.execute("UPDATE Facilities SET Category = ? WHERE Facility_ID = ?",
+                             (rng.choice(CATEGORIES), facility_id))
+            elif action == 'delete':
+                for table in ('Facilities', 'OpeningHours', 'HolidayInfo'):
+                    conn.execute(f"DELETE FROM {table} WHERE Facility_ID = ?", (facility_id,))
+            elif action == 'hours':
+                conn.execute("DELETE FROM OpeningHours WHERE Facility_ID = ?", (facility_id,))
+                conn.executemany("INSERT INTO OpeningHours VALUES (?, ?, ?, ?)", hours_rows(rng, facility_id))
+            else:
+                conn.execute("INSERT INTO HolidayInfo VALUES (?, ?)", (facility_id, rng.choice(DAY_OFFS)))
+        for facility_id in range(next_id, next_id + count // 4):
+            conn.execute("INSERT INTO Facilities VALUES (?, ?, ?, ?)", facility_row(rng, facility_id))
+            conn.executemany("INSERT INTO OpeningHours VALUES (?, ?, ?, ?)", hours_rows(rng, facility_id))
+
+
+def assert_matches_rebuild(reloader, db_path):
+    index, opening_hours = FacilityGridIndex.from_db(db_path), OpeningHoursIndex.from_db(db_path)
+    current = reloader.current
+    for lat, lon, radius_km in ORIGINS:
+        for categories in ([], ['pharmacy'], ['hotel', 'café']):
+            assert sorted(current.index.query_radius(lat, lon, radius_km, categories)) == \
+                sorted(index.query_radius(lat, lon, radius_km, categories))
+        assert current.index.nearest(lat, lon, 15)[0] == index.nearest(lat, lon, 15)[0]
+    for when in TIMES_TO_CHECK:
+        assert current.opening_hours.open_ids(when) == opening_hours.open_ids(when)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'facilities.sqlite')
+    create_db(path, seed=11)
+    assert ensure_change_log(path)
+    return path
+
+
+@pytest.fixture
+def writer(db_path):
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+
+def make_reloader(db_path, **kwargs):
+    reloader = FacilityReloader(db_path, interval=0, **kwargs)
+    reloader.publish(FacilityGridIndex.from_db(db_path), OpeningHoursIndex.from_db(db_path))
+    return reloader
+
+
+def test_incremental_reload_matches_rebuild(db_path, writer):
+    swaps = []
+    reloader = make_reloader(db_path, compact_ratio=1.0, on_swap=lambda: swaps.append(1))
+    full_before = reloader.stats()['full_reloads']
+    rng = random.Random(3)
+    for _ in range(5):
+        random_changes(writer, rng, 40)
+        assert reloader.check()
+        assert_matches_rebuild(reloader, db_path)
+
+    stats = reloader.stats()
+    assert stats['incremental_reloads'] == 5
+    assert stats['full_reloads'] == full_before
+    assert len(swaps) == 5
+
+
+def test_no_commit_or_unrelated_commit_keeps_indexes(db_path, writer):
+    reloader = make_reloader(db_path)
+    version = reloader.current.version
+    assert not reloader.check()
+    with writer:
+        writer.execute("INSERT INTO users (name) VALUES ('tester')")
+    assert not reloader.check()
+    assert reloader.current.version == version
+
+
+def test_full_reload_marker_rebuilds(db_path, writer):
+    reloader = make_reloader(db_path)
+    full_before = reloader.stats()['full_reloads']
+    with writer:
+        # 대량 적재 뒤 직접 남기는 '전체 다시 읽기' 표시
+        writer.execute("UPDATE Facilities SET Category = 'hotel' WHERE Facility_ID <= 50")
+        writer.execute(f"INSERT INTO {CHANGE_TABLE}(facility_id) VALUES (NULL)")
+    assert reloader.check()
+    assert reloader.stats()['full_reloads'] == full_before + 1
+    assert_matches_rebuild(reloader, db_path)
+
+
+@pytest.mark.parametrize('kwargs', [{'max_incremental': 10}, {'compact_ratio': 0.01}])
+def test_large_changes_fall_back_to_full_rebuild(db_path, writer, kwargs):
+    reloader = make_reloader(db_path, **kwargs)
+    full_before = reloader.stats()['full_reloads']
+    random_changes(writer, random.Random(4), 40)
+    assert reloader.check()
+    stats = reloader.stats()
+    assert stats['full_reloads'] == full_before + 1
+    assert stats['pending_compaction_rows'] == 0
+    assert_matches_rebuild(reloader, db_path)
+
+
+def test_without_change_log_rebuilds_on_row_count_change(tmp_path):
+    path = str(tmp_path / 'plain.sqlite')
+    create_db(path, seed=12)
+    reloader = make_reloader(path)
+    assert reloader.stats()['change_log'] is False
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("INSERT INTO Facilities VALUES (9999, 'pharmacy', 37.5, 127.0)")
+    conn.close()
+    assert reloader.check()
+    assert reloader.stats()['full_reloads'] == 1
+    assert_matches_rebuild(reloader, path)
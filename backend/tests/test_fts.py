@@ -0,0 +1,151 @@
+# backend/tests/test_fts.py
+"""FTS5 text_filter 결과가 단순 부분 문자열 검사와 같은 시설을 고르는지 확인합니다."""
+import random
+import sqlite3
+
+import pytest
+
+from fts import (
+    DISTANCE_WEIGHT, FTS_TABLE, TEXT_WEIGHT, ensure_fts_index, score_by_text, text_matcher, text_relevance,
+)
+
+WORDS = ['24시', '동물병원', '고양이', '전문', '약국', '카페', '애견', '미용', '호텔', '응급', '야간', '진료']
+ROADS = ['서울특별시 용산구 한강대로', '서울특별시 마포구 월드컵로', '서울특별시 강남구 테헤란로']
+
+
+def create_facilities(path, rows):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("""
+            CREATE TABLE Facilities (
+                Facility_ID INTEGER PRIMARY KEY,
+                Name TEXT, Description TEXT, RoadAddress TEXT
+            )
+        """)
+        conn.executemany("INSERT INTO Facilities VALUES (?, ?, ?, ?)", rows)
+    conn.close()
+
+
+def random_rows(seed, n=300):
+    rng = random.Random(seed)
+    return [
+        (facility_id,
+         ' '.join(rng.sample(WORDS, 2)),
+         ' '.join(rng.sample(WORDS, 3)) if rng.random() < 0.8 else None,
+         f"{rng.choice(ROADS)} {rng.randint(1, 300)}")
+        for facility_id in range(1, n + 1)
+    ]
+
+
+def contains(row, term):
+    return any(value and term in value for value in row[1:])
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / 'fts.sqlite')
+    rows = random_rows(7)
+    create_facilities(path, rows)
+    assert ensure_fts_index(path)
+    conn = sqlite3.connect(path)
+    yield conn, rows
+    conn.close()
+
+
+@pytest.mark.parametrize('text_filter', ['동물병원', '고양이 약국', '응급', '24시 동물병원', '카페 미용', '테헤란로', '없는말'])
+def test_matches_substring_scan(db, text_filter):
+    conn, rows = db
+    candidates = [row[0] for row in rows if row[0] % 3]  # 후보 밖 시설은 결과에 나오면 안 됨
+    relevance = text_relevance(conn, text_filter, candidates, chunk_size=37)
+
+    terms = [t for t in text_filter.split() if len(t) > 1]
+    expected = {row[0] for row in rows if row[0] % 3 and any(contains(row, t) for t in terms)}
+    assert set(relevance) == expected
+    assert all(0 < score <= 1 for score in relevance.values())
+
+
+def test_best_long_term_match_scores_one(db):
+    conn, rows = db
+    relevance = text_relevance(conn, '동물병원', [row[0] for row in rows])
+    assert max(relevance.values()) == pytest.approx(1.0)
+
+
+def test_chunked_candidates_score_like_one_query(db):
+    # 후보를 나눠 MATCH해도 bm25 정규화는 전체 후보 기준이어야 함
+    conn, rows = db
+    candidates = [row[0] for row in rows if row[0] % 2]
+    whole = text_relevance(conn, '동물병원 고양이 약국', candidates, chunk_size=len(rows))
+    chunked = text_relevance(conn, '동물병원 고양이 약국', candidates + candidates[:20], chunk_size=11)
+    assert chunked.keys() == whole.keys()
+    assert all(chunked[k] == pytest.approx(whole[k]) for k in whole)
+
+
+def test_short_terms_score_by_fraction_matched(db):
+    # 2글자 단어는 trigram 인덱스 대신 instr()로 찾고, 맞은 단어 비율이 관련도가 됨
+    conn, rows = db
+    relevance = text_relevance(conn, '약국 카페', [row[0] for row in rows])
+    for row in rows:
+        hits = contains(row, '약국') + contains(row, '카페')
+        assert relevance.get(row[0], 0.0) == pytest.approx(hits / 2)
+
+
+@pytest.mark.parametrize('text_filter', ['동물병원', '고양이 약국', '약국 카페', '테헤란로 미용', '없는말', '약 시'])
+def test_matcher_matches_relevance_and_runs_match_once(db, text_filter):
+    # rank_nearest는 고리마다 후보를 나눠 물어보지만 MATCH는 한 번만 실행돼야 함
+    conn, rows = db
+    statements = []
+    conn.set_trace_callback(statements.append)
+    match = text_matcher(conn, text_filter, chunk_size=13)
+    ids = [row[0] for row in rows]
+    rings = [ids[i:i + 40] for i in range(0, len(ids), 40)]
+    for ring in rings:
+        assert match(ring) == text_relevance(conn, text_filter, ring).keys()
+    assert match([]) == set()
+    conn.set_trace_callback(None)
+    match_statements = [sql for sql in statements if 'MATCH' in sql and 'bm25' not in sql]
+    assert len(match_statements) == (1 if any(len(t) > 2 for t in text_filter.split()) else 0)
+
+
+def test_single_characters_and_empty_filter_are_ignored(db):
+    conn, rows = db
+    ids = [row[0] for row in rows]
+    assert text_relevance(conn, '약 시', ids) == {}
+    assert text_relevance(conn, '', ids) == {}
+    assert text_relevance(conn, '동물병원', []) == {}
+
+
+def test_triggers_keep_index_in_sync(db):
+    conn, rows = db
+    with conn:
+        conn.execute("INSERT INTO Facilities VALUES (1001, '새로운 파충류 병원', NULL, '서울특별시 중구 세종대로 1')")
+        conn.execute("UPDATE Facilities SET Name = '파충류 전문 약국' WHERE Facility_ID = 1")
+        conn.execute("DELETE FROM Facilities WHERE Facility_ID = 2")
+    ids = [row[0] for row in rows] + [1001]
+
+    assert set(text_relevance(conn, '파충류', ids)) == {1, 1001}
+    assert conn.execute(f"SELECT count(*) FROM {FTS_TABLE}").fetchone()[0] == len(rows)
+
+
+def test_existing_index_is_reused(db, tmp_path):
+    conn, rows = db
+    assert ensure_fts_index(str(tmp_path / 'fts.sqlite'))
+    assert conn.execute(f"SELECT count(*) FROM {FTS_TABLE}").fetchone()[0] == len(rows)
+
+
+def test_score_by_text_filters_and_combines_distance(db):
+    conn, rows = db
+    rng = random.Random(3)
+    matches = [(row[0], rng.uniform(0, 2)) for row in rows]
+    relevance = text_relevance(conn, '고양이 응급', [m[0] for m in matches])
+
+    scored = score_by_text(conn, '고양이 응급', matches, 2.0)
+    assert [m[0] for m in scored] == [m[0] for m in matches if m[0] in relevance]
+    for facility_id, distance, score in scored:
+        assert score == pytest.approx(TEXT_WEIGHT * relevance[facility_id] - DISTANCE_WEIGHT * distance / 2.0)
+
+
+def test_unavailable_index_reports_false(tmp_path):
+    # 만들 수 없으면 False를 돌려주고, app은 text_filter 없이 거리순으로 돌아감
+    path = str(tmp_path / 'empty.sqlite')
+    sqlite3.connect(path).close()
+    assert ensure_fts_index(path) is False
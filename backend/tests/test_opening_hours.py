@@ -0,0 +1,193 @@
+# backend/tests/test_opening_hours.py
+"""영업시간 비트 배열 인덱스가 영업시간 행을 하나씩 확인한 결과와 같은지 확인합니다."""
+import random
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from opening_hours import (
+    DAY_OF_WEEK, KST, MINUTES_PER_DAY, MINUTES_PER_WEEK, PUBLIC_HOLIDAY, OpeningHoursIndex,
+    parse_day_off, parse_open_at, parse_time, public_holidays, rule_applies,
+)
+
+DAYS = list(DAY_OF_WEEK) + [PUBLIC_HOLIDAY]
+TIMES = ['0:00', '7:30', '9:00', '10:00', '12:30', '18:00', '21:00', '22:30', '24:00', '26:00']
+DAY_OFFS = ['월요일', '일요일', PUBLIC_HOLIDAY, '2째주 수요일', '1,3째주 토요일', '매달 마지막주 금요일',
+            '1월1일', '설 연휴', '추석 당일', '격주 일요일', '']
+
+
+def random_rows(seed, n=200):
+    rng = random.Random(seed)
+    hours_rows, day_off_rows = [], []
+    for facility_id in rng.sample(range(1, 10000), n):
+        for day in rng.sample(DAYS, rng.randint(0, len(DAYS))):
+            hours_rows.append((facility_id, day, rng.choice(TIMES), rng.choice(TIMES)))
+        if rng.random() < 0.05:
+            hours_rows.append((facility_id, rng.choice(DAYS), '휴무', '휴무'))  # 해석 못하는 행
+        for day_off in rng.sample(DAY_OFFS, rng.choice([0, 0, 1, 2])):
+            day_off_rows.append((facility_id, day_off))
+    return hours_rows, day_off_rows
+
+
+def covers(start, opens, closes, t, period):
+    """start + opens 부터 시작하는 영업 구간이 t(분)를 포함하는지 (period로 감아서)"""
+    length = closes - opens if closes > opens else closes + MINUTES_PER_DAY - opens
+    return (t - start - opens) % period < length
+
+
+def brute_force_open(hours_rows, day_off_rows, when):
+    """시각 하나에 대해 행을 하나씩 보고 영업 중인 시설 ID 집합을 구합니다."""
+    day, minute = when.date(), when.hour * 60 + when.minute
+    holiday = day in public_holidays(day.year)
+    rules = {}
+    for facility_id, day_off in day_off_rows:
+        rule = parse_day_off(day_off)
+        if rule is not None:
+            rules.setdefault(facility_id, []).append(rule)
+
+    weekly, holiday_hours = {}, {}
+    for facility_id, day_of_week, opens, closes in hours_rows:
+        opens, closes = parse_time(opens), parse_time(closes)
+        if opens is None or closes is None:
+            continue
+        if day_of_week == PUBLIC_HOLIDAY:
+            holiday_hours.setdefault(facility_id, []).append((opens, closes))
+        elif ('weekday', DAY_OF_WEEK[day_of_week]) not in rules.get(facility_id, ()):
+            weekly.setdefault(facility_id, []).append((DAY_OF_WEEK[day_of_week] * MINUTES_PER_DAY, opens, closes))
+
+    result = set()
+    for facility_id in set(weekly) | set(holiday_hours) | set(rules):
+        if any(rule[0] != 'weekday' and rule_applies(rule, day) for rule in rules.get(facility_id, ())):
+            continue
+        if holiday and facility_id in holiday_hours:
+            # 공휴일 영업시간은 그날 자정까지만
+            is_open = any(opens == closes or opens <= minute < closes or (closes < opens and minute >= opens)
+                          for opens, closes in holiday_hours[facility_id])
+        else:
+            t = day.weekday() * MINUTES_PER_DAY + minute
+            is_open = any(covers(start, opens, closes, t, MINUTES_PER_WEEK)
+                          for start, opens, closes in weekly.get(facility_id, ()))
+        if is_open:
+            result.add(facility_id)
+    return result
+
+
+def sample_times(seed, n=150):
+    rng = random.Random(seed)
+    holidays = sorted(public_holidays(2025) | public_holidays(2026))
+    times = []
+    for _ in range(n):
+        day = rng.choice(holidays) if rng.random() < 0.3 else date(2025, 1, 1) + timedelta(days=rng.randrange(730))
+        times.append(datetime(day.year, day.month, day.day, tzinfo=KST)
+                     + timedelta(minutes=rng.choice([0, 1, 59, 449, 450, 1079, 1080, 1439, rng.randrange(1440)])))
+    return times
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_open_ids_match_row_scan(seed):
+    hours_rows, day_off_rows = random_rows(seed)
+    index = OpeningHoursIndex(hours_rows, day_off_rows)
+    for when in sample_times(seed):
+        assert index.open_ids(when) == brute_force_open(hours_rows, day_off_rows, when), when
+
+
+def test_overnight_hours_wrap_into_next_day_and_week():
+    index = OpeningHoursIndex([
+        (1, 'Sunday', '22:00', '2:00'),     # 일요일 밤 -> 월요일 새벽 (주 경계)
+        (2, 'Friday', '9:00', '9:00'),      # 시작 = 마감이면 24시간
+        (3, 'Tuesday', '18:00', '26:00'),   # 24시를 넘는 마감
+    ], [])
+    assert index.is_open(1, datetime(2025, 6, 2, 1, 59, tzinfo=KST))       # 월요일 01:59
+    assert not index.is_open(1, datetime(2025, 6, 2, 2, 0, tzinfo=KST))
+    assert index.is_open(2, datetime(2025, 6, 7, 8, 59, tzinfo=KST))       # 토요일 08:59
+    assert index.is_open(3, datetime(2025, 6, 4, 1, 30, tzinfo=KST))       # 수요일 01:30
+
+
+def test_date_rules_close_the_whole_day():
+    rows = [(1, day, '0:00', '0:00') for day in DAY_OF_WEEK]
+    index = OpeningHoursIndex(rows, [(1, '2째주 수요일')])
+    assert not index.is_open(1, datetime(2025, 6, 11, 12, 0, tzinfo=KST))  # 둘째 주 수요일
+    assert index.is_open(1, datetime(2025, 6, 18, 12, 0, tzinfo=KST))
+
+
+def test_public_holiday_hours_replace_weekly_hours():
+    index = OpeningHoursIndex([
+        (1, 'Monday', '9:00', '18:00'), (1, PUBLIC_HOLIDAY, '10:00', '13:00'),
+        (2, 'Monday', '9:00', '18:00'),
+    ], [(2, PUBLIC_HOLIDAY)])
+    children_day = datetime(2025, 5, 5, 15, 0, tzinfo=KST)  # 월요일 공휴일
+    assert index.open_ids(children_day) == frozenset()
+    assert index.open_ids(children_day.replace(hour=11)) == {1}
+    assert index.open_ids(children_day + timedelta(days=7)) == {1, 2}
+
+
+def test_from_arrays_round_trip():
+    hours_rows, day_off_rows = random_rows(4)
+    index = OpeningHoursIndex(hours_rows, day_off_rows)
+    copy = OpeningHoursIndex.from_arrays(index.arrays(), index.date_rules, index.skipped_rows)
+    for when in sample_times(4, n=30):
+        assert copy.open_ids(when) == index.open_ids(when)
+
+
+def test_with_changes_matches_rebuild():
+    hours_rows, day_off_rows = random_rows(5)
+    index = OpeningHoursIndex(hours_rows, day_off_rows)
+
+    rng = random.Random(5)
+    ids = sorted({row[0] for row in hours_rows})
+    changed = set(rng.sample(ids, 30)) | {99999}  # 새로 생긴 시설 포함
+    new_hours, new_day_offs = random_rows(6, n=len(changed))
+    remap = dict(zip(sorted({row[0] for row in new_hours} | {row[0] for row in new_day_offs}), sorted(changed)))
+    new_hours = [(remap[r[0]], *r[1:]) for r in new_hours]
+    new_day_offs = [(remap[r[0]], r[1]) for r in new_day_offs]
+
+    hours_after = [r for r in hours_rows if r[0] not in changed] + new_hours
+    day_offs_after = [r for r in day_off_rows if r[0] not in changed] + new_day_offs
+    updated = index.with_changes(changed, new_hours, new_day_offs)
+    rebuilt = OpeningHoursIndex(hours_after, day_offs_after)
+
+    for when in sample_times(5):
+        assert updated.open_ids(when) == rebuilt.open_ids(when), when
+    assert index.open_ids(datetime(2025, 6, 2, 12, 0, tzinfo=KST)) == \
+        brute_force_open(hours_rows, day_off_rows, datetime(2025, 6, 2, 12, 0, tzinfo=KST))
+
+
+def test_open_mask_follows_ids_order():
+    hours_rows, day_off_rows = random_rows(7)
+    index = OpeningHoursIndex(hours_rows, day_off_rows)
+    when = datetime(2025, 3, 4, 10, 0, tzinfo=KST)
+    assert set(index.ids[index.open_mask(when)].tolist()) == brute_force_open(hours_rows, day_off_rows, when)
+    assert np.all(np.diff(index.ids) > 0)
+
+
+def test_skipped_rows_are_counted():
+    index = OpeningHoursIndex([(1, 'Monday', '휴무', '휴무'), (1, '매일', '9:00', '18:00'),
+                               (1, 'Monday', '9:00', '18:00')], [])
+    assert index.skipped_rows == 2
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('9:30', 570), ('09:05', 545), ('25:00', 1500), ('48:00', None), ('9:60', None), ('휴무', None), (None, None),
+])
+def test_parse_time(value, expected):
+    assert parse_time(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('수요일', ('weekday', 2)),
+    ('1,3째주 토요일', ('nth', (1, 3), 5)),
+    ('매달 마지막주 금요일', ('last', 4)),
+    ('12월25일', ('date', 12, 25)),
+    ('설 연휴', ('lunar', ('seollal',), True)),
+    ('격주 일요일', None),
+])
+def test_parse_day_off(value, expected):
+    assert parse_day_off(value) == expected
+
+
+def test_parse_open_at_defaults_to_seoul_time():
+    assert parse_open_at('2025-05-05T14:30') == datetime(2025, 5, 5, 14, 30, tzinfo=KST)
+    assert parse_open_at('2025-05-05T05:30+00:00') == datetime(2025, 5, 5, 14, 30, tzinfo=KST)
+    with pytest.raises(ValueError):
+        parse_open_at('내일 오후')
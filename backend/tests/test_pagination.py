@@ -0,0 +1,79 @@
+# backend/tests/test_pagination.py
+"""limit/cursor로 끝까지 넘긴 페이지를 이으면 전체 정렬 결과와 같은지 확인합니다."""
+import random
+
+import pytest
+
+from pagination import MAX_PAGE_SIZE, InvalidCursorError, decode_cursor, encode_cursor, parse_limit, top_k
+
+
+def distance_key(m):
+    # app.rank_facilities의 거리순 키 (반올림 거리가 같으면 ID 순)
+    return (round(m[1], 2), m[0])
+
+
+def text_key(m):
+    # text_filter가 있을 때의 키 (점수 내림차순, 거리, ID)
+    return (-m[2], m[1], m[0])
+
+
+def make_matches(seed, n=400):
+    rng = random.Random(seed)
+    # 반올림하면 같은 거리가 되는 시설이 많도록 좁은 범위에 몰아 둠
+    return [(facility_id, rng.uniform(0, 3), rng.choice([0.5, 1.25, 2.0, 3.75]))
+            for facility_id in rng.sample(range(1, 100000), n)]
+
+
+def walk_pages(items, key, limit):
+    pages, cursor = [], None
+    while True:
+        after = decode_cursor(cursor) if cursor else None
+        page, cursor = top_k(iter(items), key, limit=limit, after=after)
+        pages.append(page)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize('key', [distance_key, text_key])
+@pytest.mark.parametrize('limit', [1, 7, 100, 399, 400, 5000])
+def test_pages_concatenate_to_full_sort(key, limit):
+    items = make_matches(limit)
+    pages = walk_pages(items, key, limit)
+
+    assert [m for page in pages for m in page] == sorted(items, key=key)
+    assert all(len(page) == limit for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= limit
+
+
+def test_no_limit_returns_everything_without_cursor():
+    items = make_matches(1)
+    selected, cursor = top_k(items, distance_key)
+    assert selected == sorted(items, key=distance_key)
+    assert cursor is None
+
+
+def test_cursor_after_last_item_is_empty():
+    items = make_matches(2, n=10)
+    last = max(distance_key(m) for m in items)
+    assert top_k(items, distance_key, limit=5, after=last) == ([], None)
+
+
+def test_cursor_round_trips_float_keys():
+    for key in [(0.1, 3), (-2.0, 0.3333333333333333, 17), (1e-07, 2)]:
+        assert decode_cursor(encode_cursor(key)) == key
+
+
+@pytest.mark.parametrize('cursor', ['', '!!!', encode_cursor(('a', 1)), 'bnVsbA', 'eyJhIjoxfQ'])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_parse_limit():
+    assert parse_limit(None) is None
+    assert parse_limit('') is None
+    assert parse_limit('20') == 20
+    assert parse_limit(10 ** 6) == MAX_PAGE_SIZE
+    for value in ['0', '-3', 'ten', '1.5']:
+        with pytest.raises(ValueError):
+            parse_limit(value)
@@ -0,0 +1,160 @@
+# backend/tests/test_spatial_index.py
+"""격자 인덱스 결과가 전체 시설을 haversine으로 훑는 기존 방식과 같은지 확인합니다."""
+import numpy as np
+import pytest
+
+from conftest import CATEGORIES, assert_same_matches, brute_force_radius, make_snapshot
+from facility_snapshot import FacilitySnapshot
+from spatial_index import MAX_NEAREST_RADIUS_KM, FacilityGridIndex, parse_radius_km
+
+CATEGORY_SETS = [[], ['veterinary hospital'], ['pharmacy', 'café'], ['hotel', 'nonexistent'], ['nonexistent']]
+RADII = [0.05, 0.3, 1.0, 3.0, 7.5, 30.0]
+
+
+@pytest.fixture(scope='module')
+def snapshot():
+    return make_snapshot(np.random.default_rng(7))
+
+
+@pytest.fixture(scope='module')
+def index(snapshot):
+    return FacilityGridIndex(snapshot)
+
+
+def random_origins(rng, count):
+    for _ in range(count):
+        yield (float(rng.uniform(37.40, 37.70)), float(rng.uniform(126.80, 127.20)),
+               float(rng.choice(RADII)), CATEGORY_SETS[rng.integers(len(CATEGORY_SETS))])
+
+
+def test_query_radius_matches_full_scan(snapshot, index):
+    rng = np.random.default_rng(1)
+    for lat, lon, radius_km, categories in random_origins(rng, 300):
+        assert_same_matches(index.query_radius(lat, lon, radius_km, categories),
+                    brute_force_radius(snapshot, lat, lon, radius_km, categories))
+
+
+def test_query_radius_on_cell_boundaries(snapshot, index):
+    # 출발점이 셀 경계 위에 있어도 경계 너머 셀의 시설을 놓치지 않음
+    for lat, lon in [(37.50, 127.00), (37.55, 126.99), (37.6, 127.1)]:
+        for radius_km in RADII:
+            assert_same_matches(index.query_radius(lat, lon, radius_km), brute_force_radius(snapshot, lat, lon, radius_km, []))
+
+
+def test_query_radius_batch_matches_single(snapshot, index):
+    rng = np.random.default_rng(2)
+    lats = rng.uniform(37.45, 37.65, 20)
+    lons = rng.uniform(126.9, 127.1, 20)
+    for lat, lon, result in zip(lats, lons, index.query_radius_batch(lats, lons, 2.0, ['pharmacy'])):
+        assert_same_matches(result, brute_force_radius(snapshot, lat, lon, 2.0, ['pharmacy']))
+
+
+def test_nearest_matches_full_scan(snapshot, index):
+    rng = np.random.default_rng(3)
+    for lat, lon, _, categories in random_origins(rng, 200):
+        k = int(rng.integers(1, 40))
+        max_radius_km = float(rng.choice([0.5, 2.0, 20.0]))
+        found, radius_km = index.nearest(lat, lon, k, categories, max_radius_km)
+
+        expected = sorted(brute_force_radius(snapshot, lat, lon, max_radius_km, categories), key=lambda p: p[1])[:k]
+        assert sorted(facility_id for facility_id, _ in found) == sorted(facility_id for facility_id, _ in expected)
+        # 결과는 반경 검색과 같은 (반올림 거리, ID) 순서
+        assert found == sorted(found, key=lambda p: (round(p[1], 2), p[0]))
+        if len(expected) == k:
+            assert radius_km == pytest.approx(expected[-1][1])
+        else:
+            assert radius_km == max_radius_km
+
+
+def test_nearest_accept_filters_candidates(snapshot, index):
+    allowed = set(snapshot.ids[::2].tolist())
+    found, _ = index.nearest(37.55, 127.0, 25, accept=lambda ids: {i for i in ids if i in allowed})
+    expected = [p for p in sorted(brute_force_radius(snapshot, 37.55, 127.0, 20.0, []), key=lambda p: p[1])
+                if p[0] in allowed][:25]
+    assert sorted(i for i, _ in found) == sorted(i for i, _ in expected)
+
+
+@pytest.mark.parametrize('max_radius_km', [float('nan'), 0.0, -5.0])
+def test_nearest_rejects_invalid_radius(index, max_radius_km):
+    with pytest.raises(ValueError):
+        index.nearest(37.55, 127.0, 5, max_radius_km=max_radius_km)
+
+
+@pytest.mark.parametrize('max_radius_km', [3000.0, 20000.0, float('inf')])
+def test_nearest_stops_after_last_occupied_ring(max_radius_km):
+    # 시설이 서울 근처 0.3도 안에만 있으면 반경이 아무리 커도 고리 30여 개만 보고 멈춤
+    rng = np.random.default_rng(8)
+    small = make_snapshot(rng, n=300, far=0)
+    small_index = FacilityGridIndex(small)
+    calls = []
+
+    def reject_all(ids):
+        calls.append(len(ids))
+        return set()
+
+    assert small_index.nearest(37.55, 127.0, 5, max_radius_km=max_radius_km, accept=reject_all) == \
+        ([], max_radius_km)
+    assert sum(calls) == 300 and len(calls) <= 40
+
+    # 아무것도 거르지 않으면 전체 시설을 가까운 순서로
+    found, _ = small_index.nearest(37.55, 127.0, 1000, max_radius_km=max_radius_km)
+    assert sorted(i for i, _ in found) == sorted(small.ids.tolist())
+
+    # 증분 반영으로 멀리 추가된 시설까지 넓혀서 찾음
+    updated = small_index.with_changes([999], [(999, 'hotel', 35.1, 129.0)])
+    found, _ = updated.nearest(37.55, 127.0, 1, ['hotel'], max_radius_km,
+                               accept=lambda ids: {i for i in ids if i == 999})
+    assert [i for i, _ in found] == [999]
+
+
+@pytest.mark.parametrize('value, expected', [(None, 20.0), ('', 20.0), ('3.5', 3.5), (50, 50.0)])
+def test_parse_radius_km(value, expected):
+    assert parse_radius_km(value) == expected
+
+
+@pytest.mark.parametrize('value', ['nan', 'inf', '-inf', -5, 0, 'abc', [1], MAX_NEAREST_RADIUS_KM + 0.1, 1e9])
+def test_parse_radius_km_rejects(value):
+    with pytest.raises(ValueError):
+        parse_radius_km(value)
+
+
+def test_query_bbox_matches_full_scan(snapshot, index):
+    rng = np.random.default_rng(4)
+    for _ in range(100):
+        min_lat, max_lat = sorted(rng.uniform(37.4, 37.7, 2))
+        min_lon, max_lon = sorted(rng.uniform(126.8, 127.2, 2))
+        categories = CATEGORY_SETS[rng.integers(len(CATEGORY_SETS))]
+        positions = index.query_bbox(min_lat, min_lon, max_lat, max_lon, categories)
+
+        candidates = snapshot.category_positions(categories)
+        lats, lons = snapshot.lats[candidates], snapshot.lons[candidates]
+        inside = (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+        assert sorted(snapshot.ids[positions].tolist()) == sorted(snapshot.ids[candidates[inside]].tolist())
+
+
+def test_with_changes_matches_rebuilt_index(snapshot, index):
+    rng = np.random.default_rng(5)
+    changed = rng.choice(snapshot.ids, 150, replace=False).tolist()
+    # 절반은 옮기고 (카테고리도 바꿈), 나머지는 삭제, 새 시설 20개 추가
+    moved = [(facility_id, CATEGORIES[int(rng.integers(len(CATEGORIES)))],
+              float(rng.uniform(37.45, 37.65)), float(rng.uniform(126.85, 127.15))) for facility_id in changed[:75]]
+    added = [(10 ** 6 + i, 'new category', float(rng.uniform(37.5, 37.6)), float(rng.uniform(126.95, 127.05)))
+             for i in range(20)]
+    updated = index.with_changes(changed + [facility_id for facility_id, *_ in added], moved + added)
+
+    # 같은 데이터로 처음부터 만든 인덱스와 결과가 같아야 함
+    keep = ~np.isin(snapshot.ids, changed)
+    rows = [(int(i), snapshot.categories[c], float(a), float(o))
+            for i, c, a, o in zip(snapshot.ids[keep], snapshot.category_codes[keep],
+                                  snapshot.lats[keep], snapshot.lons[keep])] + moved + added
+    categories = list(dict.fromkeys(row[1] for row in rows))
+    rebuilt = FacilitySnapshot([r[0] for r in rows], [categories.index(r[1]) for r in rows],
+                               [r[2] for r in rows], [r[3] for r in rows], categories)
+
+    assert updated.size == len(rebuilt)
+    for lat, lon, radius_km, category_set in random_origins(rng, 150):
+        category_set = category_set + (['new category'] if rng.random() < 0.3 else [])
+        assert_same_matches(updated.query_radius(lat, lon, radius_km, category_set),
+                    brute_force_radius(rebuilt, lat, lon, radius_km, category_set))
+    # 원래 인덱스는 그대로 (검색 중인 요청이 계속 씀)
+    assert_same_matches(index.query_radius(37.55, 127.0, 5.0), brute_force_radius(snapshot, 37.55, 127.0, 5.0, []))
@@ -0,0 +1,29 @@
+# backend/wsgi.py
+"""
+운영용 WSGI 진입점입니다. (개발 서버는 python app.py)
+
+    cd backend
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+gunicorn.conf.py는 preload_app을 켜므로 이 모듈은 마스터 프로세스에서 한 번만 불러옵니다.
+DB 준비와 워밍업을 마친 뒤에 소켓을 열고 작업자를 fork하므로, 작업자는 데워진 상태로 첫 요청을 받습니다.
+"""
+import os
+import time
+
+from app import app, init_database, release_before_fork, warm_up
+
+
+def prepare():
+    started = time.perf_counter()
+    init_database()
+    if os.environ.get('WARM_UP', '1') != '0':
+        timings = warm_up()
+        failed = {name: status for name, (status, _) in timings.items() if status >= 400}
+        print(f"[워밍업] 요청 {len(timings)}개 ({sum(ms for _, ms in timings.values()):.0f}ms)"
+              + (f", 실패: {failed}" if failed else ""))
+    release_before_fork()
+    print(f"[서버 준비] {time.perf_counter() - started:.2f}초 (pid={os.getpid()})")
+
+
+prepare()
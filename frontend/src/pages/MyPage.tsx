@@ -37,6 +37,12 @@ export default function MyPage() {
         setProfilePic(data.profile_url || "https://cdn-icons-png.flaticon.com/512/1077/1077012.png");
         
         if (data.favorite_hospitals?.length > 0) {
+          // ⬇️ 즐겨찾기 시설을 상세 정보와 함께 한 번의 요청으로 불러오기
+          const favResponse = await fetch("http://localhost:5001/api/favorites", {
+            headers: { "Authorization": `Bearer ${token}` },
+          });
+          setFavorites(favResponse.ok ? await favResponse.json() : []);
+        } else {
           setFavorites([]);
         }
 